@@ -0,0 +1,226 @@
+import os
+import uuid
+import shutil
+import hashlib
+import asyncio
+import logging
+from pathlib import Path
+from urllib.parse import urlsplit
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from artwork_optimizer import ArtworkOptimizer
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+
+def url_key(url: str) -> str:
+    return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+
+def _temp_path(path: Path) -> Path:
+    return path.parent / f".{path.name}.{uuid.uuid4().hex[:8]}.tmp"
+
+
+def link_or_copy(src: Path, dest: Path) -> str:
+    """Hardlink src to dest (atomically replacing dest); copies across filesystems. Returns linked or copied."""
+    tmp_path = _temp_path(dest)
+    try:
+        try:
+            os.link(src, tmp_path)
+            action = 'linked'
+        except OSError:
+            shutil.copy2(src, tmp_path)
+            action = 'copied'
+        os.replace(tmp_path, dest)
+        return action
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+class ArtworkDownloader:
+    """
+    Concurrent artwork downloads with deduplication and conditional refresh.
+
+    artwork_cache: {_id: sha1(url), url, path, size (on disk), remote_size, etag,
+                    last_modified, updated_at}
+
+    - Downloads run in threads on a pooled HTTP session, bounded globally
+      and per host.
+    - The same URL is never fetched twice at once, and an image already on
+      disk for another movie is hardlinked instead of downloaded again.
+    - An existing file is refreshed with If-None-Match/If-Modified-Since,
+      or skipped when the server reports the same size.
+    - Files are written to a temp file and renamed into place.
+    - New downloads go through the optional ArtworkOptimizer.
+    """
+
+    def __init__(self, db, total: Optional[int] = None, per_host: Optional[int] = None,
+                 optimizer: Optional[ArtworkOptimizer] = None):
+        self.db = db
+        self.optimizer = optimizer or ArtworkOptimizer()
+        self.cache = db.artwork_cache
+        self.total_limit = total or int(os.environ.get('ARTWORK_DOWNLOAD_CONCURRENCY', '16'))
+        self.per_host_limit = per_host or int(os.environ.get('ARTWORK_HOST_CONCURRENCY', '4'))
+        self.timeout = float(os.environ.get('ARTWORK_DOWNLOAD_TIMEOUT', '30'))
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': USER_AGENT, 'Accept': 'image/*'})
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=self.total_limit)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._total = asyncio.Semaphore(self.total_limit)
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+        self._url_locks: Dict[str, list] = {}  # url key -> [lock, users]
+        self.stats = {
+            'downloaded': 0, 'not_modified': 0, 'unchanged': 0, 'linked': 0, 'copied': 0,
+            'failed': 0, 'bytes_downloaded': 0
+        }
+
+    def _host(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).hostname or ''
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._hosts[host]
+
+    def _get(self, url: str, dest: Path, headers: Dict[str, str], known_size: Optional[int]) -> Dict[str, Any]:
+        """Blocking conditional GET, streamed to a temp file next to dest"""
+        with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+            if response.status_code == 304:
+                return {'status': 'not_modified'}
+            response.raise_for_status()
+
+            validators = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified')
+            }
+            length = response.headers.get('Content-Length')
+            if known_size is not None and length and length.isdigit() and int(length) == known_size:
+                # Same size as what we have: not worth the transfer
+                return {'status': 'unchanged', 'size': known_size, **validators}
+
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = _temp_path(dest)
+            size = 0
+            try:
+                with open(tmp_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=65536):
+                        f.write(chunk)
+                        size += len(chunk)
+                os.replace(tmp_path, dest)
+            except BaseException:
+                tmp_path.unlink(missing_ok=True)
+                raise
+            return {'status': 'downloaded', 'size': size, **validators}
+
+    async def fetch(self, url: str, dest: Path) -> Dict[str, Any]:
+        """
+        Make dest hold the image at url. Returns {status, path}: status is
+        downloaded, not_modified, unchanged, linked, copied or failed.
+        """
+        dest = Path(dest)
+        key = url_key(url)
+        # One fetch per URL at a time: later ones link to what the first wrote
+        entry = self._url_locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                result = await self._fetch(url, key, dest)
+        except Exception as e:
+            logger.error(f"Failed to download image from {url}: {str(e)}")
+            result = {'status': 'failed', 'error': str(e)}
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                self._url_locks.pop(key, None)
+
+        self.stats[result['status']] += 1
+        self.stats['bytes_downloaded'] += result.pop('bytes_downloaded', 0)
+        return {**result, 'path': str(dest), 'url': url}
+
+    async def _fetch(self, url: str, key: str, dest: Path) -> Dict[str, Any]:
+        record = await self.cache.find_one({'_id': key})
+        dest_size = await asyncio.to_thread(lambda: dest.stat().st_size if dest.exists() else None)
+
+        # Seen before and still on disk elsewhere: reuse the bytes
+        if dest_size is None and record and record.get('path') and record['path'] != str(dest):
+            source = Path(record['path'])
+            if await asyncio.to_thread(lambda: source.exists() and source.stat().st_size == record.get('size')):
+                action = await asyncio.to_thread(link_or_copy, source, dest)
+                logger.info(f"Image {action} from {source.name}: {dest}")
+                return {'status': action}
+
+        headers = {}
+        remote_size = dest_size
+        if dest_size is not None and record and record.get('size') == dest_size:
+            # Our file is the one recorded; it may have been optimized since download
+            remote_size = record.get('remote_size', dest_size)
+            if record.get('etag'):
+                headers['If-None-Match'] = record['etag']
+            if record.get('last_modified'):
+                headers['If-Modified-Since'] = record['last_modified']
+
+        async with self._host(url):
+            async with self._total:
+                logger.info(f"Downloading image from: {url}")
+                result = await asyncio.to_thread(self._get, url, dest, headers, remote_size)
+
+        if result['status'] == 'not_modified':
+            return {'status': 'not_modified'}
+
+        size = dest_size if result['status'] == 'unchanged' else result['size']
+        optimized = None
+        if result['status'] == 'downloaded':
+            logger.info(f"Image saved to: {dest}")
+            # Optimized before the URL lock is released, so duplicates link to the final file
+            optimized = await self.optimizer.optimize(dest)
+            if optimized and optimized['status'] == 'optimized':
+                size = optimized['bytes_after']
+
+        await self.cache.update_one(
+            {'_id': key},
+            {'$set': {
+                'url': url,
+                'path': str(dest),
+                'size': size,
+                'remote_size': result['size'],
+                'etag': result.get('etag'),
+                'last_modified': result.get('last_modified'),
+                'updated_at': datetime.now(timezone.utc).isoformat()
+            }},
+            upsert=True
+        )
+        outcome = {'status': result['status'], 'size': size}
+        if result['status'] == 'downloaded':
+            outcome['bytes_downloaded'] = result['size']
+        if optimized:
+            outcome['bytes_saved'] = optimized['bytes_saved']
+        return outcome
+
+    async def fetch_many(self, targets: List[Tuple[str, Path]]) -> List[Dict[str, Any]]:
+        """Fetch (url, destination) pairs concurrently; results in the same order"""
+        return await asyncio.gather(*(self.fetch(url, dest) for url, dest in targets))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'optimizer': self.optimizer.get_stats(),
+            'total_concurrency': self.total_limit,
+            'per_host_concurrency': self.per_host_limit
+        }
+
+
+# Global instance
+artwork_downloader = None
+
+def get_artwork_downloader(db) -> ArtworkDownloader:
+    """Get or create the global artwork downloader instance"""
+    global artwork_downloader
+    if artwork_downloader is None:
+        artwork_downloader = ArtworkDownloader(db)
+    return artwork_downloader
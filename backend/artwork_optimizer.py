@@ -0,0 +1,131 @@
+import os
+import uuid
+import asyncio
+import logging
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Dict, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _dimensions(value: str) -> Tuple[int, int]:
+    width, height = value.lower().split('x')
+    return int(width), int(height)
+
+
+def artwork_kind(path: Path) -> str:
+    """poster or fanart, from the Emby sidecar name"""
+    return 'fanart' if path.stem.endswith('-fanart') else 'poster'
+
+
+def optimize_image(path: str, max_size: Tuple[int, int], quality: int) -> Dict[str, Any]:
+    """
+    Process-pool task: downscale an image to fit max_size and re-encode it
+    as progressive JPEG. The result only replaces the original if smaller.
+    """
+    from PIL import Image
+
+    before = os.path.getsize(path)
+    tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        with Image.open(path) as image:
+            original_size = image.size
+            if image.mode in ('RGBA', 'LA', 'P'):
+                # JPEG has no alpha: flatten onto black, like Emby shows it
+                image = image.convert('RGBA')
+                background = Image.new('RGB', image.size, (0, 0, 0))
+                background.paste(image, mask=image.split()[-1])
+                image = background
+            elif image.mode != 'RGB':
+                image = image.convert('RGB')
+            image.thumbnail(max_size, Image.LANCZOS)
+            image.save(tmp_path, 'JPEG', quality=quality, optimize=True, progressive=True)
+
+        after = os.path.getsize(tmp_path)
+        if after >= before:
+            os.unlink(tmp_path)
+            return {'status': 'kept', 'bytes_before': before, 'bytes_after': before, 'bytes_saved': 0}
+        os.replace(tmp_path, path)
+        return {
+            'status': 'optimized',
+            'bytes_before': before,
+            'bytes_after': after,
+            'bytes_saved': before - after,
+            'dimensions_before': list(original_size)
+        }
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class ArtworkOptimizer:
+    """
+    Optional resize/recompress stage for downloaded posters and fanart.
+
+    Images are scaled down to the Emby target dimensions and re-encoded as
+    JPEG in a process pool, off the event loop. Enabled with
+    ARTWORK_OPTIMIZE=true (requires Pillow).
+    """
+
+    def __init__(self):
+        self.enabled = os.environ.get('ARTWORK_OPTIMIZE', 'false').lower() == 'true'
+        self.targets = {
+            'poster': _dimensions(os.environ.get('ARTWORK_POSTER_SIZE', '1000x1500')),
+            'fanart': _dimensions(os.environ.get('ARTWORK_FANART_SIZE', '1920x1080'))
+        }
+        self.quality = int(os.environ.get('ARTWORK_JPEG_QUALITY', '85'))
+        self.workers = int(os.environ.get('ARTWORK_OPTIMIZE_WORKERS', '2'))
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.stats = {'optimized': 0, 'kept': 0, 'failed': 0, 'bytes_before': 0, 'bytes_saved': 0}
+
+        if self.enabled:
+            try:
+                import PIL  # noqa: F401
+            except ImportError:
+                logger.error("ARTWORK_OPTIMIZE is set but Pillow is not installed; artwork optimization disabled")
+                self.enabled = False
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: never fork the server with its Mongo client and event loop threads
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+        return self._pool
+
+    async def optimize(self, path: Path) -> Optional[Dict[str, Any]]:
+        """Optimize one image in place; None when the stage is disabled"""
+        if not self.enabled:
+            return None
+        path = Path(path)
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(
+                self._executor(), optimize_image, str(path), self.targets[artwork_kind(path)], self.quality
+            )
+        except Exception as e:
+            logger.warning(f"Could not optimize {path.name}: {str(e)}")
+            self.stats['failed'] += 1
+            return {'status': 'failed', 'bytes_saved': 0, 'error': str(e)}
+
+        self.stats[result['status']] += 1
+        self.stats['bytes_before'] += result['bytes_before']
+        self.stats['bytes_saved'] += result['bytes_saved']
+        if result['bytes_saved']:
+            logger.info(f"Optimized {path.name}: {result['bytes_before'] // 1024} KB -> {result['bytes_after'] // 1024} KB")
+        return result
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'enabled': self.enabled,
+            'poster_size': 'x'.join(map(str, self.targets['poster'])),
+            'fanart_size': 'x'.join(map(str, self.targets['fanart'])),
+            'jpeg_quality': self.quality
+        }
@@ -0,0 +1,252 @@
+import os
+import time
+import uuid
+import asyncio
+import logging
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+from datetime import datetime, timezone
+from pymongo import ASCENDING, InsertOne
+
+logger = logging.getLogger(__name__)
+
+# Items fetched from Mongo per batch while a job runs
+BATCH_SIZE = 100
+
+ACTIVE_STATES = ('pending', 'running')
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class BackfillManager:
+    """
+    Resumable bulk processing of existing files without NFO.
+
+    A job checkpoints every file in backfill_items; an item is marked done as
+    soon as it has been processed, so after a restart the job resumes with the
+    remaining pending items. Files go through the monitor's worker pipeline
+    (FolderMonitorService.process) with bounded concurrency.
+    """
+
+    def __init__(self, db, monitor):
+        self.db = db
+        self.monitor = monitor
+        self.default_concurrency = int(os.environ.get('BACKFILL_CONCURRENCY', '2'))
+        self.item_timeout = float(os.environ.get('BACKFILL_ITEM_TIMEOUT', '3600'))
+        self.runners: Dict[str, asyncio.Task] = {}
+        self.run_stats: Dict[str, Dict[str, float]] = {}  # job_id -> rate tracking for the current run
+
+    async def ensure_indexes(self):
+        await self.db.backfill_items.create_index([('job_id', ASCENDING), ('state', ASCENDING)])
+        await self.db.backfill_jobs.create_index([('id', ASCENDING)], unique=True)
+
+    async def start_job(self, folder_path: str, concurrency: Optional[int] = None) -> Dict[str, Any]:
+        """Create a job for every file without NFO below folder_path and start it"""
+        folder = str(Path(folder_path).absolute())
+        await self.monitor.file_index.rescan(folder)
+        files = await self.monitor.file_index.files_without_nfo(folder)
+
+        job_id = str(uuid.uuid4())
+        job = {
+            'id': job_id,
+            'folder': folder,
+            'status': 'pending',
+            'concurrency': concurrency or self.default_concurrency,
+            'total': len(files),
+            'processed': 0,
+            'results': {},
+            'stage_totals': {},
+            'created_at': _now(),
+            'updated_at': _now(),
+            'finished_at': None
+        }
+        await self.db.backfill_jobs.insert_one(dict(job))
+
+        operations = [InsertOne({'job_id': job_id, 'path': path, 'state': 'pending'}) for path in files]
+        for i in range(0, len(operations), 1000):
+            await self.db.backfill_items.bulk_write(operations[i:i + 1000], ordered=False)
+
+        logger.info(f"Backfill job {job_id} created for {folder}: {len(files)} files")
+        self._spawn(job_id)
+        return await self.get_job(job_id)
+
+    def _spawn(self, job_id: str):
+        runner = self.runners.get(job_id)
+        if runner and not runner.done():
+            # Still finishing in-flight items (e.g. paused and resumed quickly):
+            # start again once it exits, unless it was cancelled for shutdown
+            runner.add_done_callback(lambda task: task.cancelled() or self._spawn(job_id))
+            return
+        self.runners[job_id] = asyncio.create_task(self._run(job_id))
+
+    async def _set_status(self, job_id: str, status: str, **fields):
+        await self.db.backfill_jobs.update_one(
+            {'id': job_id},
+            {'$set': {'status': status, 'updated_at': _now(), **fields}}
+        )
+
+    async def _process_item(self, job_id: str, item: Dict[str, Any]):
+        path = Path(item['path'])
+        started = time.monotonic()
+        
+        if not await asyncio.to_thread(path.exists):
+            outcome = {'result': 'missing', 'timings': {}}
+        else:
+            # Through the monitor pipeline: shares its dedup, backpressure and
+            # metrics, and runs on worker.py processes with SCRAPE_EXECUTION=worker
+            try:
+                outcome = await self.monitor.process(path, ready=True, force=True, timeout=self.item_timeout)
+            except Exception as e:
+                logger.error(f"Backfill error on {path.name}: {str(e)}")
+                outcome = {'result': 'failed', 'timings': {}}
+        if outcome['result'] == 'interrupted':
+            # The monitor workers were stopped; the item stays pending
+            return
+        result = outcome['result']
+        timings: Dict[str, float] = dict(outcome.get('timings') or {})
+        timings['total'] = round(time.monotonic() - started, 3)
+
+        # Checkpoint: the item is done, the job counters move forward
+        await self.db.backfill_items.update_one(
+            {'_id': item['_id']},
+            {'$set': {'state': 'done', 'result': result, 'timings': timings, 'processed_at': _now()}}
+        )
+        inc = {'processed': 1, f'results.{result}': 1}
+        for stage, seconds in timings.items():
+            inc[f'stage_totals.{stage}.count'] = 1
+            inc[f'stage_totals.{stage}.seconds'] = seconds
+        await self.db.backfill_jobs.update_one({'id': job_id}, {'$inc': inc, '$set': {'updated_at': _now()}})
+
+        stats = self.run_stats.get(job_id)
+        if stats is not None:
+            stats['processed'] += 1
+
+    async def _run(self, job_id: str):
+        job = await self.db.backfill_jobs.find_one({'id': job_id})
+        if not job or job['status'] not in ACTIVE_STATES + ('paused',):
+            return
+
+        await self._set_status(job_id, 'running', started_at=job.get('started_at') or _now())
+        self.run_stats[job_id] = {'started': time.monotonic(), 'processed': 0}
+        semaphore = asyncio.Semaphore(job.get('concurrency') or self.default_concurrency)
+        logger.info(f"Backfill job {job_id} running")
+
+        async def bounded(item):
+            async with semaphore:
+                # Re-check between items so pause/cancel take effect promptly
+                current = await self.db.backfill_jobs.find_one({'id': job_id}, {'status': 1})
+                if current and current['status'] == 'running':
+                    await self._process_item(job_id, item)
+
+        try:
+            while True:
+                current = await self.db.backfill_jobs.find_one({'id': job_id}, {'status': 1})
+                if current and current['status'] == 'pending':
+                    # Resumed while this runner was still active
+                    await self.db.backfill_jobs.update_one(
+                        {'id': job_id, 'status': 'pending'},
+                        {'$set': {'status': 'running', 'updated_at': _now()}}
+                    )
+                    continue
+                if not current or current['status'] != 'running':
+                    logger.info(f"Backfill job {job_id} stopped ({current['status'] if current else 'deleted'})")
+                    return
+
+                items = await self.db.backfill_items.find(
+                    {'job_id': job_id, 'state': 'pending'}
+                ).limit(BATCH_SIZE).to_list(BATCH_SIZE)
+                if not items:
+                    await self._set_status(job_id, 'completed', finished_at=_now())
+                    logger.info(f"✅ Backfill job {job_id} completed")
+                    return
+
+                await asyncio.gather(*(bounded(item) for item in items))
+        except asyncio.CancelledError:
+            # Server shutdown: leave the job 'running' so it resumes on the next start
+            raise
+        except Exception as e:
+            logger.error(f"Backfill job {job_id} failed: {str(e)}")
+            await self._set_status(job_id, 'failed', error=str(e), finished_at=_now())
+        finally:
+            self.run_stats.pop(job_id, None)
+
+    async def pause(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Stop after the files currently in progress; resume() continues later"""
+        result = await self.db.backfill_jobs.update_one(
+            {'id': job_id, 'status': {'$in': list(ACTIVE_STATES)}},
+            {'$set': {'status': 'paused', 'updated_at': _now()}}
+        )
+        return await self.get_job(job_id) if result.matched_count else None
+
+    async def resume(self, job_id: str) -> Optional[Dict[str, Any]]:
+        result = await self.db.backfill_jobs.update_one(
+            {'id': job_id, 'status': {'$in': ['paused', 'failed']}},
+            {'$set': {'status': 'pending', 'updated_at': _now()}}
+        )
+        if not result.matched_count:
+            return None
+        self._spawn(job_id)
+        return await self.get_job(job_id)
+
+    async def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        result = await self.db.backfill_jobs.update_one(
+            {'id': job_id, 'status': {'$in': list(ACTIVE_STATES) + ['paused', 'failed']}},
+            {'$set': {'status': 'cancelled', 'updated_at': _now(), 'finished_at': _now()}}
+        )
+        return await self.get_job(job_id) if result.matched_count else None
+
+    async def resume_interrupted(self):
+        """Restart runners for jobs that were running when the server stopped"""
+        jobs = await self.db.backfill_jobs.find({'status': {'$in': list(ACTIVE_STATES)}}).to_list(None)
+        for job in jobs:
+            logger.info(f"Resuming backfill job {job['id']}")
+            self._spawn(job['id'])
+
+    async def shutdown(self):
+        for task in self.runners.values():
+            task.cancel()
+        await asyncio.gather(*self.runners.values(), return_exceptions=True)
+        self.runners.clear()
+
+    def _with_progress(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Add throughput, ETA and per-stage average latency to a job document"""
+        job.pop('_id', None)
+        remaining = max(job.get('total', 0) - job.get('processed', 0), 0)
+
+        files_per_minute = None
+        stats = self.run_stats.get(job['id'])
+        if stats and stats['processed']:
+            elapsed = time.monotonic() - stats['started']
+            files_per_minute = round(stats['processed'] / elapsed * 60, 2) if elapsed > 0 else None
+
+        job['progress'] = {
+            'remaining': remaining,
+            'percent': round(job['processed'] / job['total'] * 100, 1) if job.get('total') else 100.0,
+            'files_per_minute': files_per_minute,
+            'eta_seconds': round(remaining / files_per_minute * 60) if files_per_minute else None,
+            'stage_latency_seconds': {
+                stage: round(totals['seconds'] / totals['count'], 3)
+                for stage, totals in job.get('stage_totals', {}).items() if totals.get('count')
+            }
+        }
+        return job
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = await self.db.backfill_jobs.find_one({'id': job_id})
+        return self._with_progress(job) if job else None
+
+    async def list_jobs(self, limit: int = 50) -> List[Dict[str, Any]]:
+        jobs = await self.db.backfill_jobs.find({}).sort('created_at', -1).to_list(limit)
+        return [self._with_progress(job) for job in jobs]
+
+# Global instance
+backfill_manager = None
+
+def get_backfill_manager(db, monitor) -> BackfillManager:
+    """Get or create the global backfill manager instance"""
+    global backfill_manager
+    if backfill_manager is None:
+        backfill_manager = BackfillManager(db, monitor)
+    return backfill_manager
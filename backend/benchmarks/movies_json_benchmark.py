@@ -0,0 +1,148 @@
+"""
+Benchmark: rows/sec for GET /api/movies pages, the orjson streaming path
+vs. the former response_model path (to_list, created_at conversion loop,
+pydantic validation and serialization, JSONResponse). Checks both return
+the same movies before timing them.
+
+By default documents come from an in-memory cursor, so only the response
+building is measured. With --mongo they are inserted into a scratch
+collection of the configured database (MONGO_URL, DB_NAME) and read back
+through Motor, end to end.
+
+    python backend/benchmarks/movies_json_benchmark.py [--count 5000] [--rounds 5] [--mongo]
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'emby_benchmark')
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from server import MovieMetadata, movie_document, db
+from json_stream import model_projection, model_defaults, model_datetime_fields, stream_array, orjson
+
+RESPONSE_FIELD = create_response_field(name='Response_get_movies', type_=List[MovieMetadata], mode='serialization')
+PROJECTION = model_projection(MovieMetadata)
+DEFAULTS = model_defaults(MovieMetadata, PROJECTION)
+DATETIME_FIELDS = model_datetime_fields(MovieMetadata, PROJECTION)
+
+WORDS = ['Summer', 'Heat', 'Boys', '& Friends', 'Part 2', '"Live"', 'Café', "Men's", 'Vol. 3', 'Uncut']
+
+
+def sample_movie(rng: random.Random, i: int):
+    return movie_document({
+        'source': rng.choice(['gaydvdempire', 'aebn', 'gevi', 'radvideo']),
+        'source_id': str(100000 + i),
+        'title': ' '.join(rng.choice(WORDS) for _ in range(3)),
+        'year': rng.choice([None, 1999, 2012, 2024]),
+        'release_date': rng.choice([None, '2012-05-01']),
+        'plot': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(20, 120))),
+        'runtime': rng.choice([None, 95, 120]),
+        'studio': rng.choice([None, 'Falcon', 'Bel Ami']),
+        'director': rng.choice([None, 'Some Director']),
+        'genres': [rng.choice(WORDS) for _ in range(rng.randint(0, 8))],
+        'actors': [{'name': rng.choice(WORDS), 'role': rng.choice(['', 'Self'])} for _ in range(rng.randint(0, 10))],
+        'tags': [rng.choice(WORDS) for _ in range(rng.randint(0, 4))],
+        'poster_url': f"https://example.com/p/{i}.jpg",
+        'backdrop_url': rng.choice([None, f"https://example.com/b/{i}.jpg"])
+    })
+
+
+class MemoryCursor:
+    """The parts of a Motor cursor the two paths use; hands out fresh dicts like Motor does"""
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length):
+        return [dict(doc) for doc in self.docs[:length]]
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self.docs:
+            yield dict(doc)
+
+
+async def legacy_path(cursor, limit: int) -> bytes:
+    """The previous get_movies body plus what FastAPI did with its return value"""
+    movies = await cursor.to_list(limit)
+    for movie in movies:
+        if isinstance(movie.get('created_at'), str):
+            movie['created_at'] = datetime.fromisoformat(movie['created_at'])
+    content = await serialize_response(field=RESPONSE_FIELD, response_content=movies)
+    return JSONResponse(content).body
+
+
+async def streaming_path(cursor, limit: int) -> bytes:
+    return b''.join([chunk async for chunk in stream_array(cursor, DEFAULTS, DATETIME_FIELDS)])
+
+
+async def measure(path, make_cursor, limit: int, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        await path(make_cursor(), limit)
+    return limit * rounds / (time.perf_counter() - started)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=5000, help='movies per page')
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--mongo', action='store_true', help='read through Motor from a scratch collection')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    docs = [sample_movie(rng, i) for i in range(args.count)]
+
+    collection = None
+    if args.mongo:
+        collection = db.movies_benchmark
+        await collection.drop()
+        await collection.insert_many([dict(doc) for doc in docs])
+        await collection.create_index('created_at')
+
+        def make_cursor():
+            return collection.find({}, PROJECTION).sort('created_at', -1).limit(args.count)
+    else:
+        # What the projected, sorted query would return
+        docs = [{key: value for key, value in doc.items() if PROJECTION.get(key)} for doc in docs]
+        docs.sort(key=lambda doc: doc['created_at'], reverse=True)
+
+        def make_cursor():
+            return MemoryCursor(docs)
+
+    try:
+        legacy_body = await legacy_path(make_cursor(), args.count)
+        streaming_body = await streaming_path(make_cursor(), args.count)
+        if json.loads(legacy_body) != json.loads(streaming_body):
+            sys.exit("Streaming response differs from the response_model output")
+
+        legacy = await measure(legacy_path, make_cursor, args.count, args.rounds)
+        streaming = await measure(streaming_path, make_cursor, args.count, args.rounds)
+    finally:
+        if collection is not None:
+            await collection.drop()
+
+    encoder = 'orjson' if orjson is not None else 'json (orjson not installed)'
+    print(f"{args.count} movies per page x {args.rounds}, {'Motor' if args.mongo else 'in-memory cursor'}, same movies")
+    print(f"response_model path: {legacy:10.0f} rows/sec, {len(legacy_body) // 1024} KB")
+    print(f"streaming path:      {streaming:10.0f} rows/sec, {len(streaming_body) // 1024} KB "
+          f"({streaming / legacy:.1f}x, {encoder})")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
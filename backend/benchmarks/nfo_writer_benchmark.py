@@ -0,0 +1,118 @@
+"""
+Microbenchmark: NFOs/sec for bulk generation, streaming writer vs. the
+former ElementTree -> minidom round trip. Also checks both produce
+byte-identical output for every sample before timing them.
+
+    python backend/benchmarks/nfo_writer_benchmark.py [--count 20000]
+"""
+import sys
+import time
+import random
+import argparse
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from xml.dom import minidom
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from nfo_writer import write_nfo
+
+
+def minidom_nfo(metadata):
+    """The previous NFOGenerator.generate_nfo, kept as the reference output"""
+    movie = ET.Element('movie')
+    if metadata.get('title'):
+        ET.SubElement(movie, 'title').text = metadata['title']
+        ET.SubElement(movie, 'originaltitle').text = metadata.get('original_title', metadata['title'])
+    if metadata.get('year'):
+        ET.SubElement(movie, 'year').text = str(metadata['year'])
+    if metadata.get('release_date'):
+        ET.SubElement(movie, 'premiered').text = metadata['release_date']
+    if metadata.get('plot'):
+        ET.SubElement(movie, 'plot').text = metadata['plot']
+        ET.SubElement(movie, 'outline').text = metadata['plot'][:200] + '...' if len(metadata['plot']) > 200 else metadata['plot']
+    if metadata.get('runtime'):
+        ET.SubElement(movie, 'runtime').text = str(metadata['runtime'])
+    if metadata.get('studio'):
+        ET.SubElement(movie, 'studio').text = metadata['studio']
+    if metadata.get('director'):
+        ET.SubElement(movie, 'director').text = metadata['director']
+    for genre in metadata.get('genres', []):
+        ET.SubElement(movie, 'genre').text = genre
+    for tag in metadata.get('tags', []):
+        ET.SubElement(movie, 'tag').text = tag
+    for actor_data in metadata.get('actors', []):
+        actor = ET.SubElement(movie, 'actor')
+        ET.SubElement(actor, 'name').text = actor_data.get('name', '')
+        if actor_data.get('role'):
+            ET.SubElement(actor, 'role').text = actor_data['role']
+    if metadata.get('poster_url'):
+        ET.SubElement(movie, 'thumb').text = metadata['poster_url']
+        ET.SubElement(movie, 'poster').text = metadata['poster_url']
+    if metadata.get('backdrop_url'):
+        ET.SubElement(movie, 'fanart').text = metadata['backdrop_url']
+    if metadata.get('rating'):
+        ET.SubElement(movie, 'mpaa').text = metadata['rating']
+    ET.SubElement(movie, 'tag').text = f"Source: {metadata.get('source', 'unknown')}"
+    ET.SubElement(movie, 'tag').text = f"SourceID: {metadata.get('source_id', '')}"
+
+    xml_str = ET.tostring(movie, encoding='unicode')
+    pretty_xml = minidom.parseString(xml_str).toprettyxml(indent='  ')
+    return '\n'.join([line for line in pretty_xml.split('\n') if line.strip()])
+
+
+WORDS = ['Summer', 'Heat', 'Boys', '& Friends', 'Part 2', '"Live"', '<Uncut>', 'Café', "Men's", 'Vol. 3']
+
+
+def sample_metadata(rng: random.Random, i: int):
+    plot = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(0, 80)))
+    if i % 7 == 0:
+        plot += '\r\n\r\n  \nSecond paragraph\n\n'
+    return {
+        'title': ' '.join(rng.choice(WORDS) for _ in range(3)),
+        'original_title': None if i % 11 == 0 else f"Original {i}",
+        'year': rng.choice([None, 1999, 2012, 2024]),
+        'release_date': rng.choice(['', '2012-05-01']),
+        'plot': plot,
+        'runtime': rng.choice([None, 95, 120]),
+        'studio': rng.choice(['', 'Falcon', 'Bel Ami & Co']),
+        'director': rng.choice(['', 'Some Director']),
+        'genres': [rng.choice(WORDS) for _ in range(rng.randint(0, 6))] + ([''] if i % 13 == 0 else []),
+        'tags': [rng.choice(WORDS) for _ in range(rng.randint(0, 4))],
+        'actors': [{'name': rng.choice(WORDS), 'role': rng.choice(['', 'Self'])} for _ in range(rng.randint(0, 8))],
+        'poster_url': f"https://example.com/p/{i}.jpg?a=1&b=2",
+        'backdrop_url': rng.choice(['', f"https://example.com/b/{i}.jpg"]),
+        'rating': rng.choice(['', 'XXX']),
+        'source': 'radvideo',
+        'source_id': str(i)
+    }
+
+
+def measure(fn, samples):
+    started = time.perf_counter()
+    for metadata in samples:
+        fn(metadata)
+    return len(samples) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    samples = [sample_metadata(rng, i) for i in range(args.count)]
+
+    mismatches = sum(1 for metadata in samples if write_nfo(metadata) != minidom_nfo(metadata))
+    if mismatches:
+        sys.exit(f"{mismatches} of {len(samples)} NFOs differ from the minidom output")
+
+    legacy = measure(minidom_nfo, samples)
+    streaming = measure(write_nfo, samples)
+    print(f"{len(samples)} NFOs, identical output")
+    print(f"minidom round trip: {legacy:10.0f} NFOs/sec")
+    print(f"streaming writer:   {streaming:10.0f} NFOs/sec ({streaming / legacy:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
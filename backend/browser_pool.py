@@ -0,0 +1,106 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Optional, List, Any, AsyncIterator
+
+from playwright.async_api import async_playwright
+
+logger = logging.getLogger(__name__)
+
+# Launch arguments every scraper uses (anti-detection, container friendly)
+BROWSER_ARGS = [
+    '--disable-blink-features=AutomationControlled',
+    '--disable-dev-shm-usage',
+    '--no-sandbox'
+]
+
+# Pool the scrapes of the current task run in, set with use_browser_pool()
+_current_pool: ContextVar[Optional['BrowserPool']] = ContextVar('browser_pool', default=None)
+
+
+class BrowserLease:
+    """
+    A scraper's view of a shared browser: new_context() works as on a
+    Browser, close() only closes the contexts this scrape opened.
+    """
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.contexts: List[Any] = []
+
+    async def new_context(self, **kwargs):
+        context = await self.browser.new_context(**kwargs)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        contexts, self.contexts = self.contexts, []
+        for context in contexts:
+            try:
+                await context.close()
+            except Exception as e:
+                logger.debug(f"Closing browser context failed: {str(e)}")
+
+
+class BrowserPool:
+    """
+    One Chromium shared by many scrapes. Each scrape gets its own browser
+    context (cookies, age-gate state), so only the first scrape pays for
+    the browser launch. A crashed browser is relaunched on the next lease.
+    """
+
+    def __init__(self):
+        self._playwright = None
+        self._browser = None
+        self._lock = asyncio.Lock()
+        self.launches = 0
+        self.leases = 0
+
+    async def _get_browser(self):
+        async with self._lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=True, args=BROWSER_ARGS)
+                self.launches += 1
+            return self._browser
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[BrowserLease]:
+        lease = BrowserLease(await self._get_browser())
+        self.leases += 1
+        try:
+            yield lease
+        finally:
+            await lease.close()
+
+    async def close(self):
+        async with self._lock:
+            try:
+                if self._browser is not None and self._browser.is_connected():
+                    await self._browser.close()
+                if self._playwright is not None:
+                    await self._playwright.stop()
+            except Exception as e:
+                logger.warning(f"Failed to shut down shared browser: {str(e)}")
+            self._browser = None
+            self._playwright = None
+
+
+def use_browser_pool(pool: Optional[BrowserPool]):
+    """Make scrapes in the current task use pool (call at the start of the task)"""
+    _current_pool.set(pool)
+
+
+@asynccontextmanager
+async def scrape_browser():
+    """Browser for one scrape: a lease on the task's shared pool, or a browser of its own"""
+    pool = _current_pool.get()
+    if pool is not None:
+        async with pool.lease() as browser:
+            yield browser
+        return
+
+    async with async_playwright() as p:
+        yield await p.chromium.launch(headless=True, args=BROWSER_ARGS)
@@ -0,0 +1,200 @@
+import os
+import re
+import zlib
+import logging
+from typing import Optional, Dict, Any, List, Tuple
+
+import numpy as np
+
+from library_index import normalize_name
+
+logger = logging.getLogger(__name__)
+
+# Tokens per title kept for matching; longer titles are truncated
+MAX_TOKENS = 24
+
+# Words that say nothing about which movie a result is
+STOP_WORDS = {'the', 'a', 'an', 'and', 'of', 'dvd', 'vod', 'hd', 'uhd', 'blu', 'ray', 'bluray', 'movie', 'xxx'}
+
+YEAR_PATTERN = re.compile(r'\b(19\d{2}|20\d{2})\b')
+
+# Relative weight of each feature; hints only count when both sides have them
+DEFAULT_WEIGHTS = {
+    'title': 1.0,
+    'year': 0.35,
+    'runtime': 0.2,
+    'studio': 0.25
+}
+
+
+def _token_hashes(text: str) -> Tuple[List[Tuple[int, bool]], Optional[int]]:
+    """Stable hashes of the distinct title words (with a numeric flag), plus a year found in the text"""
+    normalized = normalize_name(text)
+    year = None
+    tokens = []
+    for token in normalized.split():
+        if YEAR_PATTERN.fullmatch(token):
+            year = year or int(token)
+            continue
+        if token in STOP_WORDS:
+            continue
+        tokens.append(token)
+    # Truncate in title order, so long titles keep their first words
+    distinct = list(dict.fromkeys(tokens))[:MAX_TOKENS]
+    return [(zlib.crc32(token.encode('utf-8')), token.isdigit()) for token in distinct], year
+
+
+def _encode(texts: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pack titles into a padded (n, MAX_TOKENS) matrix of token hashes (-1 = pad),
+    a matching matrix flagging numeric tokens, their token counts and the
+    year mentioned in each title (0 = none).
+    """
+    matrix = np.full((len(texts), MAX_TOKENS), -1, dtype=np.int64)
+    numeric = np.zeros((len(texts), MAX_TOKENS), dtype=bool)
+    counts = np.zeros(len(texts), dtype=np.float64)
+    years = np.zeros(len(texts), dtype=np.float64)
+    for i, text in enumerate(texts):
+        hashes, year = _token_hashes(text or '')
+        if hashes:
+            matrix[i, :len(hashes)] = [h for h, _ in hashes]
+            numeric[i, :len(hashes)] = [is_number for _, is_number in hashes]
+        counts[i] = len(hashes)
+        years[i] = year or 0
+    return matrix, numeric, counts, years
+
+
+def _hint_array(values: List[Any]) -> np.ndarray:
+    """Numeric hints as floats; missing or invalid values become NaN"""
+    out = np.full(len(values), np.nan, dtype=np.float64)
+    for i, value in enumerate(values):
+        try:
+            if value not in (None, ''):
+                out[i] = float(value)
+        except (TypeError, ValueError):
+            pass
+    return out
+
+
+class CandidateRanker:
+    """
+    Scores search-result candidates against the titles parsed from filenames.
+
+    All (file, candidate) pairs of a batch are scored in one vectorized pass:
+    titles become fixed-width arrays of token hashes, and the pair features
+    (token-set Jaccard and containment, sequel numbers, year proximity,
+    runtime and studio agreement) are computed with NumPy broadcasting.
+    The confidence is a weighted mean of the features available for each pair.
+    """
+
+    def __init__(self, accept_threshold: Optional[float] = None, weights: Optional[Dict[str, float]] = None):
+        if accept_threshold is None:
+            accept_threshold = float(os.environ.get('MATCH_AUTO_ACCEPT', '0.6'))
+        self.accept_threshold = accept_threshold
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+
+    def score_pairs(self, queries: List[Dict[str, Any]], candidates: List[Dict[str, Any]],
+                    query_index: np.ndarray) -> np.ndarray:
+        """
+        Confidence for every candidate; query_index[i] is the query candidate i
+        belongs to. Queries: {title, year?, runtime?, studio?}. Candidates are
+        search results: {title, year?, runtime?, studio?}.
+        """
+        if not candidates:
+            return np.zeros(0)
+
+        q_tokens, q_numeric, q_counts, q_title_years = _encode([q.get('title', '') for q in queries])
+        c_tokens, c_numeric, c_counts, c_title_years = _encode([c.get('title', '') for c in candidates])
+
+        # Gather the query side of every pair: (pairs, MAX_TOKENS)
+        pq_tokens = q_tokens[query_index]
+        pq_numeric = q_numeric[query_index]
+        pq_counts = q_counts[query_index]
+
+        # Token-set intersection: compare every query token with every candidate token
+        matches = (pq_tokens[:, :, None] == c_tokens[:, None, :]) & (pq_tokens[:, :, None] >= 0)
+        q_matched = matches.any(axis=2)
+        c_matched = matches.any(axis=1)
+        intersection = q_matched.sum(axis=1).astype(np.float64)
+        union = pq_counts + c_counts - intersection
+        with np.errstate(divide='ignore', invalid='ignore'):
+            jaccard = np.where(union > 0, intersection / union, 0.0)
+            containment = np.where(pq_counts > 0, intersection / pq_counts, 0.0)
+        title_score = 0.5 * jaccard + 0.5 * containment
+
+        # An unmatched number on either side usually means a sequel or another volume
+        number_mismatch = (pq_numeric & ~q_matched).any(axis=1) | (c_numeric & ~c_matched).any(axis=1)
+        title_score = np.where(number_mismatch, title_score * 0.6, title_score)
+
+        weights = self.weights
+        total = np.full(len(candidates), weights['title'])
+        score = title_score * weights['title']
+
+        # Year: explicit field first, else a year mentioned in the title
+        q_years = _hint_array([q.get('year') for q in queries])
+        q_years = np.where(np.isnan(q_years), np.where(q_title_years > 0, q_title_years, np.nan), q_years)[query_index]
+        c_years = _hint_array([c.get('year') for c in candidates])
+        c_years = np.where(np.isnan(c_years), np.where(c_title_years > 0, c_title_years, np.nan), c_years)
+        has_year = ~np.isnan(q_years) & ~np.isnan(c_years)
+        year_score = np.clip(1.0 - np.abs(np.nan_to_num(q_years - c_years)) / 3.0, 0.0, 1.0)
+        score += np.where(has_year, year_score * weights['year'], 0.0)
+        total += np.where(has_year, weights['year'], 0.0)
+
+        # Runtime (minutes): full credit within 3%, none beyond 20%
+        q_runtime = _hint_array([q.get('runtime') for q in queries])[query_index]
+        c_runtime = _hint_array([c.get('runtime') for c in candidates])
+        has_runtime = ~np.isnan(q_runtime) & ~np.isnan(c_runtime) & (q_runtime > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            deviation = np.abs(q_runtime - c_runtime) / q_runtime
+        runtime_score = np.clip((0.2 - np.nan_to_num(deviation, nan=1.0)) / 0.17, 0.0, 1.0)
+        score += np.where(has_runtime, runtime_score * weights['runtime'], 0.0)
+        total += np.where(has_runtime, weights['runtime'], 0.0)
+
+        # Studio: normalized names must agree
+        q_studios = np.array([normalize_name(q.get('studio') or '') for q in queries], dtype=object)[query_index]
+        c_studios = np.array([normalize_name(c.get('studio') or '') for c in candidates], dtype=object)
+        has_studio = (q_studios != '') & (c_studios != '')
+        studio_score = (q_studios == c_studios).astype(np.float64)
+        score += np.where(has_studio, studio_score * weights['studio'], 0.0)
+        total += np.where(has_studio, weights['studio'], 0.0)
+
+        return np.round(score / total, 3)
+
+    def rank(self, queries: List[Dict[str, Any]],
+             candidates: List[List[Dict[str, Any]]]) -> List[List[Dict[str, Any]]]:
+        """
+        Rank the candidate lists of many queries at once. Returns, per query,
+        its candidates sorted by confidence with 'confidence' and 'auto_accept' set.
+        """
+        flat = [candidate for group in candidates for candidate in group]
+        query_index = np.repeat(np.arange(len(queries)), [len(group) for group in candidates])
+        scores = self.score_pairs(queries, flat, query_index)
+
+        ranked: List[List[Dict[str, Any]]] = [[] for _ in queries]
+        for candidate, owner, confidence in zip(flat, query_index, scores):
+            ranked[owner].append({
+                **candidate,
+                'confidence': float(confidence),
+                'auto_accept': bool(confidence >= self.accept_threshold)
+            })
+        for group in ranked:
+            # Stable sort: equal scores keep the source's own ordering
+            group.sort(key=lambda c: c['confidence'], reverse=True)
+        return ranked
+
+    def best(self, query: Dict[str, Any], candidates: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Top-ranked candidate for one query, or None without candidates"""
+        if not candidates:
+            return None
+        return self.rank([query], [candidates])[0][0]
+
+
+# Global instance
+candidate_ranker = None
+
+def get_candidate_ranker() -> CandidateRanker:
+    """Get or create the global candidate ranker instance"""
+    global candidate_ranker
+    if candidate_ranker is None:
+        candidate_ranker = CandidateRanker()
+    return candidate_ranker
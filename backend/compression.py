@@ -0,0 +1,168 @@
+import os
+import zlib
+import logging
+from typing import Optional, List
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Streams that must reach the client event by event, and formats that are already compressed
+UNCOMPRESSED_TYPES = ('text/event-stream', 'image/', 'video/', 'audio/', 'application/zip', 'application/gzip')
+
+
+def accepted_encodings(accept_encoding: str) -> List[str]:
+    """Codings from an Accept-Encoding header that the client did not refuse (q=0)"""
+    accepted = []
+    for part in accept_encoding.lower().split(','):
+        coding, _, params = part.strip().partition(';')
+        q = params.strip()
+        if q.startswith('q='):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.append(coding.strip())
+    return accepted
+
+
+class _GzipEncoder:
+    name = 'gzip'
+
+    def __init__(self, level: int):
+        # wbits 31: gzip container
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        # Sync flush, so every streamed chunk can be decoded as it arrives
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b'') -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class _BrotliEncoder:
+    name = 'br'
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes = b'') -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    gzip/brotli response compression above a size threshold.
+
+    Brotli is preferred when the client accepts it and the brotli package is
+    installed. Streamed responses (NDJSON batches, /api/movies) are compressed
+    chunk by chunk; event streams, 304s and already encoded bodies pass through.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: Optional[int] = None):
+        self.app = app
+        if minimum_size is None:
+            minimum_size = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+        self.minimum_size = minimum_size
+        self.gzip_level = int(os.environ.get('COMPRESSION_GZIP_LEVEL', '6'))
+        # Low brotli qualities compress dynamic JSON about as well as gzip -9, much faster
+        self.brotli_quality = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', '4'))
+        self.enabled = os.environ.get('COMPRESSION_ENABLED', 'true').lower() == 'true'
+
+    def _encoder(self, scope: Scope):
+        accepted = accepted_encodings(Headers(scope=scope).get('accept-encoding', ''))
+        if brotli is not None and 'br' in accepted:
+            return _BrotliEncoder(self.brotli_quality)
+        if 'gzip' in accepted:
+            return _GzipEncoder(self.gzip_level)
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http' or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+        encoder = self._encoder(scope)
+        if encoder is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressionResponder(self.app, encoder, self.minimum_size)(scope, receive, send)
+
+
+class _CompressionResponder:
+    def __init__(self, app: ASGIApp, encoder, minimum_size: int):
+        self.app = app
+        self.encoder = encoder
+        self.minimum_size = minimum_size
+        self.send: Optional[Send] = None
+        self.start_message: Optional[Message] = None
+        self.passthrough = False
+        self.started = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    def _skip(self, headers: Headers) -> bool:
+        content_type = headers.get('content-type', '').lower()
+        return (
+            self.start_message['status'] < 200
+            or self.start_message['status'] in (204, 304)
+            or 'content-encoding' in headers
+            or content_type.startswith(UNCOMPRESSED_TYPES)
+        )
+
+    async def send_compressed(self, message: Message):
+        if message['type'] == 'http.response.start':
+            # Held back until the first body chunk shows whether to compress
+            self.start_message = message
+            self.passthrough = self._skip(Headers(raw=message['headers']))
+            return
+        if message['type'] != 'http.response.body':
+            await self.send(message)
+            return
+
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+
+        if self.passthrough:
+            if not self.started:
+                self.started = True
+                await self.send(self.start_message)
+            await self.send(message)
+            return
+
+        if not self.started:
+            self.started = True
+            headers = MutableHeaders(raw=self.start_message['headers'])
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+
+            headers['Content-Encoding'] = self.encoder.name
+            headers.add_vary_header('Accept-Encoding')
+            if more_body:
+                del headers['Content-Length']
+                body = self.encoder.chunk(body)
+            else:
+                body = self.encoder.finish(body)
+                headers['Content-Length'] = str(len(body))
+            await self.send(self.start_message)
+            await self.send({'type': 'http.response.body', 'body': body, 'more_body': more_body})
+            return
+
+        body = self.encoder.chunk(body) if more_body else self.encoder.finish(body)
+        await self.send({'type': 'http.response.body', 'body': body, 'more_body': more_body})
@@ -0,0 +1,34 @@
+import os
+import struct
+from pathlib import Path
+from typing import Optional
+
+# Bytes read from the start and from the end of the file
+HASH_CHUNK_SIZE = 64 * 1024
+
+# Smaller files have too little content to identify them reliably
+MIN_HASH_FILE_SIZE = HASH_CHUNK_SIZE
+
+
+def compute_content_hash(file_path: Path) -> Optional[str]:
+    """
+    OpenSubtitles-style partial content hash: the file size plus the sum of
+    the first and last 64 KiB read as little-endian 64-bit words, modulo 2^64.
+
+    Two reads per file regardless of its size, so it is cheap enough to run
+    on every detected video, and it survives renames and moves. Returns a
+    16-character hex string, or None for files too small to identify.
+    """
+    size = os.path.getsize(file_path)
+    if size < MIN_HASH_FILE_SIZE:
+        return None
+
+    checksum = size
+    with open(file_path, 'rb') as f:
+        for offset in (0, max(0, size - HASH_CHUNK_SIZE)):
+            f.seek(offset)
+            chunk = f.read(HASH_CHUNK_SIZE)
+            words = len(chunk) // 8
+            checksum += sum(struct.unpack(f'<{words}Q', chunk[:words * 8]))
+            checksum &= 0xFFFFFFFFFFFFFFFF
+    return f"{checksum:016x}"
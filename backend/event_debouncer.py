@@ -0,0 +1,118 @@
+import os
+import logging
+from pathlib import Path
+from typing import Optional, Dict, Any, Callable, Awaitable
+
+logger = logging.getLogger(__name__)
+
+# Names download clients and copy tools write to before renaming into place
+TEMP_SUFFIXES = {
+    '.part', '.partial', '.tmp', '.temp', '.crdownload', '.download',
+    '.filepart', '.!qb', '.!ut', '.bc!', '.aria2__temp'
+}
+
+# Event kinds after which the file is known to be completely written
+COMPLETE_KINDS = {'closed', 'moved'}
+
+
+def is_temp_name(path: Path) -> bool:
+    return path.suffix.lower() in TEMP_SUFFIXES
+
+
+class EventDebouncer:
+    """
+    Coalesces filesystem events per path over a short quiet window.
+
+    Every created/modified/closed/moved event for a path restarts its timer;
+    once the path has been quiet for `window` seconds a single job is emitted.
+    A temp file renamed to its final name (x.mkv.part -> x.mkv) collapses
+    into one job for the final name. Must be used from the event loop thread.
+    """
+
+    def __init__(self, loop, window: float,
+                 on_ready: Callable[[Path, Optional[Path], bool], Awaitable],
+                 on_deleted: Callable[[Path], Awaitable]):
+        self.loop = loop
+        self.window = window
+        self.on_ready = on_ready
+        self.on_deleted = on_deleted
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        self.stats = {
+            'events_received': 0,
+            'events_suppressed': 0,
+            'temp_renames_collapsed': 0,
+            'jobs_emitted': 0
+        }
+
+    def push(self, kind: str, path: Path, src: Optional[Path] = None):
+        """Record an event: created, modified, closed, moved (with src) or deleted"""
+        self.stats['events_received'] += 1
+        key = str(path)
+
+        if kind == 'deleted':
+            record = self.pending.pop(key, None)
+            if record:
+                # Its other events were counted as they were coalesced
+                record['timer'].cancel()
+                self.stats['events_suppressed'] += 1
+            if not is_temp_name(path):
+                self.loop.create_task(self.on_deleted(path))
+            return
+
+        if kind == 'moved' and src is not None:
+            src_record = self.pending.pop(str(src), None)
+            if src_record:
+                src_record['timer'].cancel()
+                self.stats['events_suppressed'] += 1
+            if is_temp_name(src):
+                # Download finished under its final name: a new file, not a rename
+                self.stats['temp_renames_collapsed'] += 1
+                src = None
+            elif src_record:
+                # Renamed again before the window closed: keep the original source
+                src = src_record['src'] if src_record['kind'] == 'moved' else None
+
+        record = self.pending.get(key)
+        if record:
+            record['timer'].cancel()
+            record['events'] += 1
+            self.stats['events_suppressed'] += 1
+            if kind == 'moved':
+                record['src'] = src
+            if kind == 'moved' or record['kind'] != 'moved':
+                record['kind'] = kind
+            # Any write after a close means the file is being written again
+            record['ready'] = kind in COMPLETE_KINDS
+        else:
+            record = {
+                'kind': kind,
+                'src': src,
+                'ready': kind in COMPLETE_KINDS,
+                'events': 1,
+                'temp': is_temp_name(path)
+            }
+            self.pending[key] = record
+
+        record['timer'] = self.loop.call_later(self.window, self._fire, key)
+
+    def _fire(self, key: str):
+        record = self.pending.pop(key, None)
+        if not record:
+            return
+        if record['temp']:
+            # Never renamed into place within the window; its events were noise
+            self.stats['events_suppressed'] += 1
+            return
+
+        self.stats['jobs_emitted'] += 1
+        if record['events'] > 1:
+            logger.info(f"Coalesced {record['events']} events for {os.path.basename(key)}")
+        self.loop.create_task(self.on_ready(Path(key), record['src'], record['ready']))
+
+    def cancel_all(self):
+        for record in self.pending.values():
+            record['timer'].cancel()
+        self.pending.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, 'pending_paths': len(self.pending), 'window_seconds': self.window}
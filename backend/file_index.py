@@ -0,0 +1,322 @@
+import os
+import re
+import time
+import asyncio
+import logging
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+from datetime import datetime, timezone
+from pymongo import ASCENDING, UpdateOne, DeleteOne
+
+from folder_scanner import FolderScanner
+from library_stats import get_stats_service
+
+logger = logging.getLogger(__name__)
+
+# Sidecars written next to a video, as (suffix appended to the stem)
+SIDECAR_SUFFIXES = ['.nfo', '-poster.jpg', '-fanart.jpg']
+
+BULK_BATCH_SIZE = 1000
+
+
+def _under(root: str) -> Dict[str, Any]:
+    """Regex filter for a path equal to or below root (uses the index prefix)"""
+    root = root.rstrip(os.sep)
+    return {'$regex': f"^{re.escape(root)}({re.escape(os.sep)}|$)"}
+
+
+class FileIndex:
+    """
+    Persisted index of every video in the watched folders.
+
+    file_index: one document per video
+        {_id: path, dir, size, mtime, inode, nfo_present, last_result, updated_at}
+    dir_index: one document per directory
+        {_id: path, device, mtime, subdirs, updated_at}
+
+    A rescan only lists directories whose mtime changed since the last scan;
+    unchanged directories cost one stat() and reuse the stored subdirectory list.
+    """
+
+    def __init__(self, db, scanner: Optional[FolderScanner] = None):
+        self.db = db
+        self.scanner = scanner or FolderScanner()
+
+    async def ensure_indexes(self):
+        await self.db.file_index.create_index([('dir', ASCENDING)])
+        await self.db.file_index.create_index([('inode', ASCENDING)])
+        await self.db.file_index.create_index([('nfo_present', ASCENDING), ('dir', ASCENDING)])
+        await self.db.processed_files.create_index([('content_hash', ASCENDING), ('status', ASCENDING)])
+        await self._ensure_unique_file_path()
+
+    async def _ensure_unique_file_path(self):
+        """
+        One processed_files record per path. Older databases have a plain
+        file_path index and may hold duplicates: the newest record is kept.
+        """
+        existing = (await self.db.processed_files.index_information()).get('file_path_1')
+        if existing and existing.get('unique'):
+            return
+        duplicates = await self.db.processed_files.aggregate([
+            {'$sort': {'processed_at': -1}},
+            {'$group': {'_id': '$file_path', 'ids': {'$push': '$_id'}, 'n': {'$sum': 1}}},
+            {'$match': {'n': {'$gt': 1}}}
+        ]).to_list(None)
+        stale = [doc_id for group in duplicates for doc_id in group['ids'][1:]]
+        if stale:
+            await self.db.processed_files.delete_many({'_id': {'$in': stale}})
+            logger.info(f"Removed {len(stale)} duplicate processed_files records")
+            await get_stats_service(self.db).reconcile()
+        if existing:
+            await self.db.processed_files.drop_index('file_path_1')
+        await self.db.processed_files.create_index([('file_path', ASCENDING)], unique=True)
+
+    async def _bulk(self, collection, operations: List):
+        for i in range(0, len(operations), BULK_BATCH_SIZE):
+            await collection.bulk_write(operations[i:i + BULK_BATCH_SIZE], ordered=False)
+
+    @staticmethod
+    def _entry_update(entry: Dict[str, Any], now: str) -> Dict[str, Any]:
+        return {
+            'dir': entry['dir'],
+            'size': entry['size'],
+            'mtime': entry['mtime'],
+            'inode': entry['inode'],
+            'nfo_present': entry['nfo_present'],
+            'updated_at': now
+        }
+
+    async def _apply_listing(self, directory: str, listing: Dict[str, Any], stats: Dict[str, int],
+                             renamed: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """
+        Diff one directory listing against the index; returns new/changed entries.
+        Renames detected by inode are appended to `renamed` as {src, dest, last_result}.
+        """
+        now = datetime.now(timezone.utc).isoformat()
+        existing = {doc['_id']: doc async for doc in self.db.file_index.find({'dir': directory})}
+        listed = {entry['path']: entry for entry in listing['files']}
+
+        operations = []
+        changed = []
+
+        # Renames within the directory keep their inode: carry last_result over
+        removed = {path: doc for path, doc in existing.items() if path not in listed}
+        removed_by_inode = {doc.get('inode'): doc for doc in removed.values()}
+
+        for path, entry in listed.items():
+            known = existing.get(path)
+            if known:
+                if (known.get('size'), known.get('mtime'), known.get('inode'), known.get('nfo_present')) == \
+                        (entry['size'], entry['mtime'], entry['inode'], entry['nfo_present']):
+                    continue
+                operations.append(UpdateOne({'_id': path}, {'$set': self._entry_update(entry, now)}))
+                stats['files_updated'] += 1
+                changed.append(entry)
+                continue
+
+            update = self._entry_update(entry, now)
+            renamed_from = removed_by_inode.get(entry['inode'])
+            if renamed_from:
+                update['last_result'] = renamed_from.get('last_result')
+                stats['files_renamed'] += 1
+                if renamed is not None:
+                    renamed.append({'src': renamed_from['_id'], 'dest': path, 'last_result': update['last_result']})
+            else:
+                update['last_result'] = None
+                stats['files_added'] += 1
+                changed.append(entry)
+            operations.append(UpdateOne({'_id': path}, {'$set': update}, upsert=True))
+
+        for path in removed:
+            operations.append(DeleteOne({'_id': path}))
+            stats['files_removed'] += 1
+
+        if operations:
+            await self._bulk(self.db.file_index, operations)
+        return changed
+
+    async def forget_tree(self, directory: str):
+        """Drop index entries for a directory that no longer exists"""
+        await self.db.file_index.delete_many({'dir': _under(directory)})
+        await self.db.dir_index.delete_many({'_id': _under(directory)})
+
+    async def rescan(self, root: str) -> Dict[str, Any]:
+        """
+        Incrementally rescan a folder tree against the persisted index.
+        Returns counters, the new/changed video entries and detected renames.
+        """
+        started = time.monotonic()
+        root = str(Path(root).absolute())
+        known_dirs = {doc['_id']: doc async for doc in self.db.dir_index.find({'_id': _under(root)})}
+
+        stats = {
+            'directories_visited': 0,
+            'directories_listed': 0,
+            'files_added': 0,
+            'files_updated': 0,
+            'files_removed': 0,
+            'files_renamed': 0
+        }
+        changed_entries: List[Dict[str, Any]] = []
+        renamed_entries: List[Dict[str, Any]] = []
+        dir_operations = []
+        now = datetime.now(timezone.utc).isoformat()
+
+        async def visit(directory: str, device: int):
+            async with self.scanner.device_semaphore(device):
+                try:
+                    stat = await asyncio.to_thread(os.stat, directory)
+                except FileNotFoundError:
+                    await self.forget_tree(directory)
+                    return []
+            stats['directories_visited'] += 1
+
+            known = known_dirs.get(directory)
+            if known and known.get('mtime') == stat.st_mtime:
+                return [(path, known.get('device', stat.st_dev)) for path in known.get('subdirs', [])]
+
+            listing = await self.scanner.list_dir(directory, stat.st_dev)
+            if listing.get('error'):
+                return []
+            stats['directories_listed'] += 1
+            changed_entries.extend(await self._apply_listing(directory, listing, stats, renamed_entries))
+
+            subdirs = [subdir['path'] for subdir in listing['subdirs']]
+            if known:
+                for vanished in set(known.get('subdirs', [])) - set(subdirs):
+                    await self.forget_tree(vanished)
+            dir_operations.append(UpdateOne(
+                {'_id': directory},
+                {'$set': {'device': stat.st_dev, 'mtime': stat.st_mtime, 'subdirs': subdirs, 'updated_at': now}},
+                upsert=True
+            ))
+            return [(subdir['path'], subdir['device']) for subdir in listing['subdirs']]
+
+        root_device = (await asyncio.to_thread(os.stat, root)).st_dev
+        pending = {asyncio.create_task(visit(root, root_device))}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    for subdir, device in task.result():
+                        pending.add(asyncio.create_task(visit(subdir, device)))
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if dir_operations:
+            await self._bulk(self.db.dir_index, dir_operations)
+
+        stats['duration_seconds'] = round(time.monotonic() - started, 3)
+        logger.info(f"Rescanned {root}: {stats}")
+        return {'root': root, 'stats': stats, 'changed': changed_entries, 'renamed': renamed_entries}
+
+    async def is_indexed(self, root: str) -> bool:
+        """Whether a folder has been scanned into the index before"""
+        return await self.db.dir_index.find_one({'_id': str(Path(root).absolute())}, {'_id': 1}) is not None
+
+    async def files_without_nfo(self, root: str) -> List[str]:
+        """Indexed videos below root that have no NFO sidecar"""
+        cursor = self.db.file_index.find(
+            {'dir': _under(str(Path(root).absolute())), 'nfo_present': False},
+            {'_id': 1}
+        )
+        return [doc['_id'] async for doc in cursor]
+
+    async def get(self, file_path: Path) -> Optional[Dict[str, Any]]:
+        return await self.db.file_index.find_one({'_id': str(file_path)})
+
+    async def upsert_file(self, file_path: Path, **fields):
+        """Record a file seen by a monitor event (stat data is refreshed)"""
+        update = {'dir': str(file_path.parent), 'updated_at': datetime.now(timezone.utc).isoformat()}
+        check_nfo = 'nfo_present' not in fields
+
+        def stat_file():
+            # Off the event loop: stat can block for seconds on network shares
+            stat = file_path.stat()
+            return stat, check_nfo and file_path.with_suffix('.nfo').exists()
+
+        try:
+            stat, nfo_present = await asyncio.to_thread(stat_file)
+        except FileNotFoundError:
+            return
+        update.update({'size': stat.st_size, 'mtime': stat.st_mtime, 'inode': stat.st_ino})
+        update['nfo_present'] = fields.pop('nfo_present', nfo_present)
+        update.update(fields)
+        await self.db.file_index.update_one({'_id': str(file_path)}, {'$set': update}, upsert=True)
+
+    async def record_result(self, file_path: Path, result: str, nfo_present: Optional[bool] = None,
+                            content_hash: Optional[str] = None):
+        """Store the outcome of processing a file"""
+        fields = {'last_result': result}
+        if nfo_present is not None:
+            fields['nfo_present'] = nfo_present
+        if content_hash:
+            fields['content_hash'] = content_hash
+        await self.upsert_file(file_path, **fields)
+
+    async def remove(self, file_path: Path):
+        await self.db.file_index.delete_one({'_id': str(file_path)})
+
+    @staticmethod
+    def move_sidecars(src_path: Path, dest_path: Path) -> bool:
+        """
+        Move a video's sidecars to follow a rename; False if the NFO could not
+        be moved. Blocking: run it with asyncio.to_thread.
+        """
+        nfo_moved = True
+        for suffix in SIDECAR_SUFFIXES:
+            src_sidecar = src_path.parent / f"{src_path.stem}{suffix}"
+            dest_sidecar = dest_path.parent / f"{dest_path.stem}{suffix}"
+            if src_sidecar.exists() and not dest_sidecar.exists():
+                try:
+                    os.replace(src_sidecar, dest_sidecar)
+                except OSError as e:
+                    logger.warning(f"Could not move sidecar {src_sidecar.name}: {str(e)}")
+                    if suffix == '.nfo':
+                        nfo_moved = False
+        return nfo_moved
+
+    async def move_processed(self, filter_: Dict[str, Any], dest_path: Path, **fields) -> bool:
+        """
+        Point the processed_files record matching filter_ at dest_path.
+        file_path is unique, so a record already stored for dest_path (an
+        earlier failure, say) gives way to the moved one.
+        """
+        record = await self.db.processed_files.find_one(filter_, {'_id': 1})
+        if not record:
+            return False
+        stats = get_stats_service(self.db)
+        stale = await self.db.processed_files.find_one_and_delete(
+            {'file_path': str(dest_path), '_id': {'$ne': record['_id']}}, projection={'status': 1}
+        )
+        if stale:
+            await stats.record_processed_file(stale.get('status'), removed=True)
+        await self.db.processed_files.update_one(
+            {'_id': record['_id']},
+            {'$set': {'file_path': str(dest_path), 'nfo_path': str(dest_path.with_suffix('.nfo')), **fields}}
+        )
+        await stats.touch('processed_files')
+        return True
+
+    async def rename(self, src_path: Path, dest_path: Path) -> Optional[Dict[str, Any]]:
+        """
+        Move an index entry (and the video's sidecars) to a new path.
+        Returns the previous entry, or None if src was not indexed.
+        """
+        entry = await self.get(src_path)
+        if not entry:
+            return None
+
+        nfo_present = entry.get('nfo_present', False)
+        if not await asyncio.to_thread(self.move_sidecars, src_path, dest_path):
+            nfo_present = False
+        if src_path.parent != dest_path.parent and nfo_present:
+            nfo_present = await asyncio.to_thread(dest_path.with_suffix('.nfo').exists)
+
+        entry.pop('_id')
+        await self.db.file_index.delete_one({'_id': str(src_path)})
+        await self.upsert_file(dest_path, last_result=entry.get('last_result'), nfo_present=nfo_present)
+        await self.move_processed({'file_path': str(src_path)}, dest_path)
+        logger.info(f"Index updated for rename: {src_path.name} -> {dest_path.name}")
+        return entry
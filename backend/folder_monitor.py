@@ -1,31 +1,66 @@
 import os
 import re
 import time
+import shutil
 import logging
+import concurrent.futures
+from collections import deque
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Set
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 import asyncio
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
 from datetime import datetime, timezone
 import xml.etree.ElementTree as ET
 from xml.dom import minidom
+from library_stats import get_stats_service
+from inotify_watcher import (
+    InotifyWatcher, inotify_supported,
+    IN_CLOSE_WRITE, IN_MOVED_FROM, IN_MOVED_TO, IN_CREATE, IN_DELETE, IN_ISDIR
+)
+from folder_scanner import FolderScanner, VIDEO_EXTENSIONS, list_subdirectories
+from file_index import FileIndex, SIDECAR_SUFFIXES
+from content_hash import compute_content_hash
+from event_debouncer import EventDebouncer, is_temp_name
+from polling_watcher import PollingWatcher, is_network_filesystem
+from source_search import MultiSourceSearch, search_source
+from candidate_ranker import get_candidate_ranker
+from retry_scheduler import RetryScheduler
+from work_queue import get_work_queue
+from nfo_merge import update_nfo, atomic_write
+from library_index import normalize_name
+from artwork import get_artwork_downloader
+from nfo_batch import artwork_targets
 
 logger = logging.getLogger(__name__)
 
-# Supported video extensions
-VIDEO_EXTENSIONS = {
-    '.mp4', '.mkv', '.avi', '.mov', '.wmv', '.flv', '.webm',
-    '.m4v', '.mpg', '.mpeg', '.3gp', '.m2ts', '.ts'
-}
+# db.movies bookkeeping that is not part of a movie's metadata
+LIBRARY_ONLY_FIELDS = {'id', 'created_at', 'title_key', 'nfo_path', 'nfo_paths', 'nfo_mtime', 'file_path',
+                       'imported_at', 'performer_ids', 'studio_id'}
+
+def _record_timing(timings: Optional[Dict[str, float]], stage: str, started: float):
+    """Store the duration of a processing stage if the caller asked for timings"""
+    if timings is not None:
+        timings[stage] = round(time.monotonic() - started, 3)
 
 class MovieFileHandler(FileSystemEventHandler):
-    """Handles new video file detection"""
+    """
+    Handles new video file detection
+
+    Runs on the watchdog observer thread, so events are handed over to the
+    monitor service's event loop (and its debounce stage) instead of being
+    processed here.
+    """
     
     def __init__(self, monitor_service):
         self.monitor_service = monitor_service
-        self.processing = set()  # Track files being processed
+    
+    @staticmethod
+    def _is_relevant(path: Path) -> bool:
+        # Temp names are tracked too, so a later rename to .mkv collapses into one job
+        return path.suffix.lower() in VIDEO_EXTENSIONS or is_temp_name(path)
         
     def on_created(self, event):
         """Called when a file is created"""
@@ -33,34 +68,38 @@ class MovieFileHandler(FileSystemEventHandler):
             return
             
         file_path = Path(event.src_path)
+        if self._is_relevant(file_path):
+            logger.info(f"New file detected: {file_path.name}")
+            # Creation fires before the copy finishes, so the file is not ready yet
+            self.monitor_service.submit_threadsafe('created', file_path)
+    
+    def on_modified(self, event):
+        """Called when a file is written to"""
+        if event.is_directory:
+            return
         
-        # Check if it's a video file
-        if file_path.suffix.lower() in VIDEO_EXTENSIONS:
-            # Avoid duplicate processing
-            if str(file_path) not in self.processing:
-                self.processing.add(str(file_path))
-                logger.info(f"New video file detected: {file_path.name}")
-                
-                # Schedule async processing
-                asyncio.create_task(
-                    self.monitor_service.process_new_file(file_path)
-                )
+        file_path = Path(event.src_path)
+        if self._is_relevant(file_path):
+            self.monitor_service.submit_threadsafe('modified', file_path)
     
     def on_moved(self, event):
-        """Called when a file is moved into the watched folder"""
+        """Called when a file is moved into (or renamed inside) the watched folder"""
         if event.is_directory:
             return
             
         dest_path = Path(event.dest_path)
+        if self._is_relevant(dest_path):
+            logger.info(f"File moved into folder: {dest_path.name}")
+            self.monitor_service.submit_threadsafe('moved', dest_path, Path(event.src_path))
+    
+    def on_deleted(self, event):
+        """Called when a file is deleted"""
+        if event.is_directory:
+            return
         
-        if dest_path.suffix.lower() in VIDEO_EXTENSIONS:
-            if str(dest_path) not in self.processing:
-                self.processing.add(str(dest_path))
-                logger.info(f"Video file moved into folder: {dest_path.name}")
-                
-                asyncio.create_task(
-                    self.monitor_service.process_new_file(dest_path)
-                )
+        file_path = Path(event.src_path)
+        if self._is_relevant(file_path):
+            self.monitor_service.submit_threadsafe('deleted', file_path)
 
 class FolderMonitorService:
     """Service for monitoring folders and auto-generating NFO files"""
@@ -68,11 +107,73 @@ class FolderMonitorService:
     def __init__(self, db):
         self.db = db
         self.observer = None
+        self.inotify = None
+        self.observed_watches = {}  # folder -> watchdog ObservedWatch
         self.watched_folders = []
         self.is_running = False
         self.preferred_source = "radvideo"  # Default to RadVideo (most reliable search)
         self.auto_scrape_enabled = True
         
+        # single: preferred source only; fanout (opt-in): query every searchable source concurrently
+        self.search_mode = os.environ.get('MONITOR_SEARCH_MODE', 'single')
+        # Match filenames against titles already in db.movies before searching the web
+        self.library_lookup = os.environ.get('MONITOR_LIBRARY_LOOKUP', 'true').lower() == 'true'
+        self.multi_search = MultiSourceSearch()
+        self.retries = RetryScheduler(db, self)
+        self.artwork = get_artwork_downloader(db)
+        
+        # auto: native inotify on Linux, watchdog elsewhere, polling for network shares
+        self.watch_backend = os.environ.get('MONITOR_WATCH_BACKEND', 'auto')
+        self.active_backend = None
+        self.poller = None
+        self.poll_intervals: Dict[str, float] = {}  # folder -> base polling interval override
+        self.scanner = FolderScanner()
+        self.file_index = FileIndex(db, self.scanner)
+        self._pending_moves: Dict[int, tuple] = {}  # inotify cookie -> (moved-from path, is_directory)
+        
+        # Events for the same path within this window become a single job
+        self.debounce_window = float(os.environ.get('MONITOR_DEBOUNCE_SECONDS', '1.0'))
+        self.debouncer = None
+        
+        # Write-completion fallback for events that do not guarantee a complete file
+        self.stability_interval = float(os.environ.get('MONITOR_STABILITY_INTERVAL', '1.0'))
+        self.stability_checks = int(os.environ.get('MONITOR_STABILITY_CHECKS', '2'))
+        self.stability_timeout = float(os.environ.get('MONITOR_STABILITY_TIMEOUT', '21600'))
+        
+        # Worker pipeline: watchdog thread -> bounded queue -> worker pool
+        self.worker_count = int(os.environ.get('MONITOR_WORKERS', '2'))
+        self.queue_size = int(os.environ.get('MONITOR_QUEUE_SIZE', '500'))
+        # Outlives a queued file's wait for stability plus its processing
+        self.in_flight_ttl = int(os.environ.get('MONITOR_IN_FLIGHT_TTL', str(int(self.stability_timeout) + 3600)))
+        self.enqueue_timeout = float(os.environ.get('MONITOR_ENQUEUE_TIMEOUT', '300'))
+        # local: in-process asyncio queue; mongo: work_queue collection shared by
+        # every backend process and host (leased jobs, one processor per file)
+        self.queue_backend = os.environ.get('MONITOR_QUEUE_BACKEND', 'local')
+        # SCRAPE_EXECUTION=worker: this process only watches and enqueues,
+        # standalone workers (worker.py) do the processing
+        self.consume_jobs = os.environ.get('SCRAPE_EXECUTION', 'inline') != 'worker'
+        if not self.consume_jobs:
+            self.queue_backend = 'mongo'
+        self.work_queue = get_work_queue(db) if self.queue_backend == 'mongo' else None
+        self.loop = None
+        self.queue = None
+        self.stopping = False  # set while stopping: releases observer threads waiting for queue space
+        self.workers = []
+        self.in_flight: Dict[str, float] = {}  # path -> time it was queued
+        self.active: Set[str] = set()  # paths a worker is processing right now; never expired
+        self.backlog = 0  # mongo mode: queued and leased monitor_file jobs, for backpressure
+        self._backlog_task = None
+        self.metrics = {
+            'enqueued_total': 0,
+            'processed_total': 0,
+            'duplicates_skipped': 0,
+            'dropped_total': 0,
+            'busy_workers': 0,
+            'processing_seconds_total': 0.0,
+            'last_processed_at': None
+        }
+        self._completions = deque()  # completion timestamps for throughput
+        
     async def load_config(self):
         """Load monitoring configuration from database"""
         config = await self.db.monitor_config.find_one({"_id": "main"})
@@ -80,6 +181,13 @@ class FolderMonitorService:
             self.watched_folders = config.get('watched_folders', [])
             self.preferred_source = config.get('preferred_source', 'radvideo')
             self.auto_scrape_enabled = config.get('auto_scrape_enabled', True)
+            self.search_mode = config.get('search_mode', self.search_mode)
+            self.worker_count = config.get('worker_count', self.worker_count)
+            self.queue_size = config.get('queue_size', self.queue_size)
+            self.watch_backend = config.get('watch_backend', self.watch_backend)
+            self.poll_intervals = {
+                item['folder']: item['interval'] for item in config.get('poll_intervals', [])
+            }
             logger.info(f"Loaded config: {len(self.watched_folders)} folders, source: {self.preferred_source}")
     
     async def save_config(self):
@@ -89,6 +197,14 @@ class FolderMonitorService:
             'watched_folders': self.watched_folders,
             'preferred_source': self.preferred_source,
             'auto_scrape_enabled': self.auto_scrape_enabled,
+            'search_mode': self.search_mode,
+            'worker_count': self.worker_count,
+            'queue_size': self.queue_size,
+            'watch_backend': self.watch_backend,
+            # Stored as a list: folder paths may contain dots, which Mongo keys cannot
+            'poll_intervals': [
+                {'folder': folder, 'interval': interval} for folder, interval in self.poll_intervals.items()
+            ],
             'updated_at': datetime.now(timezone.utc).isoformat()
         }
         await self.db.monitor_config.update_one(
@@ -118,7 +234,7 @@ class FolderMonitorService:
             
             # Start monitoring if not already running
             if self.is_running:
-                self._watch_folder(folder_str)
+                await self._watch_folder(folder_str)
             
             logger.info(f"Added watched folder: {folder_str}")
             return True
@@ -133,16 +249,409 @@ class FolderMonitorService:
         if folder_str in self.watched_folders:
             self.watched_folders.remove(folder_str)
             await self.save_config()
+            
+            if self.is_running:
+                self._unwatch_folder(folder_str)
             logger.info(f"Removed watched folder: {folder_str}")
             return True
         
         return False
     
-    def _watch_folder(self, folder_path: str):
-        """Add a folder to the observer"""
-        event_handler = MovieFileHandler(self)
-        self.observer.schedule(event_handler, folder_path, recursive=False)
-        logger.info(f"Now watching: {folder_path}")
+    def set_poll_interval(self, folder_path: str, interval: Optional[float]):
+        """Override (or with None, reset) the base polling interval of a folder"""
+        folder_str = str(Path(folder_path).absolute())
+        if interval:
+            self.poll_intervals[folder_str] = interval
+        else:
+            self.poll_intervals.pop(folder_str, None)
+        if self.poller and folder_str in self.poller.folders:
+            self.poller.add_folder(folder_str, interval)
+    
+    def _should_poll(self, folder_path: str) -> bool:
+        """Network shares are polled: changes made by other hosts never raise events"""
+        if self.active_backend == 'polling':
+            return True
+        return self.watch_backend == 'auto' and is_network_filesystem(folder_path)
+    
+    async def _watch_folder(self, folder_path: str):
+        """Add a folder (recursively) to the active watcher"""
+        if folder_path in self.watched_folders and self._should_poll(folder_path):
+            self.poller.add_folder(folder_path, self.poll_intervals.get(folder_path))
+        elif self.inotify:
+            # inotify watches are per directory, so register the whole tree
+            directories = await asyncio.to_thread(list_subdirectories, folder_path)
+            for directory in directories:
+                try:
+                    self.inotify.add_watch(directory)
+                except OSError as e:
+                    logger.warning(str(e))
+            logger.info(f"Now watching: {folder_path} ({len(directories)} directories, inotify)")
+        else:
+            event_handler = MovieFileHandler(self)
+            self.observed_watches[folder_path] = self.observer.schedule(event_handler, folder_path, recursive=True)
+            logger.info(f"Now watching: {folder_path} (watchdog)")
+    
+    async def _watch_new_directory(self, directory: Path, moved: bool, src: Optional[Path] = None):
+        """
+        A directory appeared inside a watched tree: watch it and pick up the
+        videos it already contains (they fire no events of their own).
+        """
+        if src is not None:
+            await self.file_index.forget_tree(str(src))
+        await self._watch_folder(str(directory))
+        result = await self.scanner.scan(str(directory))
+        for entry in result['files']:
+            if not entry['nfo_present']:
+                # Files inside a moved directory are complete, copied ones may not be
+                await self.enqueue(Path(entry['path']), ready=moved)
+    
+    def _unwatch_folder(self, folder_path: str):
+        """Remove a folder from the active watcher"""
+        if self.poller and folder_path in self.poller.folders:
+            self.poller.remove_folder(folder_path)
+        elif self.inotify:
+            self.inotify.remove_watch(folder_path)
+        elif folder_path in self.observed_watches:
+            self.observer.unschedule(self.observed_watches.pop(folder_path))
+        logger.info(f"Stopped watching: {folder_path}")
+    
+    def _on_inotify_event(self, path: Path, mask: int, cookie: int):
+        """Native inotify callback, runs directly on the event loop"""
+        if mask & IN_MOVED_FROM:
+            # Paired with IN_MOVED_TO by cookie; unpaired means it left the watched tree
+            self._pending_moves[cookie] = (path, bool(mask & IN_ISDIR))
+            self.loop.call_later(2, self._expire_move, cookie)
+            return
+        
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                src = self._pending_moves.pop(cookie, (None, True))[0] if mask & IN_MOVED_TO else None
+                asyncio.create_task(self._watch_new_directory(path, moved=bool(mask & IN_MOVED_TO), src=src))
+            return
+        if path.suffix.lower() not in VIDEO_EXTENSIONS and not is_temp_name(path):
+            return
+        
+        if mask & IN_DELETE:
+            self.debouncer.push('deleted', path)
+        elif mask & IN_CLOSE_WRITE:
+            self.debouncer.push('closed', path)
+        elif mask & IN_MOVED_TO:
+            src = self._pending_moves.pop(cookie, (None, False))[0]
+            self.debouncer.push('moved', path, src)
+        else:
+            return
+        
+        if self._queue_full() and not self.inotify.paused:
+            # Backpressure: leave further events in the kernel queue until there is room
+            self.inotify.pause()
+            asyncio.create_task(self._resume_when_drained())
+    
+    async def _resume_when_drained(self):
+        while self._queue_full():
+            await asyncio.sleep(0.1)
+        if self.inotify:
+            self.inotify.resume()
+    
+    def _expire_move(self, cookie: int):
+        """A moved-from path was never moved back into a watched folder"""
+        pending = self._pending_moves.pop(cookie, None)
+        if pending:
+            path, is_directory = pending
+            if is_directory:
+                asyncio.create_task(self.file_index.forget_tree(str(path)))
+            elif self.debouncer:
+                self.debouncer.push('deleted', path)
+    
+    async def _on_debounced(self, file_path: Path, src_path: Optional[Path], ready: bool):
+        """A path has been quiet for the debounce window: turn it into one job"""
+        if src_path is not None:
+            await self.handle_moved(src_path, file_path)
+        else:
+            await self.enqueue(file_path, ready=ready)
+    
+    async def _on_poll_changes(self, folder: str, result: Dict[str, Any], baseline: bool):
+        """
+        A poll found changes. The index is already up to date, so only the
+        follow-up work is left: queue new videos and move renamed sidecars.
+        """
+        if baseline:
+            logger.info(f"Indexed {folder} for polling: {result['stats']}")
+            return
+        
+        for rename in result['renamed']:
+            src_path, dest_path = Path(rename['src']), Path(rename['dest'])
+            if rename['last_result'] == 'success':
+                if await asyncio.to_thread(self.file_index.move_sidecars, src_path, dest_path):
+                    await self.file_index.upsert_file(dest_path)
+                logger.info(f"Processed file renamed, sidecars moved: {src_path.name} -> {dest_path.name}")
+            elif not await asyncio.to_thread(dest_path.with_suffix('.nfo').exists):
+                await self.enqueue(dest_path, ready=True)
+        
+        for entry in result['changed']:
+            if not entry['nfo_present']:
+                # Polling sees files mid-copy, so they still have to settle
+                await self.enqueue(Path(entry['path']), ready=False)
+    
+    async def _on_deleted(self, file_path: Path):
+        if file_path.suffix.lower() in VIDEO_EXTENSIONS:
+            await self.file_index.remove(file_path)
+    
+    async def handle_moved(self, src_path: Optional[Path], dest_path: Path):
+        """
+        A video was renamed or moved into a watched folder. Known, already
+        processed files keep their metadata; anything else is queued.
+        """
+        if src_path is not None:
+            entry = await self.file_index.rename(src_path, dest_path)
+            if entry and entry.get('last_result') == 'success':
+                logger.info(f"Processed file renamed, sidecars moved: {src_path.name} -> {dest_path.name}")
+                return
+        await self.enqueue(dest_path, ready=True)
+    
+    async def _push_event(self, kind: str, file_path: Path, src_path: Optional[Path] = None):
+        while kind != 'deleted' and self._queue_full():
+            if self.stopping:
+                return
+            await asyncio.sleep(0.1)
+        if self.debouncer and not self.stopping:
+            self.debouncer.push(kind, file_path, src_path)
+    
+    def _queue_full(self) -> bool:
+        """
+        Backpressure check for watcher events: the local queue is full, or in
+        mongo mode the shared monitor_file backlog has reached queue_size
+        """
+        if self.queue is None:
+            return False
+        if self.work_queue:
+            return self.backlog >= self.queue_size
+        return self.queue.full()
+    
+    async def _track_backlog(self):
+        """Mongo mode: refresh the shared backlog size used by _queue_full()"""
+        while True:
+            try:
+                self.backlog = await self.work_queue.count_active('monitor_file')
+            except Exception as e:
+                logger.warning(f"Could not read the work queue backlog: {str(e)}")
+            await asyncio.sleep(1)
+    
+    def submit_threadsafe(self, kind: str, file_path: Path, src_path: Optional[Path] = None):
+        """
+        Hand a filesystem event from an observer thread to the event loop.
+        Blocks the calling thread while the queue is full (backpressure).
+        """
+        if self.stopping:
+            return
+        if self.loop is None or self.loop.is_closed():
+            logger.warning(f"Monitor event loop not available, dropping: {file_path.name}")
+            return
+        
+        future = asyncio.run_coroutine_threadsafe(self._push_event(kind, file_path, src_path), self.loop)
+        try:
+            future.result(timeout=self.enqueue_timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            self.metrics['dropped_total'] += 1
+            logger.warning(f"Monitor queue full for {self.enqueue_timeout}s, dropping: {file_path.name}")
+        except Exception as e:
+            logger.error(f"Failed to enqueue {file_path.name}: {str(e)}")
+    
+    def _expire_in_flight(self):
+        """Forget in-flight entries that never completed"""
+        cutoff = time.monotonic() - self.in_flight_ttl
+        for path in [p for p, queued_at in self.in_flight.items() if queued_at < cutoff and p not in self.active]:
+            logger.warning(f"In-flight entry expired: {path}")
+            del self.in_flight[path]
+    
+    async def enqueue(self, file_path: Path, ready: bool = False) -> bool:
+        """
+        Queue a file for processing, skipping files already queued or in progress.
+        ready=True means the file is known to be completely written.
+        """
+        self._expire_in_flight()
+        
+        key = str(file_path)
+        if key in self.in_flight:
+            self.metrics['duplicates_skipped'] += 1
+            return False
+        
+        if self.work_queue:
+            # The active-key index deduplicates across processes and hosts
+            queued = await self.work_queue.enqueue(
+                'monitor_file', {'path': key, 'ready': ready}, key=f"monitor_file:{key}"
+            )
+            if not queued:
+                self.metrics['duplicates_skipped'] += 1
+                return False
+            self.backlog += 1
+            self.metrics['enqueued_total'] += 1
+            return True
+        
+        await self._put(file_path, ready)
+        return True
+    
+    async def _put(self, file_path: Path, ready: bool, force: bool = False,
+                   done: Optional[asyncio.Future] = None):
+        key = str(file_path)
+        self.in_flight[key] = time.monotonic()
+        try:
+            await self.queue.put((file_path, ready, force, done))
+        except BaseException:
+            self.in_flight.pop(key, None)
+            raise
+        self.metrics['enqueued_total'] += 1
+    
+    async def process(self, file_path: Path, ready: bool = False, force: bool = False,
+                      timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Queue a file like a watcher event and wait for its outcome (backfill).
+        Returns {result, timings}; result is 'skipped' when the file is already
+        queued or in progress, 'timeout' when it did not finish in time.
+        """
+        while self.stopping:
+            await asyncio.sleep(0.1)
+        # Backfills also run while the watcher is stopped
+        self._start_workers()
+        
+        key = str(file_path)
+        if self.work_queue:
+            # Processed by this process's consumers or by worker.py
+            job_id = await self.work_queue.enqueue(
+                'monitor_file', {'path': key, 'ready': ready, 'force': force}, key=f"monitor_file:{key}"
+            )
+            if not job_id:
+                self.metrics['duplicates_skipped'] += 1
+                return {'result': 'skipped', 'timings': {}}
+            self.metrics['enqueued_total'] += 1
+            job = await self.work_queue.wait(job_id, timeout)
+            if job is None:
+                return {'result': 'timeout', 'timings': {}}
+            if job['status'] == 'failed':
+                return {'result': 'failed', 'timings': {}}
+            return job['result']
+        
+        self._expire_in_flight()
+        if key in self.in_flight:
+            self.metrics['duplicates_skipped'] += 1
+            return {'result': 'skipped', 'timings': {}}
+        
+        done = self.loop.create_future()
+        await self._put(file_path, ready, force, done)
+        try:
+            return await asyncio.wait_for(asyncio.shield(done), timeout)
+        except asyncio.TimeoutError:
+            return {'result': 'timeout', 'timings': {}}
+    
+    async def _run_job(self, file_path: Path, ready: bool, force: bool = False,
+                       timings: Optional[Dict[str, float]] = None) -> str:
+        """Process one queued file and account for it in the pipeline metrics"""
+        started = time.monotonic()
+        self.metrics['busy_workers'] += 1
+        try:
+            return await self.process_new_file(file_path, ready=ready, force=force, timings=timings)
+        finally:
+            self.metrics['busy_workers'] -= 1
+            finished = time.monotonic()
+            self.metrics['processed_total'] += 1
+            self.metrics['processing_seconds_total'] += finished - started
+            self.metrics['last_processed_at'] = datetime.now(timezone.utc).isoformat()
+            self._completions.append(finished)
+    
+    async def _worker(self, worker_id: int):
+        """Drain the queue, one file at a time"""
+        while True:
+            file_path, ready, force, done = await self.queue.get()
+            outcome = {'result': 'interrupted', 'timings': {}}
+            self.active.add(str(file_path))
+            try:
+                outcome['result'] = await self._run_job(file_path, ready, force, outcome['timings'])
+            except Exception as e:
+                logger.error(f"Worker {worker_id} failed on {file_path.name}: {str(e)}")
+                outcome['result'] = 'failed'
+            finally:
+                self.active.discard(str(file_path))
+                self.in_flight.pop(str(file_path), None)
+                self.queue.task_done()
+                if done is not None and not done.done():
+                    done.set_result(outcome)
+    
+    async def handle_queue_job(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """work_queue handler for monitor_file jobs"""
+        file_path = Path(payload['path'])
+        if not await asyncio.to_thread(file_path.exists):
+            return {'result': 'missing', 'timings': {}}
+        timings: Dict[str, float] = {}
+        result = await self._run_job(file_path, payload.get('ready', False), payload.get('force', False), timings)
+        return {'result': result, 'timings': timings}
+    
+    def _start_workers(self):
+        """Start the worker pool; a no-op when it is already running"""
+        self.loop = asyncio.get_running_loop()
+        if self.queue is None:
+            # Also kept in mongo mode: it only carries backpressure state there
+            self.queue = asyncio.Queue(maxsize=self.queue_size)
+        if self.work_queue:
+            if self.consume_jobs and 'monitor' not in self.work_queue.consumers:
+                self.work_queue.start({'monitor_file': self.handle_queue_job}, self.worker_count, group='monitor')
+            return
+        if self.workers:
+            return
+        while len(self.workers) < self.worker_count:
+            self.workers.append(asyncio.create_task(self._worker(len(self.workers))))
+        logger.info(f"Started {len(self.workers)} monitor workers (queue size {self.queue_size})")
+    
+    async def _stop_workers(self):
+        if self.work_queue:
+            await self.work_queue.stop('monitor')
+        for task in self.workers:
+            task.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+        # Files still queued are dropped; a waiting backfill retries them later
+        while self.queue is not None and not self.queue.empty():
+            file_path, _, _, done = self.queue.get_nowait()
+            self.in_flight.pop(str(file_path), None)
+            if done is not None and not done.done():
+                done.set_result({'result': 'interrupted', 'timings': {}})
+    
+    async def set_worker_count(self, worker_count: int):
+        """Resize the worker pool"""
+        self.worker_count = max(1, worker_count)
+        if self.is_running:
+            await self._stop_workers()
+            self._start_workers()
+    
+    async def get_distributed_stats(self) -> Optional[Dict[str, Any]]:
+        """Shared backlog and this process's consumer counters (mongo queue only)"""
+        return await self.work_queue.get_stats() if self.work_queue else None
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue depth and throughput metrics for the worker pipeline"""
+        now = time.monotonic()
+        while self._completions and self._completions[0] < now - 60:
+            self._completions.popleft()
+        
+        processed = self.metrics['processed_total']
+        return {
+            'queue_depth': self.backlog if self.work_queue else (self.queue.qsize() if self.queue else 0),
+            'queue_capacity': self.queue_size,
+            'worker_count': self.worker_count,
+            'busy_workers': self.metrics['busy_workers'],
+            'in_flight': len(self.in_flight),
+            'enqueued_total': self.metrics['enqueued_total'],
+            'processed_total': processed,
+            'duplicates_skipped': self.metrics['duplicates_skipped'],
+            'dropped_total': self.metrics['dropped_total'],
+            'files_per_minute': len(self._completions),
+            'avg_processing_seconds': round(self.metrics['processing_seconds_total'] / processed, 2) if processed else None,
+            'last_processed_at': self.metrics['last_processed_at'],
+            'debounce': self.debouncer.get_stats() if self.debouncer else None,
+            'search': self.multi_search.get_stats() if self.search_mode == 'fanout' else None,
+            'polling': self.poller.get_stats() if self.poller else None,
+            'retries': self.retries.get_stats(),
+            'artwork': self.artwork.get_stats()
+        }
     
     async def start_monitoring(self):
         """Start the folder monitoring service"""
@@ -156,15 +665,33 @@ class FolderMonitorService:
             logger.info("No folders configured for monitoring")
             return
         
-        self.observer = Observer()
+        self._start_workers()
+        self.debouncer = EventDebouncer(self.loop, self.debounce_window, self._on_debounced, self._on_deleted)
+        
+        self.poller = PollingWatcher(self.file_index, self._on_poll_changes)
+        
+        use_inotify = self.watch_backend == 'inotify' or (self.watch_backend == 'auto' and inotify_supported())
+        if self.watch_backend == 'polling':
+            self.active_backend = 'polling'
+        elif use_inotify:
+            self.inotify = InotifyWatcher(self.loop, self._on_inotify_event)
+            self.inotify.start()
+            self.active_backend = 'inotify'
+        else:
+            self.observer = Observer()
+            self.active_backend = 'watchdog'
         
         for folder in self.watched_folders:
             if Path(folder).exists():
-                self._watch_folder(folder)
+                await self._watch_folder(folder)
             else:
                 logger.warning(f"Watched folder no longer exists: {folder}")
         
-        self.observer.start()
+        if self.observer:
+            self.observer.start()
+        self.retries.start()
+        if self.work_queue:
+            self._backlog_task = asyncio.create_task(self._track_backlog())
         self.is_running = True
         logger.info("Folder monitoring started")
     
@@ -173,12 +700,39 @@ class FolderMonitorService:
         if not self.is_running:
             return
         
+        # Observer threads blocked on a full queue give up their event within 0.1s
+        self.stopping = True
+        
         if self.observer:
             self.observer.stop()
-            self.observer.join()
+            # Off the loop: the observer thread may still be handing over an event
+            await asyncio.to_thread(self.observer.join)
             self.observer = None
+            self.observed_watches.clear()
+        
+        if self.inotify:
+            self.inotify.close()
+            self.inotify = None
+        
+        if self.poller:
+            await self.poller.close()
+            self.poller = None
+        self.active_backend = None
+        
+        if self.debouncer:
+            self.debouncer.cancel_all()
+            self.debouncer = None
+        
+        await self.retries.stop()
+        if self._backlog_task:
+            self._backlog_task.cancel()
+            self._backlog_task = None
+        await self._stop_workers()
+        self.in_flight.clear()
+        self.queue = None
         
         self.is_running = False
+        self.stopping = False
         logger.info("Folder monitoring stopped")
     
     def extract_movie_info(self, filename: str) -> Dict[str, Any]:
@@ -229,52 +783,49 @@ class FolderMonitorService:
     
     async def search_movie(self, title: str, year: Optional[int] = None) -> Optional[Dict[str, Any]]:
         """
-        Search for a movie using the preferred scraper
+        Search for a movie. In fanout mode every searchable source is queried
+        concurrently (preferred source first choice); the result carries the
+        'source' it must be scraped from.
         """
-        from server import GayDVDEmpireScraper, GEVIScraper, AEBNScraper, RadVideoScraper
+        if self.search_mode == 'fanout':
+            return await self.multi_search.search(title, year, self.preferred_source)
         
         logger.info(f"Searching for: {title} ({year if year else 'no year'}) using {self.preferred_source}")
         
         try:
             # Use the preferred scraper for search
-            if self.preferred_source == "gaydvdempire":
-                results = await GayDVDEmpireScraper.search_movie(title)
-            elif self.preferred_source == "aebn":
-                results = await AEBNScraper.search_movie(title)
-            elif self.preferred_source == "gevi":
-                results = await GEVIScraper.search_movie(title)
-            elif self.preferred_source == "radvideo":
-                results = RadVideoScraper.search_movie(title)
-            else:
+            try:
+                results = await search_source(self.preferred_source, title)
+            except ValueError:
                 logger.warning(f"Unknown source: {self.preferred_source}, using GEVI")
-                results = await GEVIScraper.search_movie(title)
+                results = await search_source('gevi', title)
             
             if not results:
                 logger.warning(f"No results found for: {title}")
                 return None
             
-            # Try to find best match based on year if provided
-            if year:
-                for result in results:
-                    if str(year) in result.get('title', ''):
-                        logger.info(f"Found match with year: {result.get('title')}")
-                        return result
-            
-            # Return first result if no year match
-            logger.info(f"Using first result: {results[0].get('title')}")
-            return results[0]
+            # Rank every result instead of trusting the source's ordering. Ranked
+            # per file, backfill included: searches finish one at a time, and
+            # scoring (~0.7 ms) is negligible next to the search and scrape.
+            match = get_candidate_ranker().best({'title': title, 'year': year}, results)
+            logger.info(f"Best result: {match.get('title')} (confidence {match['confidence']})")
+            return {**match, 'source': self.preferred_source}
             
         except Exception as e:
             logger.error(f"Error searching for movie: {str(e)}")
             return None
     
-    async def scrape_and_generate_nfo(self, movie_id: str, source: str, file_path: Path) -> bool:
+    async def scrape_and_generate_nfo(self, movie_id: str, source: str, file_path: Path,
+                                      timings: Optional[Dict[str, float]] = None,
+                                      content_hash: Optional[str] = None) -> bool:
         """
         Scrape metadata, generate NFO file, and download images
         """
-        from server import GayDVDEmpireScraper, AEBNScraper, GEVIScraper, NFOGenerator, download_image
+        from server import GayDVDEmpireScraper, AEBNScraper, GEVIScraper
         
         try:
+            stage_started = time.monotonic()
+            
             # Scrape metadata based on source
             if source == "gaydvdempire":
                 metadata = await GayDVDEmpireScraper.scrape_movie(movie_id)
@@ -289,106 +840,271 @@ class FolderMonitorService:
                 logger.error(f"Unknown source: {source}")
                 return False
             
-            # Generate NFO content
-            nfo_content = NFOGenerator.generate_nfo(metadata)
+            _record_timing(timings, 'scrape', stage_started)
+            stage_started = time.monotonic()
             
             # Generate NFO file path (same name as video file, but .nfo extension)
             nfo_path = file_path.with_suffix('.nfo')
             
-            # Check if NFO already exists
-            if nfo_path.exists():
+            # Write NFO file atomically, unless one appeared in the meantime
+            action, _ = await asyncio.to_thread(update_nfo, nfo_path, metadata, 'create')
+            if action == 'skipped':
                 logger.info(f"NFO already exists: {nfo_path.name}")
                 return False
             
-            # Write NFO file
-            with open(nfo_path, 'w', encoding='utf-8') as f:
-                f.write(nfo_content)
-            
             logger.info(f"✅ NFO file created: {nfo_path.name}")
+            _record_timing(timings, 'nfo', stage_started)
+            stage_started = time.monotonic()
             
-            # Download images
-            movie_title = file_path.stem  # Use video filename without extension
-            
-            # Download poster/cover
-            if metadata.get('poster_url'):
-                poster_path = file_path.parent / f"{movie_title}-poster.jpg"
-                if download_image(metadata['poster_url'], str(poster_path)):
-                    logger.info(f"✅ Poster downloaded: {poster_path.name}")
+            # Download poster and fanart concurrently, named after the video file
+            targets = artwork_targets(metadata, file_path.parent, file_path.stem)
+            for image in await self.artwork.fetch_many(targets):
+                if image['status'] != 'failed':
+                    saved = f", {image['bytes_saved'] // 1024} KB saved" if image.get('bytes_saved') else ''
+                    logger.info(f"✅ Artwork {image['status']}: {Path(image['path']).name}{saved}")
             
-            # Download fanart/backdrop (if thumb_url exists and is different from poster)
-            if metadata.get('thumb_url') and metadata.get('thumb_url') != metadata.get('poster_url'):
-                fanart_path = file_path.parent / f"{movie_title}-fanart.jpg"
-                if download_image(metadata['thumb_url'], str(fanart_path)):
-                    logger.info(f"✅ Fanart downloaded: {fanart_path.name}")
+            _record_timing(timings, 'artwork', stage_started)
             
             # Save to database
-            await self.log_processed_file(file_path, metadata, nfo_path)
+            await self.log_processed_file(file_path, metadata, nfo_path, content_hash=content_hash)
             
             return True
             
         except Exception as e:
             logger.error(f"Error generating NFO: {str(e)}")
+            await self.log_failed_file(file_path, {'source': source, 'movie_id': movie_id}, str(e))
             return False
     
-    async def process_new_file(self, file_path: Path):
+    async def wait_until_stable(self, file_path: Path) -> bool:
+        """
+        Wait until a file stops growing (size and mtime unchanged across
+        consecutive checks). Returns False if it disappears or never settles.
+        """
+        deadline = time.monotonic() + self.stability_timeout
+        last_signature = None
+        unchanged = 0
+        
+        while True:
+            try:
+                stat = await asyncio.to_thread(file_path.stat)
+            except FileNotFoundError:
+                return False
+            
+            signature = (stat.st_size, stat.st_mtime_ns)
+            if last_signature is None and time.time() - stat.st_mtime >= self.stability_interval * self.stability_checks:
+                # Not written to recently, no need to watch it grow
+                return True
+            
+            unchanged = unchanged + 1 if signature == last_signature else 0
+            if unchanged >= self.stability_checks:
+                return True
+            last_signature = signature
+            
+            if time.monotonic() > deadline:
+                return False
+            await asyncio.sleep(self.stability_interval)
+    
+    async def process_new_file(self, file_path: Path, ready: bool = False, force: bool = False,
+                               timings: Optional[Dict[str, float]] = None) -> str:
         """
         Process a newly detected video file
+
+        Returns the outcome: success, failed, skipped, incomplete or disabled.
+        force=True processes the file even when auto-scraping is disabled
+        (explicit backfills); timings receives per-stage durations in seconds.
         """
         try:
             logger.info(f"Processing: {file_path.name}")
             
             # Check if auto-scraping is enabled
-            if not self.auto_scrape_enabled:
+            if not self.auto_scrape_enabled and not force:
                 logger.info("Auto-scraping disabled, skipping")
-                return
+                return 'disabled'
+            
+            # Make sure the file is fully copied
+            stage_started = time.monotonic()
+            if not ready and not await self.wait_until_stable(file_path):
+                logger.warning(f"File disappeared or never finished writing: {file_path.name}")
+                return 'incomplete'
+            _record_timing(timings, 'wait', stage_started)
             
-            # Wait a bit to ensure file is fully copied
-            await asyncio.sleep(2)
+            await self.file_index.upsert_file(file_path)
             
             # Check if NFO already exists
             nfo_path = file_path.with_suffix('.nfo')
-            if nfo_path.exists():
+            if await asyncio.to_thread(nfo_path.exists):
                 logger.info(f"NFO already exists for: {file_path.name}")
-                return
+                return 'skipped'
+            
+            # Same content seen before (moved across folders, or a second copy)?
+            stage_started = time.monotonic()
+            try:
+                content_hash = await asyncio.to_thread(compute_content_hash, file_path)
+            except OSError as e:
+                logger.warning(f"Could not hash {file_path.name}: {str(e)}")
+                content_hash = None
+            _record_timing(timings, 'hash', stage_started)
+            if content_hash:
+                known = await self.find_by_content_hash(content_hash, exclude=file_path)
+                if known and await self.reuse_known_file(file_path, content_hash, known):
+                    return 'success'
             
             # Extract movie info from filename
             movie_info = self.extract_movie_info(file_path.name)
             
             if not movie_info['title']:
                 logger.warning(f"Could not extract title from: {file_path.name}")
-                return
+                return 'skipped'
             
             logger.info(f"Extracted: Title='{movie_info['title']}', Year={movie_info['year']}")
             
+            # Already in the library (e.g. imported from existing NFOs)? No web round trip then
+            if self.library_lookup:
+                movie = await self.find_library_movie(movie_info['title'], movie_info['year'])
+                if movie and await self.use_library_movie(file_path, movie, content_hash):
+                    return 'success'
+            
             # Search for the movie
+            stage_started = time.monotonic()
             search_result = await self.search_movie(
                 movie_info['title'],
                 movie_info['year']
             )
+            _record_timing(timings, 'search', stage_started)
             
             if not search_result or not search_result.get('id'):
                 logger.warning(f"Could not find movie: {movie_info['title']}")
                 await self.log_failed_file(file_path, movie_info, "No search results")
-                return
+                return 'failed'
             
-            # Scrape and generate NFO using the preferred source
-            # The search_result['id'] matches the preferred_source scraper
+            if not search_result.get('auto_accept'):
+                # A wrong match costs a full rescrape later; leave it for a manual pick
+                logger.warning(f"No confident match for {movie_info['title']}: "
+                               f"{search_result.get('title')} ({search_result['confidence']})")
+                await self.log_failed_file(
+                    file_path, movie_info,
+                    f"Low confidence match: {search_result.get('title')} ({search_result['confidence']})"
+                )
+                return 'failed'
+            
+            # Scrape from the source that produced the match
             success = await self.scrape_and_generate_nfo(
                 search_result['id'],
-                self.preferred_source,
-                file_path
+                search_result.get('source', self.preferred_source),
+                file_path,
+                timings=timings,
+                content_hash=content_hash
             )
             
             if success:
                 logger.info(f"✅ Successfully processed: {file_path.name}")
+                return 'success'
             else:
                 logger.warning(f"Failed to process: {file_path.name}")
+                return 'failed'
                 
         except Exception as e:
             logger.error(f"Error processing file {file_path.name}: {str(e)}")
             await self.log_failed_file(file_path, {}, str(e))
+            return 'failed'
+    
+    async def find_library_movie(self, title: str, year: Optional[int]) -> Optional[Dict[str, Any]]:
+        """The library movie with this exact (normalized) title, if it is unambiguous"""
+        query: Dict[str, Any] = {'title_key': normalize_name(title)}
+        if year:
+            query['year'] = {'$in': [year, None]}
+        movies = await self.db.movies.find(query, {'_id': 0}).to_list(2)
+        return movies[0] if len(movies) == 1 else None
     
-    async def log_processed_file(self, file_path: Path, metadata: Dict, nfo_path: Path):
+    async def use_library_movie(self, file_path: Path, movie: Dict[str, Any], content_hash: Optional[str]) -> bool:
+        """Write the NFO for a file from a movie already in the library"""
+        nfo_path = file_path.with_suffix('.nfo')
+        action, _ = await asyncio.to_thread(update_nfo, nfo_path, movie, 'create')
+        if action == 'skipped':
+            return False
+        logger.info(f"📚 Found in library: {movie['title']}, wrote {nfo_path.name} without scraping")
+        metadata = {key: value for key, value in movie.items() if key not in LIBRARY_ONLY_FIELDS}
+        await self.log_processed_file(file_path, metadata, nfo_path, content_hash=content_hash)
+        return True
+    
+    async def find_by_content_hash(self, content_hash: str, exclude: Optional[Path] = None) -> List[Dict[str, Any]]:
+        """Successfully processed files with the same content, most recent first"""
+        query = {'content_hash': content_hash, 'status': 'success'}
+        if exclude is not None:
+            query['file_path'] = {'$ne': str(exclude)}
+        return await self.db.processed_files.find(query).sort('processed_at', -1).to_list(20)
+    
+    async def reuse_known_file(self, file_path: Path, content_hash: str, known: List[Dict[str, Any]]) -> bool:
+        """
+        Write sidecars for a file whose content was already processed, without
+        searching or scraping. If a known copy is gone the file was moved and
+        that record follows it; otherwise this is a duplicate copy.
+        Returns False when there is nothing to reuse.
+        """
+        from server import NFOGenerator
+        
+        def locate():
+            # stat() calls can block for a long time on network shares
+            moved = next((doc for doc in known if not Path(doc['file_path']).exists()), None)
+            source_doc = next((doc for doc in known if Path(doc['file_path']).with_suffix('.nfo').exists()), None)
+            return moved, source_doc
+
+        def copy_artwork():
+            # Artwork is copied from a known copy's sidecars rather than downloaded again
+            for suffix in SIDECAR_SUFFIXES[1:]:
+                dest_sidecar = file_path.parent / f"{file_path.stem}{suffix}"
+                for doc in known:
+                    src_path = Path(doc['file_path'])
+                    src_sidecar = src_path.parent / f"{src_path.stem}{suffix}"
+                    if src_sidecar.exists() and not dest_sidecar.exists():
+                        shutil.copy2(src_sidecar, dest_sidecar)
+                        break
+
+        moved, source_doc = await asyncio.to_thread(locate)
+        record = moved or known[0]
+        original = Path(record['file_path'])
+        metadata = next((doc['metadata'] for doc in known if doc.get('metadata')), None)
+        if not metadata and not source_doc:
+            return False
+        
+        nfo_path = file_path.with_suffix('.nfo')
+        if metadata:
+            await asyncio.to_thread(atomic_write, nfo_path, NFOGenerator.generate_nfo(metadata))
+        else:
+            await asyncio.to_thread(shutil.copy2, Path(source_doc['file_path']).with_suffix('.nfo'), nfo_path)
+        await asyncio.to_thread(copy_artwork)
+        
+        if not moved:
+            logger.info(f"♻️ Duplicate of {original}: reused metadata for {file_path.name}")
+            await self.log_processed_file(file_path, metadata or {'title': record.get('title'), 'source': record.get('source')},
+                                          nfo_path, content_hash=content_hash, duplicate_of=str(original))
+        else:
+            logger.info(f"♻️ Moved from {original}: reused metadata for {file_path.name}")
+            await self.file_index.move_processed({'_id': record['_id']}, file_path, moved_from=str(original))
+            await self.file_index.remove(original)
+            await self.file_index.record_result(file_path, 'success', nfo_present=True, content_hash=content_hash)
+        return True
+    
+    async def find_duplicates(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Groups of processed files sharing the same content hash"""
+        pipeline = [
+            {'$match': {'status': 'success', 'content_hash': {'$ne': None}}},
+            {'$group': {
+                '_id': '$content_hash',
+                'files': {'$addToSet': '$file_path'},
+                'title': {'$first': '$title'}
+            }},
+            {'$match': {'files.1': {'$exists': True}}},
+            {'$limit': limit}
+        ]
+        groups = await self.db.processed_files.aggregate(pipeline).to_list(limit)
+        return [
+            {'content_hash': group['_id'], 'title': group['title'], 'files': group['files'], 'count': len(group['files'])}
+            for group in groups
+        ]
+    
+    async def log_processed_file(self, file_path: Path, metadata: Dict, nfo_path: Path,
+                                 content_hash: Optional[str] = None, duplicate_of: Optional[str] = None):
         """Log successfully processed file to database"""
         doc = {
             'file_path': str(file_path),
@@ -396,37 +1112,74 @@ class FolderMonitorService:
             'title': metadata.get('title'),
             'source': metadata.get('source'),
             'source_id': metadata.get('source_id'),
+            'content_hash': content_hash,
+            # Kept so copies of the same content can be written without scraping
+            'metadata': metadata,
             'processed_at': datetime.now(timezone.utc).isoformat(),
             'status': 'success'
         }
-        await self.db.processed_files.insert_one(doc)
+        if duplicate_of:
+            doc['duplicate_of'] = duplicate_of
+        previous = await self.db.processed_files.find_one_and_update(
+            {'file_path': str(file_path)},
+            {
+                '$set': doc,
+                '$unset': {'error': '', 'error_class': '', 'extracted_info': '', 'next_retry_at': ''},
+                '$inc': {'attempts': 1}
+            },
+            upsert=True,
+            projection={'status': 1},
+            return_document=ReturnDocument.BEFORE
+        )
+        await get_stats_service(self.db).record_processed_file(
+            'success', previous_status=previous['status'] if previous else None
+        )
+        await self.file_index.record_result(file_path, 'success', nfo_present=True, content_hash=content_hash)
     
     async def log_failed_file(self, file_path: Path, movie_info: Dict, error: str):
-        """Log failed file processing to database"""
+        """
+        Log failed file processing to database. Transient errors are scheduled
+        for another attempt with exponential backoff instead of failing for good.
+        """
+        previous = await self.db.processed_files.find_one(
+            {'file_path': str(file_path)}, {'status': 1, 'attempts': 1}
+        )
+        if not previous or previous.get('status') == 'success':
+            # First failure (a path that was processed before starts over)
+            attempts = 1
+        else:
+            attempts = (previous.get('attempts') or 1) + 1
+        status, next_retry_at, error_class = self.retries.plan(error, attempts)
+        
         doc = {
             'file_path': str(file_path),
             'extracted_info': movie_info,
             'error': error,
+            'error_class': error_class,
+            'attempts': attempts,
+            'next_retry_at': next_retry_at,
             'processed_at': datetime.now(timezone.utc).isoformat(),
-            'status': 'failed'
+            'status': status
         }
-        await self.db.processed_files.insert_one(doc)
+        await self.db.processed_files.update_one({'file_path': str(file_path)}, {'$set': doc}, upsert=True)
+        await get_stats_service(self.db).record_processed_file(
+            status, previous_status=previous['status'] if previous else None
+        )
+        await self.file_index.record_result(file_path, status)
+        if status == 'retrying':
+            logger.info(f"Retry {attempts}/{self.retries.max_attempts} for {file_path.name} scheduled at {next_retry_at}")
     
     async def scan_existing_files(self, folder_path: str):
         """
-        Manually scan a folder for existing files without NFO
+        Manually scan a folder tree for existing files without NFO.
+        Only directories that changed since the last scan are re-listed.
         """
         path = Path(folder_path)
         if not path.exists() or not path.is_dir():
             return []
         
-        files_to_process = []
-        
-        for file in path.iterdir():
-            if file.suffix.lower() in VIDEO_EXTENSIONS:
-                nfo_file = file.with_suffix('.nfo')
-                if not nfo_file.exists():
-                    files_to_process.append(str(file))
+        await self.file_index.rescan(str(path))
+        files_to_process = await self.file_index.files_without_nfo(str(path))
         
         logger.info(f"Found {len(files_to_process)} files without NFO in {folder_path}")
         return files_to_process
@@ -438,7 +1191,12 @@ class FolderMonitorService:
             'watched_folders': self.watched_folders,
             'preferred_source': self.preferred_source,
             'auto_scrape_enabled': self.auto_scrape_enabled,
-            'folder_count': len(self.watched_folders)
+            'search_mode': self.search_mode,
+            'watch_backend': self.active_backend or self.watch_backend,
+            'folder_count': len(self.watched_folders),
+            'queue_backend': self.queue_backend,
+            'pipeline': self.get_metrics(),
+            'work_queue': await self.get_distributed_stats()
         }
 
 # Global instance
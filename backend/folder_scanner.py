@@ -0,0 +1,150 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Supported video extensions
+VIDEO_EXTENSIONS = {
+    '.mp4', '.mkv', '.avi', '.mov', '.wmv', '.flv', '.webm',
+    '.m4v', '.mpg', '.mpeg', '.3gp', '.m2ts', '.ts'
+}
+
+# Directories created by NAS software, never part of the library
+IGNORED_DIRECTORIES = {'@eaDir', '#recycle', '$RECYCLE.BIN', 'System Volume Information'}
+
+
+def is_ignored_directory(name: str) -> bool:
+    return name.startswith('.') or name in IGNORED_DIRECTORIES
+
+
+def list_directory(path: str) -> Dict[str, Any]:
+    """
+    List one directory with a single os.scandir() pass.
+
+    Sibling .nfo files are detected from the listing itself, so only video
+    files and subdirectories are stat'ed (for size/mtime and device/mtime).
+    """
+    names = set()
+    videos = []
+    subdirs = []
+
+    with os.scandir(path) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if not is_ignored_directory(entry.name):
+                        stat = entry.stat(follow_symlinks=False)
+                        subdirs.append({
+                            'path': entry.path,
+                            'device': stat.st_dev,
+                            'mtime': stat.st_mtime
+                        })
+                    continue
+            except OSError:
+                continue
+
+            names.add(entry.name)
+            if os.path.splitext(entry.name)[1].lower() in VIDEO_EXTENSIONS:
+                videos.append(entry)
+
+    files = []
+    for entry in videos:
+        stem = os.path.splitext(entry.name)[0]
+        try:
+            stat = entry.stat()
+        except OSError:
+            # Vanished between listing and stat
+            continue
+        files.append({
+            'path': entry.path,
+            'dir': path,
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'inode': entry.inode(),
+            'nfo_present': f"{stem}.nfo" in names or f"{stem}.NFO" in names
+        })
+
+    return {'files': files, 'subdirs': subdirs}
+
+
+class FolderScanner:
+    """
+    Parallel recursive walker for watched folders.
+
+    Directories are listed in worker threads. Concurrency is bounded per
+    device (st_dev), so one slow NAS share cannot be flooded with requests
+    while a local disk sits idle.
+    """
+
+    def __init__(self, per_device_concurrency: Optional[int] = None):
+        self.per_device_concurrency = per_device_concurrency or int(
+            os.environ.get('MONITOR_SCAN_CONCURRENCY', '4')
+        )
+        self._semaphores: Dict[int, asyncio.Semaphore] = {}
+
+    def device_semaphore(self, device: int) -> asyncio.Semaphore:
+        if device not in self._semaphores:
+            self._semaphores[device] = asyncio.Semaphore(self.per_device_concurrency)
+        return self._semaphores[device]
+
+    async def list_dir(self, path: str, device: int) -> Dict[str, Any]:
+        async with self.device_semaphore(device):
+            try:
+                return await asyncio.to_thread(list_directory, path)
+            except OSError as e:
+                logger.warning(f"Cannot list directory {path}: {str(e)}")
+                return {'files': [], 'subdirs': [], 'error': str(e)}
+
+    async def scan(self, root: str) -> Dict[str, Any]:
+        """
+        Walk a folder tree. Returns every video file with its stat data and
+        nfo_present flag, plus every directory with its mtime.
+        """
+        started = time.monotonic()
+        root_stat = os.stat(root)
+
+        files: List[Dict[str, Any]] = []
+        directories: List[Dict[str, Any]] = [{'path': root, 'device': root_stat.st_dev, 'mtime': root_stat.st_mtime}]
+
+        pending = {asyncio.create_task(self.list_dir(root, root_stat.st_dev))}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    listing = task.result()
+                    files.extend(listing['files'])
+                    for subdir in listing['subdirs']:
+                        directories.append(subdir)
+                        pending.add(asyncio.create_task(self.list_dir(subdir['path'], subdir['device'])))
+        finally:
+            for task in pending:
+                task.cancel()
+
+        duration = time.monotonic() - started
+        logger.info(f"Scanned {root}: {len(directories)} directories, {len(files)} videos in {duration:.2f}s")
+        return {
+            'root': root,
+            'files': files,
+            'directories': directories,
+            'duration_seconds': round(duration, 3)
+        }
+
+
+def list_subdirectories(root: str) -> List[str]:
+    """All directories below (and including) root, for recursive watches"""
+    directories = [root]
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False) and not is_ignored_directory(entry.name):
+                        directories.append(entry.path)
+                        stack.append(entry.path)
+        except OSError as e:
+            logger.warning(f"Cannot list directory {current}: {str(e)}")
+    return directories
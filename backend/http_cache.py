@@ -0,0 +1,44 @@
+import os
+import hashlib
+from typing import Optional
+
+from fastapi import Response
+
+# Clients may store responses but must revalidate them (If-None-Match) on every use
+CACHE_HEADERS = {'Cache-Control': 'no-cache'}
+
+
+def make_etag(*parts: str) -> str:
+    """
+    Weak ETag from everything that determines a response, e.g. a collection
+    version and the query string. Weak, since compression changes the bytes.
+    """
+    digest = hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith('W/') else tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison against an If-None-Match header (a list of tags or *)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    return any(_opaque(tag) == _opaque(etag) for tag in if_none_match.split(','))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={'ETag': etag, **CACHE_HEADERS})
+
+
+def file_state(path: str) -> str:
+    """Change token for a file that is not in a collection (mtime and size)"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return 'missing'
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
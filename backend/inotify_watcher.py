@@ -0,0 +1,165 @@
+import os
+import sys
+import errno
+import struct
+import ctypes
+import ctypes.util
+import logging
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# inotify event masks (see <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# What the folder monitor listens for: a file is complete once its writer
+# closes it (IN_CLOSE_WRITE) or once it is renamed into place (IN_MOVED_TO)
+DEFAULT_MASK = (
+    IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_CREATE | IN_DELETE |
+    IN_DELETE_SELF | IN_MOVE_SELF
+)
+
+_EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+_READ_SIZE = 64 * 1024
+
+_libc = None
+
+
+def _load_libc():
+    global _libc
+    if _libc is None:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        _libc = libc
+    return _libc
+
+
+def inotify_supported() -> bool:
+    """Whether the native inotify backend can be used on this system"""
+    if not sys.platform.startswith('linux'):
+        return False
+    try:
+        return hasattr(_load_libc(), 'inotify_init1')
+    except OSError:
+        return False
+
+
+class InotifyWatcher:
+    """
+    Minimal native inotify watcher driven by the asyncio event loop.
+
+    The inotify file descriptor is registered with loop.add_reader(), so
+    events are delivered on the loop thread with no observer thread in between.
+    The callback receives (path, mask, cookie) for every event.
+    """
+
+    def __init__(self, loop, callback: Callable[[Path, int, int], None], mask: int = DEFAULT_MASK):
+        self.loop = loop
+        self.callback = callback
+        self.mask = mask
+        self.fd: Optional[int] = None
+        self.watches: Dict[int, str] = {}  # wd -> directory path
+        self.paused = False
+
+    def start(self):
+        libc = _load_libc()
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_init1 failed: {os.strerror(err)}")
+        self.fd = fd
+        self.loop.add_reader(self.fd, self._read_events)
+        logger.info("Native inotify watcher started")
+
+    def add_watch(self, directory: str) -> int:
+        """Watch a directory; returns the watch descriptor"""
+        wd = _load_libc().inotify_add_watch(self.fd, os.fsencode(directory), self.mask | IN_ONLYDIR)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                logger.error("inotify watch limit reached - raise fs.inotify.max_user_watches")
+            raise OSError(err, f"inotify_add_watch failed for {directory}: {os.strerror(err)}")
+        self.watches[wd] = directory
+        return wd
+
+    def remove_watch(self, directory: str, recursive: bool = True):
+        """Stop watching a directory (and, by default, everything below it)"""
+        prefix = directory.rstrip(os.sep) + os.sep
+        for wd, path in list(self.watches.items()):
+            if path == directory or (recursive and path.startswith(prefix)):
+                _load_libc().inotify_rm_watch(self.fd, wd)
+                self.watches.pop(wd, None)
+
+    def pause(self):
+        """Stop reading events; the kernel queues them until resume()"""
+        if not self.paused and self.fd is not None:
+            self.loop.remove_reader(self.fd)
+            self.paused = True
+
+    def resume(self):
+        if self.paused and self.fd is not None:
+            self.loop.add_reader(self.fd, self._read_events)
+            self.paused = False
+
+    def close(self):
+        if self.fd is None:
+            return
+        if not self.paused:
+            self.loop.remove_reader(self.fd)
+        os.close(self.fd)
+        self.fd = None
+        self.watches.clear()
+        logger.info("Native inotify watcher stopped")
+
+    def _read_events(self):
+        while self.fd is not None and not self.paused:
+            try:
+                buffer = os.read(self.fd, _READ_SIZE)
+            except BlockingIOError:
+                return
+            except OSError as e:
+                logger.error(f"Error reading inotify events: {str(e)}")
+                return
+            if not buffer:
+                return
+
+            offset = 0
+            while offset < len(buffer):
+                wd, mask, cookie, length = _EVENT_HEADER.unpack_from(buffer, offset)
+                offset += _EVENT_HEADER.size
+                name = buffer[offset:offset + length].rstrip(b'\0')
+                offset += length
+
+                if mask & IN_Q_OVERFLOW:
+                    logger.warning("inotify queue overflow - some events were lost, a rescan is recommended")
+                    continue
+
+                directory = self.watches.get(wd)
+                if mask & IN_IGNORED:
+                    self.watches.pop(wd, None)
+                    continue
+                if directory is None:
+                    continue
+
+                path = Path(directory) / os.fsdecode(name) if name else Path(directory)
+                try:
+                    self.callback(path, mask, cookie)
+                except Exception as e:
+                    logger.error(f"Error handling inotify event for {path}: {str(e)}")
@@ -0,0 +1,101 @@
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List, AsyncIterator, Sequence, Type
+
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Documents serialized per chunk written to the response
+STREAM_CHUNK_SIZE = 200
+
+
+def dumps(value: Any) -> bytes:
+    """Serialize to JSON bytes; orjson when installed, else the json module"""
+    if orjson is not None:
+        # Mongo hands back naive datetimes that are UTC
+        return orjson.dumps(value, default=str, option=orjson.OPT_NAIVE_UTC)
+    return json.dumps(value, default=str, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def model_projection(model: Type[BaseModel], fields: Optional[str] = None) -> Dict[str, int]:
+    """
+    Mongo projection of the model's fields, or of a comma-separated subset
+    of them. Raises ValueError on a field the model does not define.
+    """
+    allowed = list(model.model_fields)
+    if fields:
+        requested = [field.strip() for field in fields.split(',') if field.strip()]
+        unknown = [field for field in requested if field not in allowed]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        allowed = requested
+    return {'_id': 0, **{field: 1 for field in allowed}}
+
+
+def model_defaults(model: Type[BaseModel], projection: Dict[str, int]) -> Dict[str, Any]:
+    """Static defaults of the projected fields, so missing fields serialize as the model would"""
+    return {
+        name: field.default
+        for name, field in model.model_fields.items()
+        if projection.get(name) and not field.is_required() and field.default_factory is None
+    }
+
+
+def model_datetime_fields(model: Type[BaseModel], projection: Dict[str, int]) -> List[str]:
+    """Projected fields the model declares as datetime"""
+    return [
+        name for name, field in model.model_fields.items()
+        if projection.get(name) and field.annotation is datetime
+    ]
+
+
+def json_datetime(value: Any) -> Any:
+    """
+    A stored datetime, or isoformat string, written the way pydantic writes
+    it (UTC as Z). Anything that does not parse is passed through.
+    """
+    if isinstance(value, str):
+        if value.endswith('+00:00') and len(value) >= 25:
+            # Stored by datetime.isoformat() in UTC: only the suffix differs
+            return value[:-6] + 'Z'
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    if isinstance(value, datetime):
+        text = value.isoformat()
+        return text[:-6] + 'Z' if value.utcoffset() == timedelta(0) else text
+    return value
+
+
+async def stream_array(cursor, defaults: Optional[Dict[str, Any]] = None,
+                       datetime_fields: Sequence[str] = (),
+                       chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """
+    Stream a Motor cursor as a JSON array, one chunk of documents at a time,
+    without building models or the whole response in memory. Documents are
+    not validated; datetime_fields are formatted as the model would.
+    """
+    defaults = defaults or {}
+    yield b'['
+    chunk: List[bytes] = []
+    first = True
+    async for doc in cursor:
+        for name in datetime_fields:
+            if name in doc:
+                doc[name] = json_datetime(doc[name])
+        chunk.append(dumps({**defaults, **doc} if defaults else doc))
+        if len(chunk) >= chunk_size:
+            yield (b'' if first else b',') + b','.join(chunk)
+            first = False
+            chunk = []
+    if chunk:
+        yield (b'' if first else b',') + b','.join(chunk)
+    yield b']'
@@ -0,0 +1,248 @@
+import re
+import uuid
+import logging
+import unicodedata
+from typing import Optional, Dict, Any, List
+from datetime import datetime, timezone
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalize a performer/studio name for matching
+    e.g. "Brent Corrigan ", "brent  corrigan" and "Brént Corrigan" -> "brent corrigan"
+    """
+    if not name:
+        return ''
+    # Strip accents
+    name = unicodedata.normalize('NFKD', name)
+    name = ''.join(c for c in name if not unicodedata.combining(c))
+    name = name.lower().replace('&', ' and ')
+    # Drop punctuation and collapse whitespace
+    name = re.sub(r'[^\w\s]', ' ', name)
+    name = re.sub(r'[\s_]+', ' ', name)
+    return name.strip()
+
+
+class EntityIndex:
+    """
+    Normalized index collection (performers or studios) linked to db.movies.
+
+    Each entity keeps every normalized spelling it is known by in `keys`
+    (unique multikey index), so aliases resolve to the same document.
+    Movies reference entities by id, and `movie_count` is maintained with $inc.
+    """
+
+    def __init__(self, db, collection_name: str, movie_field: str, multi: bool):
+        self.db = db
+        self.collection = db[collection_name]
+        self.collection_name = collection_name
+        self.movie_field = movie_field  # performer_ids / studio_id
+        self.multi = multi
+
+    async def ensure_indexes(self):
+        await self.collection.create_index([('keys', ASCENDING)], unique=True)
+        await self.collection.create_index([('id', ASCENDING)], unique=True)
+        await self.collection.create_index([('movie_count', DESCENDING)])
+        await self.db.movies.create_index([(self.movie_field, ASCENDING)])
+
+    async def resolve(self, name: str) -> Optional[Dict[str, Any]]:
+        """Find or create the entity for a display name"""
+        key = normalize_name(name)
+        if not key:
+            return None
+
+        for _ in range(2):
+            try:
+                return await self.collection.find_one_and_update(
+                    {'keys': key},
+                    {'$setOnInsert': {
+                        'id': str(uuid.uuid4()),
+                        'name': name.strip(),
+                        'normalized': key,
+                        'keys': [key],
+                        'aliases': [],
+                        'movie_count': 0,
+                        'created_at': datetime.now(timezone.utc).isoformat()
+                    }},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER,
+                    projection={'_id': 0}
+                )
+            except DuplicateKeyError:
+                # Lost an upsert race with another writer; the retry will find it
+                continue
+        return await self.collection.find_one({'keys': key}, {'_id': 0})
+
+    def _names_for(self, movie: Dict[str, Any]) -> List[str]:
+        if self.multi:
+            return [a.get('name', '') for a in movie.get('actors', []) if a.get('name')]
+        return [movie['studio']] if movie.get('studio') else []
+
+    def _linked_ids(self, movie: Dict[str, Any]) -> List[str]:
+        value = movie.get(self.movie_field)
+        if not value:
+            return []
+        return list(value) if self.multi else [value]
+
+    async def sync_movie(self, movie: Dict[str, Any]) -> List[str]:
+        """Link a movie document to its entities and adjust film counts"""
+        ids = []
+        for name in self._names_for(movie):
+            entity = await self.resolve(name)
+            if entity and entity['id'] not in ids:
+                ids.append(entity['id'])
+
+        previous = set(self._linked_ids(movie))
+        added = [i for i in ids if i not in previous]
+        removed = [i for i in previous if i not in ids]
+
+        value = ids if self.multi else (ids[0] if ids else None)
+        await self.db.movies.update_one({'id': movie['id']}, {'$set': {self.movie_field: value}})
+        movie[self.movie_field] = value
+
+        if added:
+            await self.collection.update_many({'id': {'$in': added}}, {'$inc': {'movie_count': 1}})
+        if removed:
+            await self.collection.update_many({'id': {'$in': removed}}, {'$inc': {'movie_count': -1}})
+        return ids
+
+    async def unlink_movie(self, movie: Dict[str, Any]):
+        """Adjust film counts for a movie that was deleted"""
+        ids = self._linked_ids(movie)
+        if ids:
+            await self.collection.update_many({'id': {'$in': ids}}, {'$inc': {'movie_count': -1}})
+
+    async def add_alias(self, entity_id: str, alias: str) -> Optional[Dict[str, Any]]:
+        """Register an alternative spelling for an entity"""
+        key = normalize_name(alias)
+        if not key:
+            return None
+        return await self.collection.find_one_and_update(
+            {'id': entity_id},
+            {'$addToSet': {'keys': key, 'aliases': alias.strip()}},
+            return_document=ReturnDocument.AFTER,
+            projection={'_id': 0}
+        )
+
+    async def merge(self, target_id: str, source_id: str) -> Optional[Dict[str, Any]]:
+        """Merge source entity into target: aliases, movie links and counts"""
+        source = await self.collection.find_one({'id': source_id})
+        target = await self.collection.find_one({'id': target_id})
+        if not source or not target or source_id == target_id:
+            return None
+
+        # Free the unique keys before adding them to the target
+        await self.collection.delete_one({'id': source_id})
+        await self.collection.update_one(
+            {'id': target_id},
+            {'$addToSet': {
+                'keys': {'$each': source.get('keys', [])},
+                'aliases': {'$each': [source['name']] + source.get('aliases', [])}
+            }}
+        )
+
+        if self.multi:
+            await self.db.movies.update_many(
+                {self.movie_field: source_id},
+                {'$addToSet': {self.movie_field: target_id}}
+            )
+            await self.db.movies.update_many(
+                {self.movie_field: source_id},
+                {'$pull': {self.movie_field: source_id}}
+            )
+        else:
+            await self.db.movies.update_many(
+                {self.movie_field: source_id},
+                {'$set': {self.movie_field: target_id}}
+            )
+
+        count = await self.db.movies.count_documents({self.movie_field: target_id})
+        merged = await self.collection.find_one_and_update(
+            {'id': target_id},
+            {'$set': {'movie_count': count}},
+            return_document=ReturnDocument.AFTER,
+            projection={'_id': 0}
+        )
+        logger.info(f"Merged {self.collection_name} '{source['name']}' into '{target['name']}'")
+        return merged
+
+    async def get(self, entity_id: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({'id': entity_id}, {'_id': 0})
+
+    async def search(self, query: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """List entities by film count, optionally filtered by a name prefix"""
+        filter_ = {}
+        if query:
+            filter_['keys'] = {'$regex': f"^{re.escape(normalize_name(query))}"}
+        cursor = self.collection.find(filter_, {'_id': 0, 'keys': 0}).sort('movie_count', -1)
+        return await cursor.to_list(limit)
+
+    async def movies_for(self, entity_id: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Indexed reverse lookup of movies for an entity"""
+        cursor = self.db.movies.find({self.movie_field: entity_id}, {'_id': 0}).sort('created_at', -1)
+        return await cursor.to_list(limit)
+
+
+class LibraryIndexService:
+    """Keeps the performers and studios collections in sync with db.movies"""
+
+    def __init__(self, db):
+        self.db = db
+        self.performers = EntityIndex(db, 'performers', 'performer_ids', multi=True)
+        self.studios = EntityIndex(db, 'studios', 'studio_id', multi=False)
+
+    async def ensure_indexes(self):
+        await self.performers.ensure_indexes()
+        await self.studios.ensure_indexes()
+
+    async def sync_movie(self, movie: Dict[str, Any]):
+        """Link a saved movie to its performers and studio"""
+        try:
+            await self.performers.sync_movie(movie)
+            await self.studios.sync_movie(movie)
+        except Exception as e:
+            logger.warning(f"Failed to sync library index for {movie.get('title')}: {str(e)}")
+
+    async def unlink_movie(self, movie: Dict[str, Any]):
+        """Adjust film counts for a deleted movie"""
+        try:
+            await self.performers.unlink_movie(movie)
+            await self.studios.unlink_movie(movie)
+        except Exception as e:
+            logger.warning(f"Failed to unlink library index for {movie.get('title')}: {str(e)}")
+
+    async def rebuild(self) -> Dict[str, int]:
+        """
+        Recompute movie links and film counts from db.movies. Entity documents
+        are kept, so ids, manual aliases and merges survive a rebuild.
+        """
+        await self.db.performers.update_many({}, {'$set': {'movie_count': 0}})
+        await self.db.studios.update_many({}, {'$set': {'movie_count': 0}})
+        await self.db.movies.update_many({}, {'$unset': {'performer_ids': '', 'studio_id': ''}})
+
+        count = 0
+        async for movie in self.db.movies.find({}, {'_id': 0}):
+            await self.sync_movie(movie)
+            count += 1
+
+        result = {
+            'movies': count,
+            'performers': await self.db.performers.count_documents({}),
+            'studios': await self.db.studios.count_documents({})
+        }
+        logger.info(f"Library index rebuilt: {result}")
+        return result
+
+# Global instance
+library_index = None
+
+def get_library_index(db) -> LibraryIndexService:
+    """Get or create the global library index service instance"""
+    global library_index
+    if library_index is None:
+        library_index = LibraryIndexService(db)
+    return library_index
@@ -0,0 +1,232 @@
+import os
+import uuid
+import asyncio
+import logging
+from typing import Optional, Dict, Any, List
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# All counters live in a single document so dashboards read O(1) documents
+STATS_DOC_ID = "main"
+
+
+def _counter_key(value: Any) -> str:
+    """Make a value safe to use as a MongoDB field name"""
+    if value is None or value == '':
+        return 'unknown'
+    return str(value).replace('.', '_').replace('$', '_')
+
+
+class LibraryStatsService:
+    """
+    Materialized library statistics.
+
+    Counters are updated with $inc in the same code paths that write movies
+    and processed files. A periodic aggregation pipeline recomputes them from
+    the collections to correct any drift.
+
+    The same writes bump versions.<collection>, a change counter that API
+    endpoints turn into ETags. It is never reconciled, only incremented; the
+    epoch set with the document keeps a recreated one from repeating values.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.reconcile_interval = int(os.environ.get('STATS_RECONCILE_INTERVAL', '3600'))
+        self.reconcile_attempts = max(1, int(os.environ.get('STATS_RECONCILE_ATTEMPTS', '3')))
+        self._reconcile_task = None
+
+    @staticmethod
+    def _movie_increments(metadata: Dict[str, Any], delta: int) -> Dict[str, int]:
+        """Build the $inc document for adding/removing one movie"""
+        inc = {
+            'movies.total': delta,
+            f"movies.by_source.{_counter_key(metadata.get('source'))}": delta,
+            f"movies.by_year.{_counter_key(metadata.get('year'))}": delta,
+        }
+        if not metadata.get('poster_url'):
+            inc['movies.missing_poster'] = delta
+        if not metadata.get('plot'):
+            inc['movies.missing_plot'] = delta
+        return inc
+
+    async def _apply(self, inc: Dict[str, int]):
+        try:
+            await self.db.library_stats.update_one(
+                {'_id': STATS_DOC_ID},
+                {
+                    '$inc': inc,
+                    '$set': {'updated_at': datetime.now(timezone.utc).isoformat()},
+                    '$setOnInsert': {'versions.epoch': uuid.uuid4().hex[:8]}
+                },
+                upsert=True
+            )
+        except Exception as e:
+            # Counters are advisory; reconciliation will fix them later
+            logger.warning(f"Failed to update library stats: {str(e)}")
+
+    async def record_movie(self, metadata: Dict[str, Any], removed: bool = False):
+        """Update counters for a movie that was saved to (or removed from) db.movies"""
+        await self._apply({**self._movie_increments(metadata, -1 if removed else 1), 'versions.movies': 1})
+
+    async def record_movies(self, movies: List[Dict[str, Any]]):
+        """Update counters for movies saved together, with a single write"""
+        inc: Dict[str, int] = {}
+        for metadata in movies:
+            for key, delta in self._movie_increments(metadata, 1).items():
+                inc[key] = inc.get(key, 0) + delta
+        if inc:
+            await self._apply({**inc, 'versions.movies': 1})
+
+    async def record_processed_file(self, status: str, previous_status: Optional[str] = None,
+                                    removed: bool = False):
+        """Update counters for a processed_files entry (any write to one changes its version)"""
+        inc = {'versions.processed_files': 1}
+        if removed:
+            inc[f"processed_files.by_status.{_counter_key(status)}"] = -1
+            inc['processed_files.total'] = -1
+        elif previous_status != status:
+            inc[f"processed_files.by_status.{_counter_key(status)}"] = 1
+            if previous_status:
+                inc[f"processed_files.by_status.{_counter_key(previous_status)}"] = -1
+            else:
+                inc['processed_files.total'] = 1
+        await self._apply(inc)
+
+    async def touch(self, collection: str):
+        """Bump the version of a collection written without a counter change"""
+        await self._apply({f"versions.{collection}": 1})
+
+    async def get_version(self, collection: str) -> str:
+        """Opaque change token for a collection: differs after every recorded write"""
+        doc = await self.db.library_stats.find_one({'_id': STATS_DOC_ID}, {'versions': 1})
+        versions = (doc or {}).get('versions') or {}
+        return f"{versions.get('epoch', '')}.{versions.get(collection, 0)}"
+
+    async def _aggregate(self) -> Dict[str, Any]:
+        """Counters computed from the collections with aggregation pipelines"""
+        movie_facets = await self.db.movies.aggregate([
+            {'$facet': {
+                'total': [{'$count': 'n'}],
+                'by_source': [{'$group': {'_id': '$source', 'n': {'$sum': 1}}}],
+                'by_year': [{'$group': {'_id': '$year', 'n': {'$sum': 1}}}],
+                'missing_poster': [
+                    {'$match': {'poster_url': {'$in': [None, '']}}},
+                    {'$count': 'n'}
+                ],
+                'missing_plot': [
+                    {'$match': {'plot': {'$in': [None, '']}}},
+                    {'$count': 'n'}
+                ],
+            }}
+        ]).to_list(1)
+
+        file_facets = await self.db.processed_files.aggregate([
+            {'$facet': {
+                'total': [{'$count': 'n'}],
+                'by_status': [{'$group': {'_id': '$status', 'n': {'$sum': 1}}}],
+            }}
+        ]).to_list(1)
+
+        def count(facets, name):
+            rows = facets[0].get(name, []) if facets else []
+            return rows[0]['n'] if rows else 0
+
+        def groups(facets, name):
+            rows = facets[0].get(name, []) if facets else []
+            return {_counter_key(row['_id']): row['n'] for row in rows}
+
+        return {
+            'movies': {
+                'total': count(movie_facets, 'total'),
+                'by_source': groups(movie_facets, 'by_source'),
+                'by_year': groups(movie_facets, 'by_year'),
+                'missing_poster': count(movie_facets, 'missing_poster'),
+                'missing_plot': count(movie_facets, 'missing_plot'),
+            },
+            'processed_files': {
+                'total': count(file_facets, 'total'),
+                'by_status': groups(file_facets, 'by_status'),
+            },
+        }
+
+    async def reconcile(self) -> Dict[str, Any]:
+        """
+        Recompute all counters from the collections. Every counter write bumps
+        versions.<collection>, so the result is only stored if neither version
+        moved while the pipelines ran; otherwise it would overwrite increments
+        made in the meantime, and it is recomputed.
+        """
+        # The document must exist for the version check below
+        await self.db.library_stats.update_one(
+            {'_id': STATS_DOC_ID},
+            {'$setOnInsert': {'versions.epoch': uuid.uuid4().hex[:8]}},
+            upsert=True
+        )
+
+        for _ in range(self.reconcile_attempts):
+            started = datetime.now(timezone.utc)
+            doc = await self.db.library_stats.find_one({'_id': STATS_DOC_ID}, {'versions': 1})
+            versions = (doc or {}).get('versions') or {}
+            stats = {
+                **await self._aggregate(),
+                'reconciled_at': started.isoformat(),
+                'updated_at': datetime.now(timezone.utc).isoformat(),
+            }
+            unchanged = {
+                f"versions.{collection}": versions.get(collection, {'$exists': False})
+                for collection in ('movies', 'processed_files')
+            }
+            # $set rather than replace: versions are not derived from the collections
+            result = await self.db.library_stats.update_one({'_id': STATS_DOC_ID, **unchanged}, {'$set': stats})
+            if result.matched_count:
+                logger.info(f"Library stats reconciled: {stats['movies']['total']} movies, "
+                            f"{stats['processed_files']['total']} processed files")
+                return stats
+
+        # Busy library: keep the incremented counters until the next run
+        logger.warning(f"Library stats changed during {self.reconcile_attempts} reconcile attempts, not stored")
+        return stats
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Read the materialized stats document (reconciling once if missing)"""
+        stats = await self.db.library_stats.find_one({'_id': STATS_DOC_ID}, {'_id': 0, 'versions': 0})
+        if not stats or 'reconciled_at' not in stats:
+            stats = await self.reconcile()
+        return stats
+
+    async def _reconcile_loop(self):
+        while True:
+            try:
+                await self.reconcile()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Library stats reconciliation failed: {str(e)}")
+            await asyncio.sleep(self.reconcile_interval)
+
+    def start(self):
+        """Start the periodic reconciliation task"""
+        if self._reconcile_task is None and self.reconcile_interval > 0:
+            self._reconcile_task = asyncio.create_task(self._reconcile_loop())
+
+    async def stop(self):
+        """Stop the periodic reconciliation task"""
+        if self._reconcile_task:
+            self._reconcile_task.cancel()
+            try:
+                await self._reconcile_task
+            except asyncio.CancelledError:
+                pass
+            self._reconcile_task = None
+
+# Global instance
+stats_service = None
+
+def get_stats_service(db) -> LibraryStatsService:
+    """Get or create the global library stats service instance"""
+    global stats_service
+    if stats_service is None:
+        stats_service = LibraryStatsService(db)
+    return stats_service
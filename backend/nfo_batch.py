@@ -0,0 +1,129 @@
+import os
+import time
+import asyncio
+import logging
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator
+
+from nfo_writer import write_nfo
+from nfo_merge import update_nfo
+from artwork import get_artwork_downloader
+
+logger = logging.getLogger(__name__)
+
+VIDEO_SUFFIXES = ['.mp4', '.mkv', '.avi', '.mov', '.wmv', '.flv', '.webm', '.m4v', '.mpg', '.mpeg']
+
+
+def safe_title(metadata: Dict[str, Any]) -> str:
+    return metadata.get('title', 'movie').replace('/', '-').replace('\\', '-').replace(':', '-')
+
+
+def nfo_filename(metadata: Dict[str, Any]) -> str:
+    """NFO filename with year (for Emby compatibility)"""
+    if metadata.get('year'):
+        return f"{safe_title(metadata)} ({metadata['year']}).nfo"
+    return f"{safe_title(metadata)}.nfo"
+
+
+def resolve_output(metadata: Dict[str, Any], output_path: str) -> Tuple[Path, str]:
+    """
+    Directory and base name for the NFO's artwork. output_path is a directory
+    (images named after title and year) or a video file (images named after it).
+    """
+    output_path_obj = Path(output_path)
+    if not output_path.endswith(('\\', '/')) and output_path_obj.suffix in VIDEO_SUFFIXES:
+        # Use the video filename as-is (preserves year if present)
+        return output_path_obj.parent, output_path_obj.stem
+
+    movie_title = safe_title(metadata)
+    if metadata.get('year'):
+        movie_title = f"{movie_title} ({metadata['year']})"
+    return output_path_obj, movie_title
+
+
+def artwork_targets(metadata: Dict[str, Any], output_dir: Path, movie_title: str) -> List[Tuple[str, Path]]:
+    """(url, destination) for the poster and, if it differs, the fanart"""
+    targets = []
+    if metadata.get('poster_url'):
+        targets.append((metadata['poster_url'], output_dir / f"{movie_title}-poster.jpg"))
+    if metadata.get('thumb_url') and metadata.get('thumb_url') != metadata.get('poster_url'):
+        targets.append((metadata['thumb_url'], output_dir / f"{movie_title}-fanart.jpg"))
+    return targets
+
+
+def save_nfo(path: Path, metadata: Dict[str, Any], mode: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """(saved path or None on error, write action, NFO content)"""
+    try:
+        action, content = update_nfo(path, metadata, mode)
+        logger.info(f"NFO file {action}: {path}")
+        return str(path), action, content
+    except Exception as e:
+        logger.error(f"Failed to save NFO file: {str(e)}")
+        return None, None, None
+
+
+async def generate_item(metadata: Dict[str, Any], output_path: Optional[str], mode: str = 'overwrite') -> Dict[str, Any]:
+    """
+    Generate one NFO; with an output path, save it next to its artwork,
+    downloading poster and fanart concurrently. mode is the NFO write mode
+    (see nfo_merge.update_nfo); with merge, nfo_content is the merged NFO.
+    """
+    nfo_content = write_nfo(metadata)
+    result = {
+        "nfo_content": nfo_content,
+        "filename": nfo_filename(metadata),
+        "images_downloaded": []
+    }
+    if not output_path:
+        return result
+
+    output_dir, movie_title = resolve_output(metadata, output_path)
+    logger.info(f"Output directory: {output_dir}, movie title for images: {movie_title}")
+    from server import db
+    targets = artwork_targets(metadata, output_dir, movie_title)
+
+    downloads, (nfo_saved, nfo_action, saved_content) = await asyncio.gather(
+        get_artwork_downloader(db).fetch_many(targets),
+        asyncio.to_thread(save_nfo, output_dir / result["filename"], metadata, mode)
+    )
+    if saved_content is not None:
+        result["nfo_content"] = saved_content
+    # Conditional refreshes and deduplicated copies count as downloaded: the file is in place
+    result["images_downloaded"] = [d['path'] for d in downloads if d['status'] != 'failed']
+    result["images_failed"] = [d['url'] for d in downloads if d['status'] == 'failed']
+    result["images"] = [{'path': d['path'], 'status': d['status']} for d in downloads]
+    result["artwork_bytes_saved"] = sum(d.get('bytes_saved', 0) for d in downloads)
+    result["nfo_saved"] = nfo_saved
+    result["nfo_action"] = nfo_action
+    return result
+
+
+async def generate_batch(items: List[Dict[str, Any]], workers: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Generate many NFOs with at most `workers` items in progress; downloads
+    share the artwork downloader's global and per-host limits. Yields each
+    item's result as soon as it finishes, tagged with its index in `items`.
+    """
+    workers = workers or int(os.environ.get('NFO_BATCH_WORKERS', '8'))
+    slots = asyncio.Semaphore(workers)
+
+    async def run(index: int, item: Dict[str, Any]) -> Dict[str, Any]:
+        async with slots:
+            started = time.monotonic()
+            try:
+                result = await generate_item(item['metadata'], item.get('output_path'), item.get('mode', 'overwrite'))
+                partial = item.get('output_path') and (result['nfo_saved'] is None or result['images_failed'])
+                result = {'status': 'partial' if partial else 'ok', **result}
+            except Exception as e:
+                logger.error(f"Batch NFO item {index} failed: {str(e)}")
+                result = {'status': 'error', 'error': str(e)}
+            return {'index': index, **result, 'seconds': round(time.monotonic() - started, 3)}
+
+    tasks = [asyncio.create_task(run(index, item)) for index, item in enumerate(items)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Client went away: stop the rest of the batch
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,340 @@
+import os
+import time
+import uuid
+import asyncio
+import logging
+import multiprocessing
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Dict, Any, List, Tuple, Iterator
+
+from lxml import etree
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from nfo_merge import read_elements
+from folder_scanner import FolderScanner
+from library_stats import get_stats_service
+from library_index import normalize_name
+
+logger = logging.getLogger(__name__)
+
+# Source recorded for movies that only exist as NFOs written by other tools
+IMPORT_SOURCE = 'nfo'
+
+
+def _movie_children(path: str) -> Iterator[Any]:
+    """
+    Stream the direct children of an NFO's <movie> root with iterparse,
+    freeing each one once the caller has read it. Stops at other roots
+    (tvshow, episodedetails).
+    """
+    depth = 0
+    for event, elem in etree.iterparse(path, events=('start', 'end'), recover=True,
+                                       remove_comments=True, resolve_entities=False, no_network=True):
+        if event == 'start':
+            depth += 1
+            if depth == 1 and elem.tag != 'movie':
+                return
+            continue
+        depth -= 1
+        if depth == 1:
+            yield elem
+            elem.clear()
+            # Drop already handled siblings from the root as well
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+
+
+def to_movie(metadata: Dict[str, Any], nfo_path: str, video_path: str, nfo_mtime: float) -> Optional[Dict[str, Any]]:
+    """Map parsed NFO fields onto the MovieMetadata shape (without id/created_at)"""
+    title = metadata.get('title') or metadata.get('original_title')
+    if not title:
+        return None
+    return {
+        'source': metadata.get('source') or IMPORT_SOURCE,
+        'source_id': metadata.get('source_id') or '',
+        'title': title,
+        'original_title': metadata.get('original_title'),
+        'year': metadata.get('year') if isinstance(metadata.get('year'), int) else None,
+        'release_date': metadata.get('release_date') or None,
+        'plot': metadata.get('plot') or None,
+        'runtime': metadata.get('runtime') if isinstance(metadata.get('runtime'), int) else None,
+        'studio': metadata.get('studio') or None,
+        'director': metadata.get('director') or None,
+        'genres': [genre for genre in metadata['genres'] if genre],
+        'actors': [actor for actor in metadata['actors'] if actor['name']],
+        'tags': [tag for tag in metadata['tags'] if tag],
+        'poster_url': metadata.get('poster_url') or None,
+        'backdrop_url': metadata.get('backdrop_url') or None,
+        'rating': metadata.get('rating') or None,
+        'title_key': normalize_name(title),
+        'nfo_path': nfo_path,
+        'nfo_mtime': nfo_mtime,
+        'file_path': video_path
+    }
+
+
+def _identity(movie: Dict[str, Any]) -> Tuple:
+    """What an NFO import is keyed by: (source, source_id), or the NFO path without a source id"""
+    if movie.get('source_id'):
+        return ('source', movie['source'], movie['source_id'])
+    return ('nfo_path', movie['nfo_path'])
+
+
+def _empty(value: Any) -> bool:
+    return value is None or value == '' or value == []
+
+
+def _data_time(doc: Dict[str, Any]) -> float:
+    """When an existing movie's metadata was written: its scrape or its newest imported NFO"""
+    created_at = doc.get('created_at')
+    try:
+        if isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at)
+        scraped = created_at.timestamp() if isinstance(created_at, datetime) else 0
+    except ValueError:
+        scraped = 0
+    return max(scraped, doc.get('nfo_mtime') or 0)
+
+
+def parse_nfo_files(entries: List[Tuple[str, str, Optional[float]]]) -> List[Dict[str, Any]]:
+    """
+    Process-pool task: parse a chunk of (nfo_path, video_path, known_mtime).
+    NFOs no newer than what was already imported from them are reported
+    unchanged without being read.
+    """
+    results = []
+    for nfo_path, video_path, known_mtime in entries:
+        try:
+            mtime = os.stat(nfo_path).st_mtime
+            if known_mtime is not None and mtime <= known_mtime:
+                results.append({'status': 'unchanged'})
+                continue
+            metadata, _ = read_elements(_movie_children(nfo_path), keep_extra=False)
+            movie = to_movie(metadata, nfo_path, video_path, mtime)
+            results.append({'status': 'parsed', 'movie': movie} if movie else {'status': 'skipped', 'path': nfo_path})
+        except Exception as e:
+            results.append({'status': 'failed', 'path': nfo_path, 'error': str(e)})
+    return results
+
+
+class NFOImporter:
+    """
+    Bulk import of NFO sidecars (written by any tool) into db.movies.
+
+    Watched folders are walked with the parallel FolderScanner, NFOs are
+    parsed with streaming lxml iterparse in a process pool, and movies are
+    bulk-upserted keyed by (source, source_id), or by NFO path for NFOs
+    without a source id. Re-imports only re-read NFOs whose mtime changed.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.workers = int(os.environ.get('NFO_IMPORT_WORKERS', str(os.cpu_count() or 2)))
+        self.chunk_size = int(os.environ.get('NFO_IMPORT_CHUNK_SIZE', '256'))
+        self.scanner = FolderScanner()
+        self._task = None
+        self.job: Optional[Dict[str, Any]] = None
+
+    async def ensure_indexes(self):
+        await self.db.movies.create_index(
+            [('nfo_path', ASCENDING)], unique=True, partialFilterExpression={'nfo_path': {'$type': 'string'}}
+        )
+        await self.db.movies.create_index([('title_key', ASCENDING), ('year', ASCENDING)])
+        await self.db.movies.create_index([('source', ASCENDING), ('source_id', ASCENDING)])
+
+    async def _collect(self, folders: List[str]) -> List[Tuple[str, str]]:
+        """(nfo_path, video_path) for every video with a sidecar NFO"""
+        pairs = []
+        for folder in folders:
+            scan = await self.scanner.scan(folder)
+            for file in scan['files']:
+                if not file['nfo_present']:
+                    continue
+                stem = os.path.splitext(file['path'])[0]
+                nfo_path = f"{stem}.nfo" if os.path.exists(f"{stem}.nfo") else f"{stem}.NFO"
+                pairs.append((nfo_path, file['path']))
+        return pairs
+
+    @staticmethod
+    def _filter(movie: Dict[str, Any]) -> Dict[str, Any]:
+        return ({'source': movie['source'], 'source_id': movie['source_id']} if movie['source_id']
+                else {'nfo_path': movie['nfo_path']})
+
+    async def _existing(self, keys: List[Dict[str, Any]]) -> Dict[Tuple, Dict[str, Any]]:
+        """Movies already saved under any of the keys, by _identity"""
+        existing = {}
+        async for doc in self.db.movies.find({'$or': keys}, {'_id': 0, 'performer_ids': 0, 'studio_id': 0}):
+            if doc.get('source_id'):
+                existing[_identity(doc)] = doc
+            if doc.get('nfo_path'):
+                existing[('nfo_path', doc['nfo_path'])] = doc
+        return existing
+
+    async def _write(self, movies: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Upsert parsed movies. An NFO with a source id updates the movie already
+        saved for it (e.g. by a scrape); others are keyed by NFO path.
+
+        Every NFO path seen for a movie is kept in nfo_paths and nfo_mtime is
+        the newest of them, so several copies of one movie are all skipped on
+        the next import. On an existing movie, NFO fields only fill in what is
+        missing, unless the NFO is newer than the movie's data.
+        """
+        # Copies of one movie in this chunk become one write, newest NFO first
+        groups: Dict[Tuple, Tuple[Dict[str, Any], List[str]]] = {}
+        for movie in sorted(movies, key=lambda movie: movie['nfo_mtime'], reverse=True):
+            key = _identity(movie)
+            if key in groups:
+                groups[key][1].append(movie['nfo_path'])
+            else:
+                groups[key] = (movie, [movie['nfo_path']])
+        existing = await self._existing([self._filter(movie) for movie, _ in groups.values()])
+
+        now = datetime.now(timezone.utc).isoformat()
+        written, ops = [], []
+        for key, (movie, nfo_paths) in groups.items():
+            fields = {name: value for name, value in movie.items() if name != 'nfo_mtime'}
+            doc = existing.get(key)
+            if doc is None:
+                update_fields = {}
+            else:
+                newer = movie['nfo_mtime'] > _data_time(doc)
+                # nfo_path stays the first one seen; the others are in nfo_paths
+                update_fields = {
+                    name: value for name, value in fields.items()
+                    if not _empty(value) and ((newer and name != 'nfo_path') or _empty(doc.get(name)))
+                }
+                if 'title' in update_fields:
+                    update_fields['title_key'] = fields['title_key']
+            ops.append(UpdateOne(
+                self._filter(movie),
+                {
+                    '$set': {**update_fields, 'imported_at': self.job['started_at']},
+                    '$setOnInsert': {
+                        **{name: value for name, value in fields.items() if name not in update_fields},
+                        'id': str(uuid.uuid4()), 'created_at': now
+                    },
+                    '$addToSet': {'nfo_paths': {'$each': nfo_paths}},
+                    '$max': {'nfo_mtime': movie['nfo_mtime']}
+                },
+                upsert=True
+            ))
+            written.append(movie)
+        try:
+            result = await self.db.movies.bulk_write(ops, ordered=False)
+            counts = {'inserted': result.upserted_count, 'updated': result.modified_count}
+        except BulkWriteError as e:
+            # e.g. the NFO path already belongs to another movie; the rest of the chunk is saved
+            counts = {'inserted': e.details.get('nUpserted', 0), 'updated': e.details.get('nModified', 0)}
+            for error in e.details.get('writeErrors', []):
+                logger.warning(f"NFO import write failed for {written[error['index']]['nfo_path']}: {error.get('errmsg')}")
+                if len(self.job['errors']) < 50:
+                    self.job['errors'].append({'path': written[error['index']]['nfo_path'], 'error': error.get('errmsg')})
+        if counts['inserted'] or counts['updated']:
+            # Counters are reconciled after the import; only the version changes per chunk
+            await get_stats_service(self.db).touch('movies')
+        return counts
+
+    async def run(self, folders: List[str]) -> Dict[str, Any]:
+        job = self.job
+        started = time.monotonic()
+        pairs = await self._collect(folders)
+        job['found'] = len(pairs)
+        job['scan_seconds'] = round(time.monotonic() - started, 2)
+
+        # mtimes of earlier imports, so unchanged NFOs are not parsed again
+        known = {}
+        async for doc in self.db.movies.find(
+            {'$or': [{'nfo_paths': {'$exists': True}}, {'nfo_path': {'$type': 'string'}}]},
+            {'_id': 0, 'nfo_path': 1, 'nfo_paths': 1, 'nfo_mtime': 1}
+        ):
+            for nfo_path in doc.get('nfo_paths') or [doc['nfo_path']]:
+                known[nfo_path] = doc.get('nfo_mtime')
+
+        entries = [(nfo_path, video_path, known.get(nfo_path)) for nfo_path, video_path in pairs]
+        chunks = [entries[i:i + self.chunk_size] for i in range(0, len(entries), self.chunk_size)]
+
+        loop = asyncio.get_running_loop()
+        # spawn: never fork the server with its Mongo client and event loop threads
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            pending = [loop.run_in_executor(pool, parse_nfo_files, chunk) for chunk in chunks]
+            try:
+                for next_done in asyncio.as_completed(pending):
+                    movies = []
+                    for result in await next_done:
+                        job[result['status']] += 1
+                        if result['status'] == 'parsed':
+                            movies.append(result['movie'])
+                        elif result['status'] == 'failed' and len(job['errors']) < 50:
+                            job['errors'].append({'path': result['path'], 'error': result['error']})
+                    if movies:
+                        counts = await self._write(movies)
+                        job['inserted'] += counts['inserted']
+                        job['updated'] += counts['updated']
+                    job['processed'] = job['parsed'] + job['unchanged'] + job['skipped'] + job['failed']
+            finally:
+                for future in pending:
+                    future.cancel()
+
+        elapsed = time.monotonic() - started
+        job['seconds'] = round(elapsed, 2)
+        job['files_per_second'] = round(job['processed'] / elapsed, 1) if elapsed else None
+        return job
+
+    async def _run_job(self, folders: List[str], sync_index: bool):
+        from library_index import get_library_index
+
+        job = self.job
+        try:
+            await self.run(folders)
+            if job['inserted'] or job['updated']:
+                # Counters are recomputed once instead of per movie
+                await get_stats_service(self.db).reconcile()
+                if sync_index:
+                    index_started = time.monotonic()
+                    async for movie in self.db.movies.find(
+                        {'imported_at': job['started_at']}, {'_id': 0}
+                    ):
+                        await get_library_index(self.db).sync_movie(movie)
+                    job['index_seconds'] = round(time.monotonic() - index_started, 2)
+            job['status'] = 'completed'
+            logger.info(f"NFO import finished: {job['found']} found, {job['inserted']} new, "
+                        f"{job['updated']} updated, {job['unchanged']} unchanged, {job['failed']} failed "
+                        f"in {job['seconds']}s")
+        except Exception as e:
+            logger.error(f"NFO import failed: {str(e)}")
+            job['status'] = 'failed'
+            job['error'] = str(e)
+        finally:
+            job['finished_at'] = datetime.now(timezone.utc).isoformat()
+
+    def start(self, folders: List[str], sync_index: bool = True) -> Dict[str, Any]:
+        """Start an import in the background; only one runs at a time"""
+        if self._task and not self._task.done():
+            raise RuntimeError("An NFO import is already running")
+        self.job = {
+            'id': str(uuid.uuid4()),
+            'status': 'running',
+            'folders': folders,
+            'started_at': datetime.now(timezone.utc).isoformat(),
+            'found': 0, 'processed': 0, 'parsed': 0, 'unchanged': 0, 'skipped': 0, 'failed': 0,
+            'inserted': 0, 'updated': 0, 'errors': []
+        }
+        self._task = asyncio.create_task(self._run_job(folders, sync_index))
+        return self.job
+
+    def get_status(self) -> Optional[Dict[str, Any]]:
+        return self.job
+
+
+# Global instance
+nfo_importer = None
+
+def get_nfo_importer(db) -> NFOImporter:
+    """Get or create the global NFO importer instance"""
+    global nfo_importer
+    if nfo_importer is None:
+        nfo_importer = NFOImporter(db)
+    return nfo_importer
@@ -0,0 +1,166 @@
+import os
+import stat
+import uuid
+import logging
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, Any, List, Tuple, Iterable
+
+from nfo_writer import write_nfo, INDENT
+
+logger = logging.getLogger(__name__)
+
+# create: only write missing NFOs; overwrite: always replace; merge: fold new
+# fields into the existing NFO and write only if the result differs
+NFO_WRITE_MODES = ('create', 'overwrite', 'merge')
+
+# NFO element -> metadata field, for single-valued elements
+SCALAR_FIELDS = {
+    'title': 'title',
+    'originaltitle': 'original_title',
+    'year': 'year',
+    'premiered': 'release_date',
+    'releasedate': 'release_date',
+    'plot': 'plot',
+    'runtime': 'runtime',
+    'studio': 'studio',
+    'director': 'director',
+    'poster': 'poster_url',
+    'thumb': 'poster_url',
+    'fanart': 'backdrop_url',
+    'mpaa': 'rating'
+}
+
+# Written from other fields, so not kept separately
+DERIVED_ELEMENTS = {'outline'}
+
+
+def _text(elem: ET.Element) -> str:
+    if elem.tag == 'fanart' and len(elem) and not (elem.text or '').strip():
+        # Kodi style: <fanart><thumb>url</thumb></fanart>
+        elem = elem[0]
+    return (elem.text or '').strip()
+
+
+def _serialize(elem: ET.Element) -> str:
+    elem.tail = None
+    ET.indent(elem, space=INDENT, level=1)
+    return INDENT + ET.tostring(elem, encoding='unicode')
+
+
+def read_elements(elements: Iterable[Any], keep_extra: bool = True) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Metadata from the child elements of a <movie> NFO (ElementTree or lxml),
+    plus the elements that have no metadata field, serialized so a rewrite
+    keeps them (ElementTree only; lxml callers pass keep_extra=False).
+    """
+    metadata: Dict[str, Any] = {'genres': [], 'tags': [], 'actors': []}
+    extra: List[str] = []
+
+    for elem in elements:
+        tag = elem.tag
+        if not isinstance(tag, str) or tag in DERIVED_ELEMENTS:
+            # Comments and processing instructions (lxml), derived fields
+            continue
+        if tag == 'genre':
+            metadata['genres'].append(_text(elem))
+        elif tag == 'tag':
+            text = _text(elem)
+            if text.startswith('Source: '):
+                metadata['source'] = text[len('Source: '):]
+            elif text.startswith('SourceID: '):
+                metadata['source_id'] = text[len('SourceID: '):]
+            else:
+                metadata['tags'].append(text)
+        elif tag == 'actor':
+            actor = {'name': (elem.findtext('name') or '').strip()}
+            if (elem.findtext('role') or '').strip():
+                actor['role'] = elem.findtext('role').strip()
+            metadata['actors'].append(actor)
+        elif tag in SCALAR_FIELDS and SCALAR_FIELDS[tag] not in metadata:
+            metadata[SCALAR_FIELDS[tag]] = _text(elem)
+        elif tag in SCALAR_FIELDS and SCALAR_FIELDS[tag] == 'poster_url':
+            continue  # thumb and poster carry the same URL
+        elif keep_extra:
+            extra.append(_serialize(elem))
+
+    for field in ('year', 'runtime'):
+        if str(metadata.get(field, '')).isdigit():
+            metadata[field] = int(metadata[field])
+    # originaltitle defaults to the title; only keep one that differs
+    if metadata.get('original_title') == metadata.get('title'):
+        metadata.pop('original_title', None)
+    return metadata, extra
+
+
+def parse_nfo(content: str) -> Tuple[Dict[str, Any], List[str]]:
+    """Metadata and unmodelled elements of an NFO; raises ET.ParseError on broken XML"""
+    return read_elements(ET.fromstring(content))
+
+
+def merge_metadata(existing: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """New values win; fields the new metadata leaves empty keep their existing value"""
+    merged = dict(existing)
+    for field, value in new.items():
+        if value not in (None, '', [], {}):
+            merged[field] = value
+    if new.get('title') and 'original_title' not in new:
+        # A retitled movie must not keep the old title as its original title
+        merged.pop('original_title', None)
+    return merged
+
+
+def atomic_write(path: Path, content: str):
+    """Write through a temp file in the same directory and rename it into place"""
+    tmp_path = path.parent / f".{path.name}.{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        with open(tmp_path, 'x', encoding='utf-8') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(tmp_path, stat.S_IMODE(path.stat().st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def update_nfo(path: Path, metadata: Dict[str, Any], mode: str = 'merge') -> Tuple[str, str]:
+    """
+    Write the NFO for metadata to path according to mode.
+    Returns (action, content): action is created, updated, unchanged or
+    skipped (create mode, NFO exists); content is what the NFO now holds.
+    """
+    if mode not in NFO_WRITE_MODES:
+        raise ValueError(f"Unsupported NFO write mode: {mode}")
+
+    path = Path(path)
+    content = write_nfo(metadata)
+    try:
+        with open(path, encoding='utf-8') as f:
+            current = f.read()
+    except FileNotFoundError:
+        atomic_write(path, content)
+        return 'created', content
+
+    if mode == 'create':
+        return 'skipped', current
+
+    if mode == 'merge':
+        try:
+            existing, extra = parse_nfo(current)
+        except ET.ParseError as e:
+            logger.warning(f"Replacing unreadable NFO {path.name}: {str(e)}")
+        else:
+            # Compare canonical renderings, so formatting alone never causes a write
+            content = write_nfo(merge_metadata(existing, metadata), extra)
+            if content == write_nfo(existing, extra):
+                return 'unchanged', current
+
+    if content == current:
+        return 'unchanged', current
+    atomic_write(path, content)
+    return 'updated', content
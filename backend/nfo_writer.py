@@ -0,0 +1,98 @@
+import re
+from typing import Optional, Dict, Any, List
+
+XML_HEADER = '<?xml version="1.0" ?>'
+INDENT = '  '
+
+# Characters XML 1.0 does not allow in documents at all
+_INVALID_XML_CHARS = re.compile('[^\x09\x0a\x0d\x20-\ud7ff\ue000-\ufffd\U00010000-\U0010ffff]')
+
+
+def _escape(value: str) -> str:
+    """
+    Text content exactly as the former ElementTree -> minidom round trip wrote it:
+    line endings normalized by the parser, &, <, " and > escaped, and the
+    blank lines the pretty-printer cleanup dropped removed from multi-line text
+    """
+    text = _INVALID_XML_CHARS.sub('', value)
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    text = text.replace('&', '&amp;').replace('<', '&lt;').replace('"', '&quot;').replace('>', '&gt;')
+    if '\n' in text:
+        # The first and last line share an output line with the tags, so only
+        # the lines in between can be blank
+        lines = text.split('\n')
+        text = '\n'.join([lines[0]] + [line for line in lines[1:-1] if line.strip()] + [lines[-1]])
+    return text
+
+
+def _element(out: List[str], tag: str, value: Optional[str], indent: str = INDENT):
+    text = _escape(value) if value else ''
+    if text:
+        out.append(f'{indent}<{tag}>{text}</{tag}>')
+    else:
+        out.append(f'{indent}<{tag}/>')
+
+
+def write_nfo(metadata: Dict[str, Any], extra: Optional[List[str]] = None) -> str:
+    """
+    Emby movie NFO for scraped metadata, written in a single pass.
+    Produces the same document as the pretty-printed ElementTree it replaces.
+    extra: already serialized elements (e.g. kept from an existing NFO) added at the end.
+    """
+    out = [XML_HEADER, '<movie>']
+
+    if metadata.get('title'):
+        _element(out, 'title', metadata['title'])
+        _element(out, 'originaltitle', metadata.get('original_title', metadata['title']))
+
+    if metadata.get('year'):
+        _element(out, 'year', str(metadata['year']))
+
+    if metadata.get('release_date'):
+        _element(out, 'premiered', metadata['release_date'])
+
+    if metadata.get('plot'):
+        plot = metadata['plot']
+        _element(out, 'plot', plot)
+        _element(out, 'outline', plot[:200] + '...' if len(plot) > 200 else plot)
+
+    if metadata.get('runtime'):
+        _element(out, 'runtime', str(metadata['runtime']))
+
+    if metadata.get('studio'):
+        _element(out, 'studio', metadata['studio'])
+
+    if metadata.get('director'):
+        _element(out, 'director', metadata['director'])
+
+    for genre in metadata.get('genres', []):
+        _element(out, 'genre', genre)
+
+    for tag in metadata.get('tags', []):
+        _element(out, 'tag', tag)
+
+    for actor in metadata.get('actors', []):
+        out.append(f'{INDENT}<actor>')
+        _element(out, 'name', actor.get('name', ''), INDENT * 2)
+        if actor.get('role'):
+            _element(out, 'role', actor['role'], INDENT * 2)
+        out.append(f'{INDENT}</actor>')
+
+    if metadata.get('poster_url'):
+        _element(out, 'thumb', metadata['poster_url'])
+        _element(out, 'poster', metadata['poster_url'])
+
+    if metadata.get('backdrop_url'):
+        _element(out, 'fanart', metadata['backdrop_url'])
+
+    if metadata.get('rating'):
+        _element(out, 'mpaa', metadata['rating'])
+
+    # Source information as tags
+    _element(out, 'tag', f"Source: {metadata.get('source', 'unknown')}")
+    _element(out, 'tag', f"SourceID: {metadata.get('source_id', '')}")
+
+    out.extend(extra or [])
+    out.append('</movie>')
+    return '\n'.join(out)
@@ -0,0 +1,182 @@
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Optional, Dict, Any, Callable, Awaitable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Filesystems whose changes made on other hosts never reach inotify
+NETWORK_FILESYSTEMS = {
+    'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'ncpfs', 'afs', '9p',
+    'fuse.sshfs', 'fuse.rclone', 'fuse.gvfsd-fuse', 'davfs'
+}
+
+# Recent polls kept per folder for cost metrics
+POLL_HISTORY = 20
+
+
+def _read_mounts() -> List[Tuple[str, str]]:
+    """(mount point, filesystem type) pairs, longest mount point first"""
+    mounts = []
+    try:
+        with open('/proc/mounts', 'r') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 3:
+                    # Spaces in mount points are escaped as \040
+                    mounts.append((parts[1].replace('\\040', ' '), parts[2]))
+    except OSError:
+        return []
+    return sorted(mounts, key=lambda mount: len(mount[0]), reverse=True)
+
+
+def filesystem_type(path: str) -> Optional[str]:
+    """Filesystem type of the mount a path lives on (Linux only)"""
+    path = os.path.realpath(path)
+    for mount_point, fs_type in _read_mounts():
+        if path == mount_point or path.startswith(mount_point.rstrip('/') + '/'):
+            return fs_type
+    return None
+
+
+def is_network_filesystem(path: str) -> bool:
+    return filesystem_type(path) in NETWORK_FILESYSTEMS
+
+
+class PollingWatcher:
+    """
+    Stat-diffing observer for folders inotify cannot watch (NFS/SMB shares).
+
+    Each poll is an incremental FileIndex.rescan: unchanged directories cost
+    a single stat() and only directories whose mtime moved are listed again.
+    Every folder has its own interval; a poll that finds nothing multiplies
+    the interval by `backoff` (up to `max_interval`), a poll with changes
+    resets it to the folder's base interval.
+    """
+
+    def __init__(self, file_index, on_changes: Callable[[str, Dict[str, Any], bool], Awaitable],
+                 interval: Optional[float] = None, max_interval: Optional[float] = None,
+                 backoff: Optional[float] = None):
+        self.file_index = file_index
+        self.on_changes = on_changes
+        self.interval = interval or float(os.environ.get('MONITOR_POLL_INTERVAL', '30'))
+        self.max_interval = max_interval or float(os.environ.get('MONITOR_POLL_MAX_INTERVAL', '300'))
+        self.backoff = backoff or float(os.environ.get('MONITOR_POLL_BACKOFF', '1.5'))
+        self.folders: Dict[str, Dict[str, Any]] = {}
+
+    def add_folder(self, folder: str, interval: Optional[float] = None):
+        """Start polling a folder; interval overrides the default base interval"""
+        if folder in self.folders:
+            self.remove_folder(folder)
+        base = interval or self.interval
+        state = {
+            'base_interval': base,
+            'interval': base,
+            'polls': 0,
+            'polls_with_changes': 0,
+            'last_poll_at': None,
+            'last_change_at': None,
+            'history': deque(maxlen=POLL_HISTORY),
+            'wakeup': asyncio.Event()
+        }
+        self.folders[folder] = state
+        state['task'] = asyncio.create_task(self._poll_loop(folder, state))
+        logger.info(f"Now polling: {folder} (every {base:.0f}s, up to {self.max_interval:.0f}s when idle)")
+
+    def remove_folder(self, folder: str):
+        state = self.folders.pop(folder, None)
+        if state:
+            state['task'].cancel()
+
+    def poll_now(self, folder: str):
+        """Run the next poll of a folder immediately"""
+        state = self.folders.get(folder)
+        if state:
+            state['wakeup'].set()
+
+    async def close(self):
+        tasks = [state['task'] for state in self.folders.values()]
+        self.folders.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def poll(self, folder: str, state: Dict[str, Any], baseline: bool = False) -> Dict[str, Any]:
+        """Rescan one folder and record what it cost"""
+        started = time.monotonic()
+        cpu_started = time.process_time()
+        result = await self.file_index.rescan(folder)
+        stats = result['stats']
+
+        changes = len(result['changed']) + stats['files_removed'] + stats['files_renamed']
+        cost = {
+            'at': time.time(),
+            'duration_seconds': round(time.monotonic() - started, 3),
+            # Process-wide, so concurrent work is included; an upper bound for the poll
+            'cpu_seconds': round(time.process_time() - cpu_started, 3),
+            'directories_visited': stats['directories_visited'],
+            'directories_listed': stats['directories_listed'],
+            'changes': changes
+        }
+        state['history'].append(cost)
+        state['polls'] += 1
+        state['last_poll_at'] = cost['at']
+
+        if changes:
+            state['polls_with_changes'] += 1
+            state['last_change_at'] = cost['at']
+            state['interval'] = state['base_interval']
+            await self.on_changes(folder, result, baseline)
+        else:
+            state['interval'] = min(state['interval'] * self.backoff, self.max_interval)
+        return cost
+
+    async def _poll_loop(self, folder: str, state: Dict[str, Any]):
+        # A folder never indexed before is only indexed on the first poll;
+        # like the event backends, existing files are not treated as new
+        baseline = not await self.file_index.is_indexed(folder)
+        while True:
+            try:
+                if os.path.isdir(folder):
+                    await self.poll(folder, state, baseline=baseline)
+                    baseline = False
+                else:
+                    logger.warning(f"Polled folder is not available: {folder}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error polling {folder}: {str(e)}")
+
+            state['wakeup'].clear()
+            try:
+                await asyncio.wait_for(state['wakeup'].wait(), timeout=state['interval'])
+            except asyncio.TimeoutError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        folders = {}
+        for folder, state in self.folders.items():
+            history = list(state['history'])
+            last = history[-1] if history else None
+            folders[folder] = {
+                'interval_seconds': round(state['interval'], 1),
+                'base_interval_seconds': state['base_interval'],
+                'polls': state['polls'],
+                'polls_with_changes': state['polls_with_changes'],
+                'last_poll_at': state['last_poll_at'],
+                'last_change_at': state['last_change_at'],
+                'last_poll': last,
+                'avg_duration_seconds': round(sum(p['duration_seconds'] for p in history) / len(history), 3) if history else None,
+                # Estimated CPU share: average CPU per poll spread over the current interval
+                'cpu_percent': round(
+                    sum(p['cpu_seconds'] for p in history) / len(history) / state['interval'] * 100, 2
+                ) if history else None
+            }
+        return {
+            'default_interval_seconds': self.interval,
+            'max_interval_seconds': self.max_interval,
+            'backoff': self.backoff,
+            'folders': folders
+        }
@@ -0,0 +1,180 @@
+import os
+import re
+import asyncio
+import logging
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+from datetime import datetime, timezone, timedelta
+from pymongo import ASCENDING, ReturnDocument
+
+from library_stats import get_stats_service
+
+logger = logging.getLogger(__name__)
+
+# Errors that will fail the same way on every attempt
+PERMANENT_ERRORS = [
+    r'no search results',
+    r'low confidence match',
+    r'could not extract title',
+    r'unknown source',
+    r'file no longer exists',
+    r'permission denied',
+    r'not found',
+    # HTTPException text ("404: Movie not found"); 408 and 429 are worth retrying
+    r'^4(?!08|29)\d\d: '
+]
+
+# Errors worth retrying: timeouts, connection problems, throttling and server errors
+TRANSIENT_ERRORS = [
+    r'time(d)? ?out',
+    r'connection',
+    r'net::err_',
+    r'temporar',
+    r'too many requests',
+    r'\b(429|500|502|503|504)\b',
+    r'target (page|closed)|browser has been closed',
+    r'reset by peer|broken pipe',
+    r'name or service not known|name resolution'
+]
+
+_PERMANENT = re.compile('|'.join(PERMANENT_ERRORS), re.IGNORECASE)
+_TRANSIENT = re.compile('|'.join(TRANSIENT_ERRORS), re.IGNORECASE)
+
+
+def classify_error(error: str) -> str:
+    """transient, permanent or unknown; only permanent errors are never retried"""
+    if _PERMANENT.search(error or ''):
+        return 'permanent'
+    if _TRANSIENT.search(error or ''):
+        return 'transient'
+    return 'unknown'
+
+
+class RetryScheduler:
+    """
+    Persisted retry schedule for failed monitor files.
+
+    A failed file keeps a single processed_files document carrying its
+    attempt count and next_retry_at. Transient (and unrecognized) errors are
+    retried with exponential backoff until max_attempts; permanent errors
+    fail at once. A background sweeper re-enqueues due files in batches.
+    """
+
+    def __init__(self, db, monitor):
+        self.db = db
+        self.monitor = monitor
+        self.max_attempts = int(os.environ.get('MONITOR_RETRY_MAX_ATTEMPTS', '5'))
+        self.base_delay = float(os.environ.get('MONITOR_RETRY_BASE_DELAY', '300'))
+        self.max_delay = float(os.environ.get('MONITOR_RETRY_MAX_DELAY', '86400'))
+        self.sweep_interval = float(os.environ.get('MONITOR_RETRY_SWEEP_INTERVAL', '60'))
+        self.batch_size = int(os.environ.get('MONITOR_RETRY_BATCH_SIZE', '50'))
+        self._task = None
+        self.stats = {'sweeps': 0, 'requeued': 0, 'abandoned': 0, 'last_sweep_at': None}
+
+    async def ensure_indexes(self):
+        await self.db.processed_files.create_index([('status', ASCENDING), ('next_retry_at', ASCENDING)])
+
+    def plan(self, error: str, attempts: int) -> Tuple[str, Optional[str], str]:
+        """
+        Decide what happens after a failed attempt.
+        Returns (status, next_retry_at, error_class).
+        """
+        error_class = classify_error(error)
+        if error_class == 'permanent' or attempts >= self.max_attempts:
+            return 'failed', None, error_class
+
+        delay = min(self.base_delay * (2 ** (attempts - 1)), self.max_delay)
+        next_retry_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+        return 'retrying', next_retry_at.isoformat(), error_class
+
+    async def sweep(self) -> int:
+        """Re-enqueue files whose retry is due; returns how many were queued"""
+        if self.monitor.queue is None:
+            return 0
+
+        now = datetime.now(timezone.utc)
+        due = await self.db.processed_files.find(
+            {'status': 'retrying', 'next_retry_at': {'$lte': now.isoformat()}},
+            {'file_path': 1}
+        ).sort('next_retry_at', 1).limit(self.batch_size).to_list(self.batch_size)
+
+        queued = 0
+        for doc in due:
+            file_path = Path(doc['file_path'])
+            if not file_path.exists() or file_path.with_suffix('.nfo').exists():
+                # Gone, or handled some other way in the meantime
+                await self.db.processed_files.update_one(
+                    {'_id': doc['_id']},
+                    {'$set': {'status': 'abandoned', 'next_retry_at': None}}
+                )
+                await get_stats_service(self.db).record_processed_file('abandoned', previous_status='retrying')
+                self.stats['abandoned'] += 1
+                continue
+
+            # Push the due time past the in-flight window so the next sweep
+            # does not queue it again; the attempt itself reschedules it
+            hold_until = now + timedelta(seconds=self.monitor.in_flight_ttl)
+            await self.db.processed_files.update_one(
+                {'_id': doc['_id']},
+                {'$set': {'next_retry_at': hold_until.isoformat(), 'retry_queued_at': now.isoformat()}}
+            )
+            await get_stats_service(self.db).touch('processed_files')
+            if await self.monitor.enqueue(file_path, ready=True):
+                queued += 1
+
+        self.stats['sweeps'] += 1
+        self.stats['requeued'] += queued
+        self.stats['last_sweep_at'] = now.isoformat()
+        if queued:
+            logger.info(f"Retry sweep queued {queued} files")
+        return queued
+
+    async def retry_now(self, file_path: str) -> bool:
+        """Make a failed or retrying file due immediately"""
+        previous = await self.db.processed_files.find_one_and_update(
+            {'file_path': file_path, 'status': {'$in': ['failed', 'retrying', 'abandoned']}},
+            {'$set': {'status': 'retrying', 'next_retry_at': datetime.now(timezone.utc).isoformat()}},
+            projection={'status': 1},
+            return_document=ReturnDocument.BEFORE
+        )
+        if not previous:
+            return False
+        await get_stats_service(self.db).record_processed_file('retrying', previous_status=previous['status'])
+        return True
+
+    async def list_scheduled(self, limit: int = 100) -> List[Dict[str, Any]]:
+        return await self.db.processed_files.find(
+            {'status': 'retrying'},
+            {'_id': 0, 'metadata': 0}
+        ).sort('next_retry_at', 1).to_list(limit)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sweep()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Retry sweep failed: {str(e)}")
+            await asyncio.sleep(self.sweep_interval)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'max_attempts': self.max_attempts,
+            'base_delay_seconds': self.base_delay,
+            'running': self._task is not None and not self._task.done()
+        }
@@ -0,0 +1,119 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator
+
+from browser_pool import BrowserPool, use_browser_pool
+from work_queue import get_work_queue
+
+logger = logging.getLogger(__name__)
+
+
+async def scrape_batch(items: List[Dict[str, str]], concurrency: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Scrape many (source, movie_id) items through one shared browser, with
+    at most `concurrency` scrapes in flight and a per-source cap. Results
+    that finish together are saved with one bulk write, then yielded,
+    tagged with their index in `items`.
+    """
+    from server import scrape_metadata, movie_document, store_movies
+
+    concurrency = concurrency or int(os.environ.get('SCRAPE_BATCH_CONCURRENCY', '4'))
+    per_source = int(os.environ.get('SCRAPE_BATCH_SOURCE_CONCURRENCY', '2'))
+    write_size = int(os.environ.get('SCRAPE_BATCH_WRITE_SIZE', '50'))
+    slots = asyncio.Semaphore(concurrency)
+    source_slots = {item['source']: asyncio.Semaphore(per_source) for item in items}
+    pool = BrowserPool()
+    finished: asyncio.Queue = asyncio.Queue()
+
+    async def run(index: int, item: Dict[str, str]):
+        use_browser_pool(pool)
+        result = {'index': index, 'source': item['source'], 'movie_id': item['movie_id']}
+        try:
+            # Source slot first, so a busy site never holds a global slot idle
+            async with source_slots[item['source']]:
+                async with slots:
+                    started = time.monotonic()
+                    try:
+                        metadata = await scrape_metadata(item['source'], item['movie_id'])
+                        result.update(status='ok', movie=movie_document(metadata))
+                    except Exception as e:
+                        # Scrapers raise HTTPException for missing movies and age gate failures
+                        error = getattr(e, 'detail', None) or str(e)
+                        logger.error(f"Batch scrape of {item['source']} {item['movie_id']} failed: {error}")
+                        result.update(status='error', error=error)
+                    result['seconds'] = round(time.monotonic() - started, 3)
+        finally:
+            await finished.put(result)
+
+    tasks = [asyncio.create_task(run(index, item)) for index, item in enumerate(items)]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            chunk = [await finished.get()]
+            while len(chunk) < write_size and not finished.empty():
+                chunk.append(finished.get_nowait())
+            remaining -= len(chunk)
+
+            scraped = [result for result in chunk if result.get('status') == 'ok']
+            if scraped:
+                try:
+                    failed = await store_movies([result['movie'] for result in scraped])
+                except Exception as e:
+                    logger.error(f"Batch scrape write failed: {str(e)}")
+                    failed = {position: str(e) for position in range(len(scraped))}
+                for position, error in failed.items():
+                    result = scraped[position]
+                    result.pop('movie')
+                    result.update(status='error', error=f"Save failed: {error}")
+            for result in chunk:
+                yield result
+    finally:
+        # Client went away: stop the rest of the batch before closing the browser
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await pool.close()
+        logger.info(f"Batch scrape finished: {pool.leases} scrapes, {pool.launches} browser launches")
+
+
+async def scrape_batch_jobs(db, items: List[Dict[str, str]], timeout: float, concurrency: Optional[int] = None,
+                            poll_interval: float = 1.0) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Worker mode: queue the items as scrape_batch jobs of up to
+    SCRAPE_BATCH_JOB_SIZE for the worker.py processes. Each job runs
+    scrape_batch() on its chunk (one shared browser, bulk writes); the
+    results of a chunk are yielded when its job finishes. Gives up on the
+    remaining chunks once no job has finished for `timeout`.
+    """
+    job_size = int(os.environ.get('SCRAPE_BATCH_JOB_SIZE', '50'))
+    queue = get_work_queue(db)
+    pending: Dict[str, Tuple[int, List[Dict[str, str]]]] = {}  # job id -> (offset, chunk)
+    for offset in range(0, len(items), job_size):
+        chunk = items[offset:offset + job_size]
+        # Single attempt: a retry would save the chunk's movies a second time
+        job_id = await queue.enqueue('scrape_batch', {'items': chunk, 'concurrency': concurrency}, max_attempts=1)
+        pending[job_id] = (offset, chunk)
+
+    last_progress = time.monotonic()
+    while pending:
+        await asyncio.sleep(poll_interval)
+        for job in await queue.finished_jobs(list(pending)):
+            offset, chunk = pending.pop(job['_id'])
+            last_progress = time.monotonic()
+            if job['status'] == 'done':
+                for result in job['result']['results']:
+                    yield {**result, 'index': offset + result['index'], 'job_id': job['_id']}
+                continue
+            for index, item in enumerate(chunk, offset):
+                yield {'index': index, **item, 'job_id': job['_id'], 'status': 'error',
+                       'error': job.get('error') or 'Scrape batch failed'}
+
+        if pending and time.monotonic() - last_progress > timeout:
+            # Jobs stay queued; their results can still be read with GET /api/jobs/{id}
+            for job_id, (offset, chunk) in pending.items():
+                for index, item in enumerate(chunk, offset):
+                    yield {'index': index, **item, 'job_id': job_id, 'status': 'error',
+                           'error': f"No result within {timeout:.0f}s"}
+            return
@@ -1,8 +1,9 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Body
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Body, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 import os
 import logging
 from pathlib import Path
@@ -12,8 +13,6 @@ import uuid
 from datetime import datetime, timezone
 import requests
 from bs4 import BeautifulSoup
-import xml.etree.ElementTree as ET
-from xml.dom import minidom
 import re
 import json
 from playwright.async_api import async_playwright
@@ -81,6 +80,15 @@ class SearchRequest(BaseModel):
 class NFOGenerateRequest(BaseModel):
     metadata: Dict[str, Any]
     output_path: Optional[str] = None
+    mode: str = "overwrite"  # overwrite, merge (rewrite only if the merged NFO differs), create
+
+class NFOBatchRequest(BaseModel):
+    items: List[NFOGenerateRequest]
+    workers: Optional[int] = Field(default=None, ge=1, le=64)  # items processed at once
+
+from work_queue import report_progress, PermanentJobError
+from browser_pool import scrape_browser
+from scrape_batch import scrape_batch, scrape_batch_jobs
 
 # Scraper Classes
 class GayDVDEmpireScraper:
@@ -242,16 +250,8 @@ class GayDVDEmpireScraper:
         try:
             logger.info(f"Scraping Gay DVD Empire movie: {url}")
             
-            async with async_playwright() as p:
-                # Launch browser with enhanced anti-detection
-                browser = await p.chromium.launch(
-                    headless=True,
-                    args=[
-                        '--disable-blink-features=AutomationControlled',
-                        '--disable-dev-shm-usage',
-                        '--no-sandbox'
-                    ]
-                )
+            await report_progress('session')
+            async with scrape_browser() as browser:
                 context = await browser.new_context(
                     user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
                     viewport={'width': 1920, 'height': 1080},
@@ -282,6 +282,7 @@ class GayDVDEmpireScraper:
                 
                 # Navigate to the movie page (will redirect to age gate)
                 logger.info(f"Navigating to movie page: {url}")
+                await report_progress('navigate')
                 response = await page.goto(url, wait_until='domcontentloaded', timeout=30000)
                 await page.wait_for_timeout(500 + int(__import__('random').random() * 500))
                 
@@ -343,6 +344,7 @@ class GayDVDEmpireScraper:
                 await browser.close()
                 
                 # Parse with BeautifulSoup
+                await report_progress('parse')
                 soup = BeautifulSoup(html_content, 'html.parser')
                 
                 metadata = {
@@ -456,6 +458,9 @@ class GayDVDEmpireScraper:
                 logger.info(f"Scraped data: Title={metadata['title']}, Year={metadata['year']}, Studio={metadata['studio']}, Actors={len(metadata['actors'])}, Genres={len(metadata['genres'])}")
                 return metadata
             
+        except HTTPException:
+            # Re-raise HTTP exceptions as-is (404 for a missing movie)
+            raise
         except Exception as e:
             logger.error(f"Error scraping Gay DVD Empire movie {movie_id}: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Scraping failed: {str(e)}")
@@ -596,16 +601,8 @@ class AEBNScraper:
         try:
             logger.info(f"Scraping AEBN movie: {url}")
             
-            async with async_playwright() as p:
-                # Launch browser with anti-detection
-                browser = await p.chromium.launch(
-                    headless=True,
-                    args=[
-                        '--disable-blink-features=AutomationControlled',
-                        '--disable-dev-shm-usage',
-                        '--no-sandbox'
-                    ]
-                )
+            await report_progress('session')
+            async with scrape_browser() as browser:
                 
                 # Create context with cookies to bypass age gate
                 context = await browser.new_context(
@@ -616,6 +613,7 @@ class AEBNScraper:
                 page = await context.new_page()
                 
                 # Navigate to the movie page
+                await report_progress('navigate')
                 await page.goto(url, wait_until='domcontentloaded', timeout=40000)
                 logger.info(f"Navigated to: {page.url}")
                 
@@ -668,6 +666,7 @@ class AEBNScraper:
                 
                 # Get the page HTML
                 html_content = await page.content()
+                await report_progress('parse')
                 soup = BeautifulSoup(html_content, 'html.parser')
                 
                 await browser.close()
@@ -842,16 +841,8 @@ class GEVIScraper:
         try:
             logger.info(f"Scraping GEVI movie: {url}")
             
-            async with async_playwright() as p:
-                # Launch browser with anti-detection
-                browser = await p.chromium.launch(
-                    headless=True,
-                    args=[
-                        '--disable-blink-features=AutomationControlled',
-                        '--disable-dev-shm-usage',
-                        '--no-sandbox'
-                    ]
-                )
+            await report_progress('session')
+            async with scrape_browser() as browser:
                 context = await browser.new_context(
                     user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
                     viewport={'width': 1920, 'height': 1080}
@@ -872,6 +863,7 @@ class GEVIScraper:
                 logger.info("Age gate bypassed via localStorage")
                 
                 # Now navigate to the movie page
+                await report_progress('navigate')
                 await page.goto(url, wait_until='networkidle', timeout=40000)
                 logger.info(f"Navigated to: {page.url}")
                 
@@ -890,6 +882,7 @@ class GEVIScraper:
                 await browser.close()
                 
                 # Parse with BeautifulSoup
+                await report_progress('parse')
                 soup = BeautifulSoup(html_content, 'html.parser')
                 
                 # Only parse from the #data section (ignore hidden elements)
@@ -1049,6 +1042,9 @@ class GEVIScraper:
                 logger.info(f"Successfully scraped movie {movie_id} from GEVI")
                 return metadata
             
+        except HTTPException:
+            # Re-raise HTTP exceptions as-is (404 for a missing movie)
+            raise
         except Exception as e:
             logger.error(f"Error scraping GEVI movie {movie_id}: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Scraping failed: {str(e)}")
@@ -1121,16 +1117,8 @@ class RadVideoScraper:
         try:
             logger.info(f"Scraping RadVideo movie: {url}")
             
-            async with async_playwright() as p:
-                # Launch browser with anti-detection
-                browser = await p.chromium.launch(
-                    headless=True,
-                    args=[
-                        '--disable-blink-features=AutomationControlled',
-                        '--disable-dev-shm-usage',
-                        '--no-sandbox'
-                    ]
-                )
+            await report_progress('session')
+            async with scrape_browser() as browser:
                 
                 context = await browser.new_context(
                     user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -1140,6 +1128,7 @@ class RadVideoScraper:
                 page = await context.new_page()
                 
                 # Navigate to the movie page
+                await report_progress('navigate')
                 await page.goto(url, wait_until='domcontentloaded', timeout=40000)
                 logger.info(f"Navigated to: {page.url}")
                 
@@ -1163,6 +1152,7 @@ class RadVideoScraper:
                 
                 # Get the page HTML
                 html_content = await page.content()
+                await report_progress('parse')
                 soup = BeautifulSoup(html_content, 'html.parser')
                 
                 await browser.close()
@@ -1313,132 +1303,17 @@ class RadVideoScraper:
             logger.error(f"Error scraping RadVideo movie: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Scraping failed: {str(e)}")
 
-# Helper function to download images
-def download_image(url: str, output_path: str) -> bool:
-    """Download an image from URL and save it to output_path"""
-    try:
-        if not url:
-            return False
-        
-        logger.info(f"Downloading image from: {url}")
-        response = requests.get(url, timeout=30, stream=True)
-        response.raise_for_status()
-        
-        # Save image
-        with open(output_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        
-        logger.info(f"Image saved to: {output_path}")
-        return True
-    except Exception as e:
-        logger.error(f"Failed to download image from {url}: {str(e)}")
-        return False
-
 # NFO Generator
+from nfo_writer import write_nfo
+from nfo_batch import generate_item, generate_batch
+from nfo_merge import NFO_WRITE_MODES
+from artwork import get_artwork_downloader
+
 class NFOGenerator:
     @staticmethod
     def generate_nfo(metadata: Dict[str, Any]) -> str:
         """Generate Emby-compatible NFO XML content"""
-        
-        movie = ET.Element('movie')
-        
-        # Add title
-        if metadata.get('title'):
-            title = ET.SubElement(movie, 'title')
-            title.text = metadata['title']
-            
-            originaltitle = ET.SubElement(movie, 'originaltitle')
-            originaltitle.text = metadata.get('original_title', metadata['title'])
-        
-        # Add year
-        if metadata.get('year'):
-            year = ET.SubElement(movie, 'year')
-            year.text = str(metadata['year'])
-        
-        # Add release date
-        if metadata.get('release_date'):
-            premiered = ET.SubElement(movie, 'premiered')
-            premiered.text = metadata['release_date']
-        
-        # Add plot
-        if metadata.get('plot'):
-            plot = ET.SubElement(movie, 'plot')
-            plot.text = metadata['plot']
-            
-            outline = ET.SubElement(movie, 'outline')
-            outline.text = metadata['plot'][:200] + '...' if len(metadata['plot']) > 200 else metadata['plot']
-        
-        # Add runtime
-        if metadata.get('runtime'):
-            runtime = ET.SubElement(movie, 'runtime')
-            runtime.text = str(metadata['runtime'])
-        
-        # Add studio
-        if metadata.get('studio'):
-            studio = ET.SubElement(movie, 'studio')
-            studio.text = metadata['studio']
-        
-        # Add director
-        if metadata.get('director'):
-            director = ET.SubElement(movie, 'director')
-            director.text = metadata['director']
-        
-        # Add genres
-        for genre in metadata.get('genres', []):
-            genre_elem = ET.SubElement(movie, 'genre')
-            genre_elem.text = genre
-        
-        # Add tags
-        for tag in metadata.get('tags', []):
-            tag_elem = ET.SubElement(movie, 'tag')
-            tag_elem.text = tag
-        
-        # Add actors
-        for actor_data in metadata.get('actors', []):
-            actor = ET.SubElement(movie, 'actor')
-            
-            name = ET.SubElement(actor, 'name')
-            name.text = actor_data.get('name', '')
-            
-            if actor_data.get('role'):
-                role = ET.SubElement(actor, 'role')
-                role.text = actor_data['role']
-        
-        # Add poster
-        if metadata.get('poster_url'):
-            thumb = ET.SubElement(movie, 'thumb')
-            thumb.text = metadata['poster_url']
-            
-            poster = ET.SubElement(movie, 'poster')
-            poster.text = metadata['poster_url']
-        
-        # Add backdrop/fanart
-        if metadata.get('backdrop_url'):
-            fanart = ET.SubElement(movie, 'fanart')
-            fanart.text = metadata['backdrop_url']
-        
-        # Add rating
-        if metadata.get('rating'):
-            rating = ET.SubElement(movie, 'mpaa')
-            rating.text = metadata['rating']
-        
-        # Add source information as tags
-        source_tag = ET.SubElement(movie, 'tag')
-        source_tag.text = f"Source: {metadata.get('source', 'unknown')}"
-        
-        id_tag = ET.SubElement(movie, 'tag')
-        id_tag.text = f"SourceID: {metadata.get('source_id', '')}"
-        
-        # Pretty print XML
-        xml_str = ET.tostring(movie, encoding='unicode')
-        dom = minidom.parseString(xml_str)
-        pretty_xml = dom.toprettyxml(indent='  ')
-        
-        # Remove extra blank lines
-        pretty_xml = '\n'.join([line for line in pretty_xml.split('\n') if line.strip()])
-        
-        return pretty_xml
+        return write_nfo(metadata)
 
 # API Routes
 @api_router.get("/")
@@ -1449,33 +1324,143 @@ async def root():
         "supported_sources": ["gaydvdempire", "aebn", "gevi", "radvideo"]
     }
 
+SCRAPE_SOURCES = ("gaydvdempire", "aebn", "gevi", "radvideo")
+
+# Scrapes run as work_queue jobs. inline: the API process consumes them
+# itself; worker: worker.py processes do
+SCRAPE_EXECUTION = os.environ.get('SCRAPE_EXECUTION', 'inline')
+SCRAPE_CONCURRENCY = int(os.environ.get('SCRAPE_CONCURRENCY', '2'))
+SCRAPE_JOB_TIMEOUT = float(os.environ.get('SCRAPE_JOB_TIMEOUT', '300'))
+JOB_EVENTS_POLL_INTERVAL = 0.5
+JOB_EVENTS_KEEPALIVE = 15
+
+async def scrape_metadata(source: str, movie_id: str) -> Dict[str, Any]:
+    """Scrape a movie from source, without saving it"""
+    if source == "gaydvdempire":
+        return await GayDVDEmpireScraper.scrape_movie(movie_id)
+    elif source == "aebn":
+        return await AEBNScraper.scrape_movie(movie_id)
+    elif source == "gevi":
+        return await GEVIScraper.scrape_movie(movie_id)
+    elif source == "radvideo":
+        return await RadVideoScraper.scrape_movie(movie_id)
+    raise ValueError(f"Unsupported source: {source}")
+
+def movie_document(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """db.movies document for scraped metadata"""
+    doc = MovieMetadata(**metadata).model_dump()
+    doc['created_at'] = doc['created_at'].isoformat()
+    # Lets folder matching and NFO imports find scraped movies by title
+    doc['title_key'] = normalize_name(doc['title'])
+    return doc
+
+async def store_movies(docs: List[Dict[str, Any]]) -> Dict[int, str]:
+    """
+    Insert movie documents with one bulk write and update stats and the
+    library index. Returns {position in docs: error} for documents not saved.
+    """
+    failed = {}
+    try:
+        await db.movies.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        failed = {error['index']: error.get('errmsg', 'Write failed') for error in e.details.get('writeErrors', [])}
+    saved = [doc for position, doc in enumerate(docs) if position not in failed]
+    for doc in docs:
+        doc.pop('_id', None)
+    await get_stats_service(db).record_movies(saved)
+    for doc in saved:
+        await get_library_index(db).sync_movie(doc)
+    return failed
+
+async def scrape_and_store(source: str, movie_id: str) -> Dict[str, Any]:
+    """Scrape a movie and save it to the library; returns the stored document"""
+    doc = movie_document(await scrape_metadata(source, movie_id))
+    
+    # Save to database
+    await report_progress('save')
+    failed = await store_movies([doc])
+    if failed:
+        raise RuntimeError(f"Failed to save movie: {failed[0]}")
+    return doc
+
+async def handle_scrape_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    work_queue handler for scrape jobs. Client errors (movie not found,
+    unsupported source) fail the job at once instead of being retried.
+    """
+    if payload['source'] not in SCRAPE_SOURCES:
+        raise PermanentJobError(f"Unsupported source: {payload['source']}", status_code=400)
+    try:
+        return await scrape_and_store(payload['source'], payload['movie_id'])
+    except HTTPException as e:
+        if 400 <= e.status_code < 500:
+            raise PermanentJobError(str(e.detail), status_code=e.status_code)
+        raise RuntimeError(str(e.detail))
+
+async def handle_scrape_batch_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    work_queue handler for scrape_batch jobs (worker mode batches): the
+    chunk shares one browser and is saved with bulk writes
+    """
+    results = []
+    async for result in scrape_batch(payload['items'], payload.get('concurrency')):
+        results.append(result)
+        await report_progress('scrape', done=len(results), total=len(payload['items']))
+    return {'results': results}
+
+async def enqueue_scrape(source: str, movie_id: str, max_attempts: Optional[int] = None) -> str:
+    """Validate the source and queue a scrape job; returns the job id"""
+    source = source.lower()
+    if source not in SCRAPE_SOURCES:
+        raise HTTPException(status_code=400, detail=f"Unsupported source: {source}")
+    return await get_work_queue(db).enqueue('scrape', {'source': source, 'movie_id': movie_id},
+                                            max_attempts=max_attempts)
+
+async def wait_for_job(job_id: str, timeout: float) -> Dict[str, Any]:
+    """Wait for a work_queue job to finish; 504 when it takes longer than timeout"""
+    job = await get_work_queue(db).wait(job_id, timeout)
+    if job:
+        return job
+    raise HTTPException(status_code=504, detail=f"Scrape job {job_id} did not finish within {timeout:.0f}s")
+
+def _iso(value):
+    if not isinstance(value, datetime):
+        return value
+    # Mongo hands back naive datetimes that are UTC
+    return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).isoformat()
+
+def job_view(job: Dict[str, Any]) -> Dict[str, Any]:
+    """API representation of a work_queue job"""
+    progress = job.get('progress') or {}
+    return {
+        "id": job['_id'],
+        "type": job['type'],
+        "status": job['status'],
+        "phase": progress.get('phase'),
+        "history": [{**entry, "at": _iso(entry.get('at'))} for entry in progress.get('history', [])],
+        "attempts": job.get('attempts', 0),
+        "payload": job.get('payload'),
+        "result": job.get('result'),
+        "error": job.get('error'),
+        "status_code": job.get('status_code'),
+        "created_at": _iso(job.get('created_at')),
+        "started_at": _iso(job.get('started_at')),
+        "finished_at": _iso(job.get('finished_at')),
+        "updated_at": _iso(job.get('updated_at'))
+    }
+
 @api_router.post("/scrape", response_model=MovieMetadata)
 async def scrape_movie(request: ScrapeRequest):
     """
     Scrape movie metadata from specified source
     """
     try:
-        source = request.source.lower()
-        movie_id = request.movie_id
-        
-        if source == "gaydvdempire":
-            metadata = await GayDVDEmpireScraper.scrape_movie(movie_id)
-        elif source == "aebn":
-            metadata = await AEBNScraper.scrape_movie(movie_id)
-        elif source == "gevi":
-            metadata = await GEVIScraper.scrape_movie(movie_id)
-        elif source == "radvideo":
-            metadata = await RadVideoScraper.scrape_movie(movie_id)
-        else:
-            raise HTTPException(status_code=400, detail=f"Unsupported source: {source}")
-        
-        # Save to database
-        movie_obj = MovieMetadata(**metadata)
-        doc = movie_obj.model_dump()
-        doc['created_at'] = doc['created_at'].isoformat()
-        await db.movies.insert_one(doc)
-        
-        return movie_obj
+        # The caller is waiting: report a failure at once instead of retrying with backoff
+        job_id = await enqueue_scrape(request.source, request.movie_id, max_attempts=1)
+        job = await wait_for_job(job_id, SCRAPE_JOB_TIMEOUT)
+        if job['status'] == 'failed':
+            raise HTTPException(status_code=job.get('status_code') or 500, detail=job.get('error') or "Scrape failed")
+        return MovieMetadata(**job['result'])
         
     except HTTPException:
         raise
@@ -1483,6 +1468,115 @@ async def scrape_movie(request: ScrapeRequest):
         logger.error(f"Error in scrape endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+class ScrapeBatchRequest(BaseModel):
+    items: List[ScrapeRequest]
+    concurrency: Optional[int] = Field(default=None, ge=1, le=16)  # scrapes in flight at once
+
+SCRAPE_BATCH_MAX_ITEMS = int(os.environ.get('SCRAPE_BATCH_MAX_ITEMS', '500'))
+
+@api_router.post("/scrape/batch")
+async def scrape_movies_batch(request: ScrapeBatchRequest):
+    """
+    Scrape and save many movies in one call, sharing one browser (or, with
+    SCRAPE_EXECUTION=worker, as work queue jobs for the worker processes).
+    Streams one JSON line per item as it is saved, then a summary line.
+    """
+    if not request.items:
+        raise HTTPException(status_code=400, detail="No items given")
+    if len(request.items) > SCRAPE_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {SCRAPE_BATCH_MAX_ITEMS} items per batch")
+    items = [{'source': item.source.lower(), 'movie_id': item.movie_id} for item in request.items]
+    for item in items:
+        if item['source'] not in SCRAPE_SOURCES:
+            raise HTTPException(status_code=400, detail=f"Unsupported source: {item['source']}")
+    
+    async def stream():
+        started = time.monotonic()
+        counts = {'ok': 0, 'error': 0}
+        if SCRAPE_EXECUTION == 'worker':
+            # Keep Chromium out of the API process: worker.py processes scrape and save
+            results = scrape_batch_jobs(db, items, SCRAPE_JOB_TIMEOUT, request.concurrency)
+        else:
+            results = scrape_batch(items, request.concurrency)
+        async for result in results:
+            counts[result['status']] += 1
+            yield json.dumps(result) + "\n"
+        elapsed = time.monotonic() - started
+        yield json.dumps({
+            'done': True,
+            'total': len(items),
+            **counts,
+            'seconds': round(elapsed, 2),
+            'movies_per_minute': round(counts['ok'] * 60 / elapsed, 1) if elapsed else None
+        }) + "\n"
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+# Job Endpoints
+@api_router.post("/jobs/scrape", status_code=202)
+async def start_scrape_job(request: ScrapeRequest):
+    """
+    Queue a scrape and return at once; follow it with GET /jobs/{id} or
+    the /jobs/{id}/events stream
+    """
+    try:
+        job_id = await enqueue_scrape(request.source, request.movie_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error queueing scrape job: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"/api/jobs/{job_id}",
+        "events_url": f"/api/jobs/{job_id}/events"
+    }
+
+@api_router.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    job = await get_work_queue(db).get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_view(job)
+
+@api_router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """
+    Server-sent events for a job: a `progress` event on every phase change
+    (queued, session, navigate, parse, save), then `done` or `failed`
+    """
+    job = await get_work_queue(db).get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        current, last_state, last_sent = job, None, time.monotonic()
+        while True:
+            view = job_view(current)
+            state = (view['status'], view['phase'], len(view['history']))
+            if state != last_state:
+                last_state, last_sent = state, time.monotonic()
+                event = view['status'] if view['status'] in ('done', 'failed') else 'progress'
+                yield f"event: {event}\ndata: {json.dumps(view)}\n\n"
+                if event != 'progress':
+                    return
+            elif time.monotonic() - last_sent >= JOB_EVENTS_KEEPALIVE:
+                # Comment line: keeps proxies from closing an idle stream
+                last_sent = time.monotonic()
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(JOB_EVENTS_POLL_INTERVAL)
+            current = await get_work_queue(db).get_job(job_id)
+            if not current:
+                yield f"event: failed\ndata: {json.dumps({'id': job_id, 'error': 'Job no longer exists'})}\n\n"
+                return
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @api_router.post("/search")
 async def search_movies(request: SearchRequest):
     """
@@ -1515,98 +1609,97 @@ async def generate_nfo(request: NFOGenerateRequest):
     Generate NFO file content from metadata and download images
     """
     try:
-        metadata = request.metadata
-        output_path = request.output_path
-        
-        # Generate NFO content
-        nfo_content = NFOGenerator.generate_nfo(metadata)
-        
-        # Generate NFO filename with year (for Emby compatibility)
-        nfo_title = metadata.get('title', 'movie').replace('/', '-').replace('\\', '-').replace(':', '-')
-        if metadata.get('year'):
-            nfo_filename = f"{nfo_title} ({metadata['year']}).nfo"
-        else:
-            nfo_filename = f"{nfo_title}.nfo"
-        
-        # Prepare response
-        response = {
-            "nfo_content": nfo_content,
-            "filename": nfo_filename,
-            "images_downloaded": []
-        }
-        
-        # Download images if output_path is provided
-        if output_path:
-            output_path_obj = Path(output_path)
-            
-            # Check if output_path is a directory or a file path
-            if output_path.endswith(('\\', '/')):
-                # It's a directory path (ends with slash)
-                output_dir = output_path_obj
-                # Build title with year for Emby compatibility
-                movie_title = metadata.get('title', 'movie').replace('/', '-').replace('\\', '-').replace(':', '-')
-                if metadata.get('year'):
-                    movie_title = f"{movie_title} ({metadata['year']})"
-            elif output_path_obj.suffix in ['.mp4', '.mkv', '.avi', '.mov', '.wmv', '.flv', '.webm', '.m4v', '.mpg', '.mpeg']:
-                # It's a video file path - use exact video filename
-                output_dir = output_path_obj.parent
-                movie_title = output_path_obj.stem  # Use video filename as-is (preserves year if present)
-            else:
-                # Assume it's a directory if no video extension
-                output_dir = output_path_obj
-                # Build title with year for Emby compatibility
-                movie_title = metadata.get('title', 'movie').replace('/', '-').replace('\\', '-').replace(':', '-')
-                if metadata.get('year'):
-                    movie_title = f"{movie_title} ({metadata['year']})"
-            
-            logger.info(f"Output directory: {output_dir}")
-            logger.info(f"Movie title for images: {movie_title}")
-            
-            # Download poster/cover
-            if metadata.get('poster_url'):
-                poster_path = output_dir / f"{movie_title}-poster.jpg"
-                if download_image(metadata['poster_url'], str(poster_path)):
-                    response["images_downloaded"].append(str(poster_path))
-                    logger.info(f"Poster downloaded: {poster_path}")
-            
-            # Download thumb as fanart (if available and different from poster)
-            if metadata.get('thumb_url') and metadata.get('thumb_url') != metadata.get('poster_url'):
-                fanart_path = output_dir / f"{movie_title}-fanart.jpg"
-                if download_image(metadata['thumb_url'], str(fanart_path)):
-                    response["images_downloaded"].append(str(fanart_path))
-                    logger.info(f"Fanart downloaded: {fanart_path}")
-            
-            # Also save the NFO file automatically
-            nfo_file_path = output_dir / nfo_filename
-            try:
-                with open(nfo_file_path, 'w', encoding='utf-8') as f:
-                    f.write(nfo_content)
-                response["nfo_saved"] = str(nfo_file_path)
-                logger.info(f"NFO file saved: {nfo_file_path}")
-            except Exception as e:
-                logger.error(f"Failed to save NFO file: {str(e)}")
-                response["nfo_saved"] = None
+        if request.mode not in NFO_WRITE_MODES:
+            raise HTTPException(status_code=400, detail=f"Unsupported mode: {request.mode}")
         
-        return response
+        # With an output path the NFO is saved there and the artwork downloaded next to it
+        return await generate_item(request.metadata, request.output_path, mode=request.mode)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating NFO: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@api_router.get("/movies", response_model=List[MovieMetadata])
-async def get_movies():
+NFO_BATCH_MAX_ITEMS = int(os.environ.get('NFO_BATCH_MAX_ITEMS', '1000'))
+
+@api_router.post("/generate-nfo/batch")
+async def generate_nfo_batch(request: NFOBatchRequest):
+    """
+    Generate many NFOs (and their artwork) in one call.
+    Streams one JSON line per item as it finishes, then a summary line.
+    """
+    if not request.items:
+        raise HTTPException(status_code=400, detail="No items given")
+    if len(request.items) > NFO_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {NFO_BATCH_MAX_ITEMS} items per batch")
+    for item in request.items:
+        if item.mode not in NFO_WRITE_MODES:
+            raise HTTPException(status_code=400, detail=f"Unsupported mode: {item.mode}")
+    
+    items = [item.model_dump() for item in request.items]
+    
+    async def stream():
+        started = time.monotonic()
+        counts = {'ok': 0, 'partial': 0, 'error': 0}
+        # Writes skipped in merge/create mode keep Emby from rescanning the item
+        nfo_actions = {'created': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0}
+        bytes_saved = 0
+        async for result in generate_batch(items, request.workers):
+            counts[result['status']] += 1
+            if result.get('nfo_action'):
+                nfo_actions[result['nfo_action']] += 1
+            bytes_saved += result.get('artwork_bytes_saved', 0)
+            yield json.dumps(result) + "\n"
+        yield json.dumps({
+            'done': True,
+            'total': len(items),
+            **counts,
+            'nfo_writes': nfo_actions['created'] + nfo_actions['updated'],
+            'nfo_writes_skipped': nfo_actions['unchanged'] + nfo_actions['skipped'],
+            'nfo_actions': nfo_actions,
+            'artwork_bytes_saved': bytes_saved,
+            'seconds': round(time.monotonic() - started, 2)
+        }) + "\n"
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+from json_stream import model_projection, model_defaults, model_datetime_fields, stream_array
+from http_cache import CACHE_HEADERS, make_etag, etag_matches, not_modified, file_state
+
+MOVIES_PAGE_MAX = int(os.environ.get('MOVIES_PAGE_MAX', '10000'))
+
+@api_router.get("/movies", response_class=StreamingResponse,
+                responses={200: {"model": List[MovieMetadata], "description": "Stored movies (not re-validated)"}})
+async def get_movies(request: Request, limit: int = 100, skip: int = 0, fields: Optional[str] = None):
     """
-    Get all scraped movies from database
+    Get scraped movies from database, newest first.
+    Documents are streamed from Mongo straight to JSON (no models are built);
+    `fields` limits them to a comma-separated subset of MovieMetadata fields.
+    Answers 304 to an If-None-Match with the current ETag.
     """
+    if not 1 <= limit <= MOVIES_PAGE_MAX:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MOVIES_PAGE_MAX}")
+    if skip < 0:
+        raise HTTPException(status_code=400, detail="skip must not be negative")
     try:
-        movies = await db.movies.find({}, {"_id": 0}).sort("created_at", -1).to_list(100)
-        
-        # Convert ISO string timestamps back to datetime objects
-        for movie in movies:
-            if isinstance(movie.get('created_at'), str):
-                movie['created_at'] = datetime.fromisoformat(movie['created_at'])
+        projection = model_projection(MovieMetadata, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        # Version read before the query: a write in between only costs the next poll a full response
+        etag = make_etag('movies', await get_stats_service(db).get_version('movies'), request.url.query)
+        if etag_matches(request.headers.get('if-none-match'), etag):
+            return not_modified(etag)
         
-        return movies
+        cursor = db.movies.find({}, projection).sort("created_at", -1).skip(skip).limit(limit)
+        return StreamingResponse(
+            stream_array(cursor, model_defaults(MovieMetadata, projection),
+                         model_datetime_fields(MovieMetadata, projection)),
+            media_type="application/json",
+            headers={"ETag": etag, **CACHE_HEADERS}
+        )
         
     except Exception as e:
         logger.error(f"Error fetching movies: {str(e)}")
@@ -1618,11 +1711,14 @@ async def delete_movie(movie_id: str):
     Delete a movie from database
     """
     try:
-        result = await db.movies.delete_one({"id": movie_id})
+        deleted = await db.movies.find_one_and_delete({"id": movie_id})
         
-        if result.deleted_count == 0:
+        if not deleted:
             raise HTTPException(status_code=404, detail="Movie not found")
         
+        await get_stats_service(db).record_movie(deleted, removed=True)
+        await get_library_index(db).unlink_movie(deleted)
+        
         return {"message": "Movie deleted successfully"}
         
     except HTTPException:
@@ -1631,6 +1727,153 @@ async def delete_movie(movie_id: str):
         logger.error(f"Error deleting movie: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Library Statistics Endpoints
+from library_stats import get_stats_service
+from work_queue import get_work_queue
+
+@api_router.get("/stats")
+async def get_library_stats():
+    """
+    Get materialized library statistics (counts per source, status, year, missing artwork/plots)
+    """
+    try:
+        return await get_stats_service(db).get_stats()
+    except Exception as e:
+        logger.error(f"Error fetching library stats: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.post("/stats/reconcile")
+async def reconcile_library_stats():
+    """
+    Recompute library statistics from the collections
+    """
+    try:
+        return await get_stats_service(db).reconcile()
+    except Exception as e:
+        logger.error(f"Error reconciling library stats: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Performer / Studio Index Endpoints
+from library_index import get_library_index, normalize_name
+
+class AliasRequest(BaseModel):
+    name: str
+
+class MergeRequest(BaseModel):
+    source_id: str
+
+def _entity_index(kind: str):
+    index = get_library_index(db)
+    return index.performers if kind == "performers" else index.studios
+
+async def _list_entities(kind: str, q: Optional[str], limit: int):
+    try:
+        items = await _entity_index(kind).search(q, limit)
+        return {kind: items, "count": len(items)}
+    except Exception as e:
+        logger.error(f"Error listing {kind}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def _get_entity(kind: str, entity_id: str):
+    entity = await _entity_index(kind).get(entity_id)
+    if not entity:
+        raise HTTPException(status_code=404, detail=f"{kind[:-1].capitalize()} not found")
+    entity.pop('keys', None)
+    return entity
+
+async def _entity_movies(kind: str, entity_id: str, limit: int):
+    entity = await _get_entity(kind, entity_id)
+    movies = await _entity_index(kind).movies_for(entity_id, limit)
+    return {kind[:-1]: entity, "movies": movies, "count": len(movies)}
+
+async def _add_alias(kind: str, entity_id: str, request: AliasRequest):
+    try:
+        entity = await _entity_index(kind).add_alias(entity_id, request.name)
+    except DuplicateKeyError:
+        # Unique index on keys: the alias already belongs to another entity
+        raise HTTPException(status_code=409, detail="Alias conflicts with an existing entry")
+    if not entity:
+        raise HTTPException(status_code=404, detail=f"{kind[:-1].capitalize()} not found")
+    entity.pop('keys', None)
+    return entity
+
+async def _merge_entities(kind: str, entity_id: str, request: MergeRequest):
+    merged = await _entity_index(kind).merge(entity_id, request.source_id)
+    if not merged:
+        raise HTTPException(status_code=404, detail=f"{kind[:-1].capitalize()} not found")
+    merged.pop('keys', None)
+    return merged
+
+@api_router.get("/performers")
+async def list_performers(q: Optional[str] = None, limit: int = 100):
+    """
+    List performers by film count, optionally filtered by name prefix
+    """
+    return await _list_entities("performers", q, limit)
+
+@api_router.get("/performers/{performer_id}")
+async def get_performer(performer_id: str):
+    return await _get_entity("performers", performer_id)
+
+@api_router.get("/performers/{performer_id}/movies")
+async def get_performer_movies(performer_id: str, limit: int = 100):
+    """
+    Get all movies featuring a performer (indexed reverse lookup)
+    """
+    return await _entity_movies("performers", performer_id, limit)
+
+@api_router.post("/performers/{performer_id}/aliases")
+async def add_performer_alias(performer_id: str, request: AliasRequest):
+    return await _add_alias("performers", performer_id, request)
+
+@api_router.post("/performers/{performer_id}/merge")
+async def merge_performers(performer_id: str, request: MergeRequest):
+    """
+    Merge another performer (request.source_id) into this one
+    """
+    return await _merge_entities("performers", performer_id, request)
+
+@api_router.get("/studios")
+async def list_studios(q: Optional[str] = None, limit: int = 100):
+    """
+    List studios by film count, optionally filtered by name prefix
+    """
+    return await _list_entities("studios", q, limit)
+
+@api_router.get("/studios/{studio_id}")
+async def get_studio(studio_id: str):
+    return await _get_entity("studios", studio_id)
+
+@api_router.get("/studios/{studio_id}/movies")
+async def get_studio_movies(studio_id: str, limit: int = 100):
+    """
+    Get all movies from a studio (indexed reverse lookup)
+    """
+    return await _entity_movies("studios", studio_id, limit)
+
+@api_router.post("/studios/{studio_id}/aliases")
+async def add_studio_alias(studio_id: str, request: AliasRequest):
+    return await _add_alias("studios", studio_id, request)
+
+@api_router.post("/studios/{studio_id}/merge")
+async def merge_studios(studio_id: str, request: MergeRequest):
+    """
+    Merge another studio (request.source_id) into this one
+    """
+    return await _merge_entities("studios", studio_id, request)
+
+@api_router.post("/library-index/rebuild")
+async def rebuild_library_index():
+    """
+    Recompute performer and studio links and film counts from all movies
+    (aliases and merges are kept)
+    """
+    try:
+        return await get_library_index(db).rebuild()
+    except Exception as e:
+        logger.error(f"Error rebuilding library index: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 # Folder Monitoring Endpoints
 from folder_monitor import get_monitor_service
 
@@ -1638,6 +1881,11 @@ class MonitorConfigRequest(BaseModel):
     folder_path: Optional[str] = None
     preferred_source: Optional[str] = None
     auto_scrape_enabled: Optional[bool] = None
+    search_mode: Optional[str] = None  # single, fanout
+    worker_count: Optional[int] = None
+    queue_size: Optional[int] = None
+    watch_backend: Optional[str] = None  # auto, inotify, watchdog, polling
+    poll_interval: Optional[int] = None  # seconds, for folder_path; 0 resets to the default
 
 class ScanFolderRequest(BaseModel):
     folder_path: str
@@ -1764,6 +2012,31 @@ async def update_monitor_config(request: MonitorConfigRequest):
         if request.auto_scrape_enabled is not None:
             monitor.auto_scrape_enabled = request.auto_scrape_enabled
         
+        if request.search_mode:
+            if request.search_mode not in ("fanout", "single"):
+                raise HTTPException(status_code=400, detail=f"Unsupported search mode: {request.search_mode}")
+            monitor.search_mode = request.search_mode
+        
+        if request.queue_size:
+            # Takes effect the next time monitoring is started
+            monitor.queue_size = request.queue_size
+        
+        if request.worker_count:
+            await monitor.set_worker_count(request.worker_count)
+        
+        if request.watch_backend:
+            if request.watch_backend not in ("auto", "inotify", "watchdog", "polling"):
+                raise HTTPException(status_code=400, detail=f"Unsupported watch backend: {request.watch_backend}")
+            # Takes effect the next time monitoring is started
+            monitor.watch_backend = request.watch_backend
+        
+        if request.poll_interval is not None:
+            if not request.folder_path:
+                raise HTTPException(status_code=400, detail="poll_interval requires folder_path")
+            if request.poll_interval and request.poll_interval < 5:
+                raise HTTPException(status_code=400, detail="poll_interval must be at least 5 seconds")
+            monitor.set_poll_interval(request.folder_path, request.poll_interval)
+        
         await monitor.save_config()
         
         return {
@@ -1771,22 +2044,149 @@ async def update_monitor_config(request: MonitorConfigRequest):
             "status": await monitor.get_status()
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error updating config: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/monitor/processed-files")
-async def get_processed_files():
+async def get_processed_files(request: Request, response: Response):
     """
-    Get list of processed files
+    Get list of processed files (304 when unchanged since the given ETag)
     """
     try:
+        etag = make_etag('processed_files', await get_stats_service(db).get_version('processed_files'))
+        if etag_matches(request.headers.get('if-none-match'), etag):
+            return not_modified(etag)
+        
         files = await db.processed_files.find({}, {"_id": 0}).sort("processed_at", -1).to_list(100)
+        response.headers.update({"ETag": etag, **CACHE_HEADERS})
         return {"files": files, "count": len(files)}
     except Exception as e:
         logger.error(f"Error fetching processed files: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+class RetryRequest(BaseModel):
+    file_path: str
+
+@api_router.get("/monitor/retries")
+async def get_scheduled_retries():
+    """
+    Get failed files waiting for another attempt
+    """
+    monitor = get_monitor_service(db)
+    files = await monitor.retries.list_scheduled()
+    return {"files": files, "count": len(files), "scheduler": monitor.retries.get_stats()}
+
+@api_router.post("/monitor/retry")
+async def retry_failed_file(request: RetryRequest):
+    """
+    Schedule a failed file for an immediate retry
+    """
+    if not await get_monitor_service(db).retries.retry_now(request.file_path):
+        raise HTTPException(status_code=404, detail="No failed entry for this file")
+    return {"message": "Retry scheduled", "file_path": request.file_path}
+
+@api_router.get("/monitor/duplicates")
+async def get_duplicate_files():
+    """
+    Get processed files that are copies of the same content
+    """
+    try:
+        groups = await get_monitor_service(db).find_duplicates()
+        return {"duplicates": groups, "count": len(groups)}
+    except Exception as e:
+        logger.error(f"Error fetching duplicates: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Backfill Endpoints
+from backfill import get_backfill_manager
+
+class BackfillRequest(BaseModel):
+    folder_path: str
+    concurrency: Optional[int] = None
+
+def _backfill_manager():
+    return get_backfill_manager(db, get_monitor_service(db))
+
+@api_router.post("/backfill")
+async def start_backfill(request: BackfillRequest):
+    """
+    Start a resumable job processing every video without NFO in a folder
+    """
+    folder = Path(request.folder_path)
+    if not folder.exists() or not folder.is_dir():
+        raise HTTPException(status_code=400, detail="Folder does not exist")
+    if request.concurrency is not None and not 1 <= request.concurrency <= 16:
+        raise HTTPException(status_code=400, detail="Concurrency must be between 1 and 16")
+
+    try:
+        return await _backfill_manager().start_job(str(folder), request.concurrency)
+    except Exception as e:
+        logger.error(f"Error starting backfill: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/backfill")
+async def list_backfill_jobs():
+    jobs = await _backfill_manager().list_jobs()
+    return {"jobs": jobs, "count": len(jobs)}
+
+@api_router.get("/backfill/{job_id}")
+async def get_backfill_job(job_id: str):
+    job = await _backfill_manager().get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Backfill job not found")
+    return job
+
+@api_router.post("/backfill/{job_id}/{action}")
+async def control_backfill_job(job_id: str, action: str):
+    """
+    Pause, resume or cancel a backfill job
+    """
+    manager = _backfill_manager()
+    handlers = {"pause": manager.pause, "resume": manager.resume, "cancel": manager.cancel}
+    if action not in handlers:
+        raise HTTPException(status_code=400, detail=f"Unsupported action: {action}")
+
+    job = await handlers[action](job_id)
+    if not job:
+        if not await manager.get_job(job_id):
+            raise HTTPException(status_code=404, detail="Backfill job not found")
+        raise HTTPException(status_code=409, detail=f"Cannot {action} job in its current state")
+    return job
+
+# NFO Import Endpoints
+from nfo_import import get_nfo_importer
+
+class NFOImportRequest(BaseModel):
+    folder_paths: Optional[List[str]] = None  # default: all watched folders
+    sync_index: bool = True
+
+@api_router.post("/import/nfo")
+async def start_nfo_import(request: NFOImportRequest):
+    """
+    Import existing NFO sidecars into the movie library in the background
+    """
+    folders = request.folder_paths or get_monitor_service(db).watched_folders
+    if not folders:
+        raise HTTPException(status_code=400, detail="No folders to import")
+    for folder in folders:
+        if not Path(folder).is_dir():
+            raise HTTPException(status_code=400, detail=f"Folder does not exist: {folder}")
+
+    try:
+        return get_nfo_importer(db).start(folders, request.sync_index)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@api_router.get("/import/nfo")
+async def get_nfo_import_status():
+    job = get_nfo_importer(db).get_status()
+    if not job:
+        raise HTTPException(status_code=404, detail="No NFO import has run")
+    return job
+
 # System Info Endpoints
 @api_router.get("/system/info")
 async def get_system_info():
@@ -1848,9 +2248,9 @@ async def get_system_info():
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/system/logs")
-async def get_system_logs(lines: int = 100, service: str = "backend"):
+async def get_system_logs(request: Request, response: Response, lines: int = 100, service: str = "backend"):
     """
-    Get system logs
+    Get system logs (304 when the log files are unchanged since the given ETag)
     
     Args:
         lines: Number of lines to retrieve (default: 100)
@@ -1859,6 +2259,12 @@ async def get_system_logs(lines: int = 100, service: str = "backend"):
     try:
         import subprocess
         
+        log_files = [f"/var/log/supervisor/{name}.out.log" for name in ("backend", "frontend") if service in (name, "all")]
+        etag = make_etag('logs', service, str(lines), *(file_state(path) for path in log_files))
+        if etag_matches(request.headers.get('if-none-match'), etag):
+            return not_modified(etag)
+        response.headers.update({"ETag": etag, **CACHE_HEADERS})
+        
         logs = {}
         
         if service in ["backend", "all"]:
@@ -1992,14 +2398,42 @@ async def proxy_image(url: str):
 # Include the router in the main app
 app.include_router(api_router)
 
+from compression import CompressionMiddleware
+
+app.add_middleware(CompressionMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+@app.on_event("startup")
+async def start_background_services():
+    try:
+        await get_library_index(db).ensure_indexes()
+        await get_monitor_service(db).file_index.ensure_indexes()
+        await get_monitor_service(db).retries.ensure_indexes()
+        await get_work_queue(db).ensure_indexes()
+        await _backfill_manager().ensure_indexes()
+        await get_nfo_importer(db).ensure_indexes()
+    except Exception as e:
+        logger.error(f"Failed to create index collections: {str(e)}")
+    get_stats_service(db).start()
+    if SCRAPE_EXECUTION != 'worker':
+        get_work_queue(db).start({'scrape': handle_scrape_job}, SCRAPE_CONCURRENCY, group='scrape')
+    try:
+        await _backfill_manager().resume_interrupted()
+    except Exception as e:
+        logger.error(f"Failed to resume backfill jobs: {str(e)}")
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await _backfill_manager().shutdown()
+    await get_stats_service(db).stop()
+    await get_work_queue(db).stop('scrape')
+    get_artwork_downloader(db).optimizer.shutdown()
     client.close()
@@ -0,0 +1,162 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Optional, Dict, Any, List
+
+from candidate_ranker import CandidateRanker, get_candidate_ranker
+
+logger = logging.getLogger(__name__)
+
+# Sources with a working search; GEVI search always returns [] (see GEVIScraper)
+SEARCHABLE_SOURCES = ['radvideo', 'gaydvdempire', 'aebn']
+
+
+async def search_source(source: str, query: str) -> List[Dict[str, Any]]:
+    """Run one scraper's search without blocking the event loop"""
+    from server import GayDVDEmpireScraper, AEBNScraper, GEVIScraper, RadVideoScraper
+
+    if source == "gaydvdempire":
+        return await GayDVDEmpireScraper.search_movie(query)
+    if source == "aebn":
+        return await AEBNScraper.search_movie(query)
+    if source == "gevi":
+        return await GEVIScraper.search_movie(query)
+    if source == "radvideo":
+        # requests-based, so it runs in a thread
+        return await asyncio.to_thread(RadVideoScraper.search_movie, query)
+    raise ValueError(f"Unknown source: {source}")
+
+
+class MultiSourceSearch:
+    """
+    Fan-out search across every eligible source.
+
+    All sources are queried concurrently under one global deadline. A
+    confident match from the preferred source ends the search at once; a
+    confident match from another source is held for a short grace window in
+    case the preferred source answers, then wins. Remaining searches are
+    cancelled as soon as the search is decided.
+    """
+
+    def __init__(self, deadline: Optional[float] = None, grace: Optional[float] = None,
+                 ranker: Optional[CandidateRanker] = None):
+        self.deadline = deadline or float(os.environ.get('MONITOR_SEARCH_DEADLINE', '45'))
+        self.grace = grace if grace is not None else float(os.environ.get('MONITOR_SEARCH_GRACE', '5'))
+        self.ranker = ranker or get_candidate_ranker()
+        self.stats = {
+            'searches': 0,
+            'matched': 0,
+            'unmatched': 0,
+            'deadline_hits': 0,
+            'cancelled_calls': 0,
+            'wins': {},
+            'errors': {},
+            'search_seconds_total': 0.0
+        }
+
+    @property
+    def confidence(self) -> float:
+        return self.ranker.accept_threshold
+
+    async def search(self, title: str, year: Optional[int], preferred: str,
+                     sources: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Returns the chosen result with its 'source', 'confidence' and
+        'auto_accept' flag, or None. A result below the auto-accept threshold
+        is still returned if it is all there is.
+        """
+        sources = [s for s in (sources or SEARCHABLE_SOURCES) if s in SEARCHABLE_SOURCES]
+        if preferred in SEARCHABLE_SOURCES and preferred not in sources:
+            sources.insert(0, preferred)
+        if not sources:
+            return None
+
+        started = time.monotonic()
+        self.stats['searches'] += 1
+        tasks = {asyncio.create_task(search_source(source, title)): source for source in sources}
+        preferred_task = next((task for task, source in tasks.items() if source == preferred), None)
+        candidates: Dict[str, Dict[str, Any]] = {}
+        confident_since = None
+        pending = set(tasks)
+
+        try:
+            while pending:
+                remaining = self.deadline - (time.monotonic() - started)
+                if confident_since is not None:
+                    remaining = min(remaining, confident_since + self.grace - time.monotonic())
+                if remaining <= 0:
+                    if confident_since is None:
+                        self.stats['deadline_hits'] += 1
+                    break
+
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    source = tasks[task]
+                    try:
+                        results = task.result() or []
+                    except Exception as e:
+                        logger.warning(f"Search on {source} failed: {str(e)}")
+                        self.stats['errors'][source] = self.stats['errors'].get(source, 0) + 1
+                        continue
+                    match = self.ranker.best({'title': title, 'year': year}, results)
+                    if match:
+                        candidates[source] = {**match, 'source': source}
+
+                decided = self._decide(candidates, preferred)
+                if decided:
+                    if decided['source'] == preferred or preferred_task not in pending:
+                        break
+                    if confident_since is None:
+                        # Give the preferred source a last chance to answer
+                        confident_since = time.monotonic()
+        finally:
+            for task in pending:
+                task.cancel()
+            self.stats['cancelled_calls'] += len(pending)
+
+        choice = self._decide(candidates, preferred) or self._fallback(candidates, preferred)
+        elapsed = time.monotonic() - started
+        self.stats['search_seconds_total'] += elapsed
+
+        if not choice:
+            self.stats['unmatched'] += 1
+            logger.warning(f"No results found on {', '.join(sources)} for: {title} ({elapsed:.1f}s)")
+            return None
+
+        self.stats['matched'] += 1
+        self.stats['wins'][choice['source']] = self.stats['wins'].get(choice['source'], 0) + 1
+        logger.info(f"Matched '{title}' on {choice['source']}: {choice.get('title')} "
+                    f"(confidence {choice['confidence']}, {elapsed:.1f}s)")
+        return choice
+
+    def _decide(self, candidates: Dict[str, Dict[str, Any]], preferred: str) -> Optional[Dict[str, Any]]:
+        """Confident candidate, preferring the preferred source"""
+        confident = [c for c in candidates.values() if c['confidence'] >= self.confidence]
+        if not confident:
+            return None
+        for candidate in confident:
+            if candidate['source'] == preferred:
+                return candidate
+        return max(confident, key=lambda c: c['confidence'])
+
+    @staticmethod
+    def _fallback(candidates: Dict[str, Dict[str, Any]], preferred: str) -> Optional[Dict[str, Any]]:
+        """Nothing confident: the preferred source's best guess, else the best overall"""
+        # A result sharing no words with the title is a different movie
+        candidates = {source: c for source, c in candidates.items() if c['confidence'] > 0}
+        if preferred in candidates:
+            return candidates[preferred]
+        if candidates:
+            return max(candidates.values(), key=lambda c: c['confidence'])
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        searches = self.stats['searches']
+        return {
+            **self.stats,
+            'avg_search_seconds': round(self.stats['search_seconds_total'] / searches, 2) if searches else None,
+            'deadline_seconds': self.deadline,
+            'grace_seconds': self.grace,
+            'confidence_threshold': self.confidence
+        }
@@ -0,0 +1,339 @@
+import os
+import time
+import uuid
+import socket
+import asyncio
+import logging
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, List, Tuple, Callable, Awaitable
+from datetime import datetime, timezone, timedelta
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+# (queue, job id) of the job the current task is working on
+_current_job: ContextVar[Optional[Tuple['WorkQueue', str]]] = ContextVar('current_job', default=None)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler for failures that would repeat on every attempt; the job is not retried"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+async def report_progress(phase: str, **info):
+    """Record the phase a running job is in; a no-op outside work_queue handlers"""
+    current = _current_job.get()
+    if current is None:
+        return
+    queue, job_id = current
+    try:
+        await queue.set_progress(job_id, phase, info)
+    except Exception as e:
+        # Progress is informational; never fail the job over it
+        logger.warning(f"Could not record progress for job {job_id}: {str(e)}")
+
+
+class WorkQueue:
+    """
+    Mongo-backed job queue shared by every backend process and host.
+
+    work_queue: {_id, type, key, payload, status, active, attempts,
+                 available_at, lease_owner, lease_expires_at, result, error,
+                 progress: {phase, history: [{phase, at, ...}]}, ...}
+
+    A job is leased with a single atomic find_one_and_update, so exactly one
+    consumer gets it. The consumer renews its lease with heartbeats while it
+    works; a lease that expires (crashed or hung consumer) makes the job
+    available again. `key` deduplicates: only one active job per key exists.
+    Handlers report the phase they are in with report_progress().
+    """
+
+    def __init__(self, db, worker_id: Optional[str] = None):
+        self.db = db
+        self.collection = db.work_queue
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = float(os.environ.get('WORK_QUEUE_LEASE_SECONDS', '120'))
+        self.poll_interval = float(os.environ.get('WORK_QUEUE_POLL_INTERVAL', '2'))
+        self.max_attempts = int(os.environ.get('WORK_QUEUE_MAX_ATTEMPTS', '3'))
+        self.retry_delay = float(os.environ.get('WORK_QUEUE_RETRY_DELAY', '30'))
+        self.retention_days = int(os.environ.get('WORK_QUEUE_RETENTION_DAYS', '7'))
+        self.consumers: Dict[str, List[asyncio.Task]] = {}  # group -> consumer tasks
+        self._wakeup = asyncio.Event()
+        self.stats = {'acquired': 0, 'completed': 0, 'failed': 0, 'leases_lost': 0, 'busy': 0}
+
+    async def ensure_indexes(self):
+        await self.collection.create_index([('status', ASCENDING), ('type', ASCENDING), ('available_at', ASCENDING)])
+        await self.collection.create_index([('status', ASCENDING), ('lease_expires_at', ASCENDING)])
+        await self.collection.create_index(
+            [('key', ASCENDING)], unique=True, partialFilterExpression={'active': True}
+        )
+        # Finished jobs are removed after the retention period
+        await self.collection.create_index(
+            [('finished_at', ASCENDING)], expireAfterSeconds=self.retention_days * 86400
+        )
+
+    async def enqueue(self, job_type: str, payload: Dict[str, Any], key: Optional[str] = None,
+                      delay: float = 0, max_attempts: Optional[int] = None) -> Optional[str]:
+        """
+        Add a job; returns its id, or None if an active job with the same key
+        exists. max_attempts=1 suits jobs a caller is waiting on: a failure is
+        reported at once instead of after the retry backoff.
+        """
+        now = _now()
+        job = {
+            '_id': str(uuid.uuid4()),
+            'type': job_type,
+            'key': key or f"{job_type}:{uuid.uuid4()}",
+            'payload': payload,
+            'status': 'queued',
+            'active': True,
+            'attempts': 0,
+            'max_attempts': max_attempts or self.max_attempts,
+            'available_at': now + timedelta(seconds=delay),
+            'lease_owner': None,
+            'lease_expires_at': None,
+            'progress': {'phase': 'queued', 'history': [{'phase': 'queued', 'at': now}]},
+            'created_at': now,
+            'updated_at': now
+        }
+        try:
+            await self.collection.insert_one(job)
+        except DuplicateKeyError:
+            return None
+        # Idle consumers in this process pick it up without waiting for their next poll
+        self._wakeup.set()
+        return job['_id']
+
+    async def acquire(self, job_types: List[str]) -> Optional[Dict[str, Any]]:
+        """Lease the oldest available job (or one whose lease expired)"""
+        now = _now()
+        job = await self.collection.find_one_and_update(
+            {
+                'type': {'$in': job_types},
+                '$or': [
+                    {'status': 'queued', 'available_at': {'$lte': now}},
+                    {'status': 'leased', 'lease_expires_at': {'$lt': now}}
+                ]
+            },
+            {
+                '$set': {
+                    'status': 'leased',
+                    'lease_owner': self.worker_id,
+                    'lease_expires_at': now + timedelta(seconds=self.lease_seconds),
+                    'started_at': now,
+                    'updated_at': now
+                },
+                '$inc': {'attempts': 1}
+            },
+            sort=[('available_at', ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+        if job:
+            self.stats['acquired'] += 1
+            if job['attempts'] > 1:
+                logger.info(f"Recovered job {job['_id']} ({job['type']}), attempt {job['attempts']}")
+        return job
+
+    async def heartbeat(self, job_id: str) -> bool:
+        """Extend our lease; False means it expired and another consumer may own the job"""
+        result = await self.collection.update_one(
+            {'_id': job_id, 'status': 'leased', 'lease_owner': self.worker_id},
+            {'$set': {'lease_expires_at': _now() + timedelta(seconds=self.lease_seconds), 'updated_at': _now()}}
+        )
+        return result.matched_count > 0
+
+    async def set_progress(self, job_id: str, phase: str, info: Optional[Dict[str, Any]] = None):
+        now = _now()
+        entry = {'phase': phase, 'at': now, **(info or {})}
+        await self.collection.update_one(
+            {'_id': job_id, 'lease_owner': self.worker_id},
+            {'$set': {'progress.phase': phase, 'updated_at': now}, '$push': {'progress.history': entry}}
+        )
+
+    async def complete(self, job_id: str, result: Any = None) -> bool:
+        now = _now()
+        outcome = await self.collection.update_one(
+            {'_id': job_id, 'lease_owner': self.worker_id},
+            {'$set': {
+                'status': 'done', 'active': False, 'result': result,
+                'finished_at': now, 'updated_at': now, 'lease_expires_at': None
+            }}
+        )
+        return outcome.matched_count > 0
+
+    async def fail(self, job_id: str, error: str, attempts: int, permanent: bool = False,
+                   status_code: Optional[int] = None, max_attempts: Optional[int] = None) -> bool:
+        """Requeue with backoff, or fail for good after max_attempts (or at once if permanent)"""
+        now = _now()
+        if attempts < (max_attempts or self.max_attempts) and not permanent:
+            changes = {
+                '$set': {
+                    'status': 'queued', 'error': error, 'lease_owner': None, 'lease_expires_at': None,
+                    'available_at': now + timedelta(seconds=self.retry_delay * (2 ** (attempts - 1))),
+                    'progress.phase': 'queued', 'updated_at': now
+                },
+                '$push': {'progress.history': {'phase': 'queued', 'at': now, 'error': error}}
+            }
+        else:
+            update = {
+                'status': 'failed', 'active': False, 'error': error, 'lease_expires_at': None,
+                'finished_at': now, 'updated_at': now
+            }
+            if status_code is not None:
+                update['status_code'] = status_code
+            changes = {'$set': update}
+        outcome = await self.collection.update_one({'_id': job_id, 'lease_owner': self.worker_id}, changes)
+        return outcome.matched_count > 0
+
+    async def recover_expired(self) -> int:
+        """
+        Give up on jobs whose lease expired too often (their consumer keeps
+        crashing on them); other expired leases are picked up by acquire()
+        """
+        now = _now()
+        result = await self.collection.update_many(
+            {'status': 'leased', 'lease_expires_at': {'$lt': now}, 'attempts': {'$gte': self.max_attempts}},
+            {'$set': {
+                'status': 'failed', 'active': False, 'error': 'Lease expired too many times',
+                'finished_at': now, 'updated_at': now
+            }}
+        )
+        return result.modified_count
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({'_id': job_id})
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Poll a job until it is done or failed for good; None on timeout"""
+        deadline = time.monotonic() + timeout if timeout else None
+        delay = 0.2
+        while deadline is None or time.monotonic() < deadline:
+            job = await self.get_job(job_id)
+            if job and job['status'] in ('done', 'failed'):
+                return job
+            await asyncio.sleep(delay)
+            delay = min(delay * 1.5, 2.0)
+        return None
+
+    async def finished_jobs(self, job_ids: List[str]) -> List[Dict[str, Any]]:
+        """Jobs among job_ids that are done or failed for good"""
+        return await self.collection.find(
+            {'_id': {'$in': job_ids}, 'status': {'$in': ['done', 'failed']}}
+        ).to_list(None)
+
+    async def _keep_lease(self, job_id: str, lost: asyncio.Event):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not await self.heartbeat(job_id):
+                lost.set()
+                return
+
+    async def _consume(self, handlers: Dict[str, Handler], index: int):
+        job_types = list(handlers)
+        while True:
+            try:
+                job = await self.acquire(job_types)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Work queue unavailable: {str(e)}")
+                job = None
+            if not job:
+                if index == 0:
+                    try:
+                        await self.recover_expired()
+                    except Exception as e:
+                        logger.error(f"Lease recovery failed: {str(e)}")
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            lost = asyncio.Event()
+            keeper = asyncio.create_task(self._keep_lease(job['_id'], lost))
+            self.stats['busy'] += 1
+            token = _current_job.set((self, job['_id']))
+            try:
+                result = await handlers[job['type']](job['payload'])
+                if lost.is_set():
+                    self.stats['leases_lost'] += 1
+                    logger.warning(f"Lease lost on job {job['_id']}; result discarded")
+                elif await self.complete(job['_id'], result):
+                    self.stats['completed'] += 1
+            except asyncio.CancelledError:
+                # Shutting down: the lease expires and another consumer takes over
+                raise
+            except PermanentJobError as e:
+                logger.error(f"Job {job['_id']} ({job['type']}) failed permanently: {str(e)}")
+                self.stats['failed'] += 1
+                await self.fail(job['_id'], str(e), job['attempts'], permanent=True, status_code=e.status_code)
+            except Exception as e:
+                logger.error(f"Job {job['_id']} ({job['type']}) failed: {str(e)}")
+                self.stats['failed'] += 1
+                await self.fail(job['_id'], str(e), job['attempts'], max_attempts=job.get('max_attempts'))
+            finally:
+                _current_job.reset(token)
+                self.stats['busy'] -= 1
+                keeper.cancel()
+
+    def start(self, handlers: Dict[str, Handler], concurrency: int = 1, group: str = 'default'):
+        """Start a group of consumers for the given job types"""
+        consumers = self.consumers.setdefault(group, [])
+        while len(consumers) < concurrency:
+            consumers.append(asyncio.create_task(self._consume(handlers, len(consumers))))
+        logger.info(f"Work queue consumer {self.worker_id} started ({concurrency} slots: {', '.join(handlers)})")
+
+    async def stop(self, group: Optional[str] = None):
+        """Stop one consumer group, or all of them"""
+        groups = [group] if group else list(self.consumers)
+        for name in groups:
+            tasks = self.consumers.pop(name, [])
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def count_active(self, job_type: str) -> int:
+        """Jobs of a type that are queued or being worked on"""
+        return await self.collection.count_documents({'type': job_type, 'status': {'$in': ['queued', 'leased']}})
+
+    async def get_stats(self) -> Dict[str, Any]:
+        counts = await self.collection.aggregate([
+            {'$match': {'status': {'$in': ['queued', 'leased']}}},
+            {'$group': {'_id': {'type': '$type', 'status': '$status'}, 'n': {'$sum': 1}}}
+        ]).to_list(None)
+        backlog: Dict[str, Dict[str, int]] = {}
+        for row in counts:
+            backlog.setdefault(row['_id']['type'], {})[row['_id']['status']] = row['n']
+        return {
+            'worker_id': self.worker_id,
+            'consumers': {group: len(tasks) for group, tasks in self.consumers.items()},
+            'lease_seconds': self.lease_seconds,
+            'backlog': backlog,
+            **self.stats
+        }
+
+# Global instance
+work_queue = None
+
+def get_work_queue(db) -> WorkQueue:
+    """Get or create this process's work queue client"""
+    global work_queue
+    if work_queue is None:
+        work_queue = WorkQueue(db)
+    return work_queue
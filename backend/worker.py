@@ -0,0 +1,82 @@
+"""
+Standalone scrape worker.
+
+Consumes scrape, scrape_batch and monitor_file jobs from the Mongo work queue so the
+browser-heavy scraping runs outside the API process. Run the API with
+SCRAPE_EXECUTION=worker and start any number of these, on any host that
+shares the database (and, for monitor jobs, the media folders):
+
+    python backend/worker.py --concurrency 4
+"""
+import os
+import sys
+import signal
+import asyncio
+import logging
+import argparse
+from pathlib import Path
+
+# Flat imports, as in server.py
+sys.path.insert(0, str(Path(__file__).parent))
+
+from server import db, client, handle_scrape_job, handle_scrape_batch_job
+from folder_monitor import get_monitor_service
+from work_queue import get_work_queue
+
+logger = logging.getLogger(__name__)
+
+JOB_TYPES = ['scrape', 'scrape_batch', 'monitor_file']
+
+
+async def refresh_config(monitor, interval: float):
+    """Pick up preferred source / search mode changes made through the API"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await monitor.load_config()
+        except Exception as e:
+            logger.error(f"Config refresh failed: {str(e)}")
+
+
+async def run(concurrency: int, job_types):
+    monitor = get_monitor_service(db)
+    await monitor.load_config()
+
+    queue = get_work_queue(db)
+    await queue.ensure_indexes()
+    handlers = {
+        'scrape': handle_scrape_job,
+        'scrape_batch': handle_scrape_batch_job,
+        'monitor_file': monitor.handle_queue_job
+    }
+    queue.start({job_type: handlers[job_type] for job_type in job_types}, concurrency)
+
+    refresher = asyncio.create_task(
+        refresh_config(monitor, float(os.environ.get('WORKER_CONFIG_REFRESH', '60')))
+    )
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    await stopping.wait()
+    logger.info(f"Worker {queue.worker_id} shutting down")
+    refresher.cancel()
+    # Unfinished jobs are picked up by another worker once their lease expires
+    await queue.stop()
+    client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape worker for the work queue")
+    parser.add_argument('--concurrency', type=int, default=int(os.environ.get('WORKER_CONCURRENCY', '2')),
+                        help="Jobs processed at once (default: WORKER_CONCURRENCY or 2)")
+    parser.add_argument('--types', nargs='+', choices=JOB_TYPES, default=JOB_TYPES,
+                        help="Job types to consume (default: all)")
+    args = parser.parse_args()
+    asyncio.run(run(max(1, args.concurrency), args.types))
+
+
+if __name__ == '__main__':
+    main()
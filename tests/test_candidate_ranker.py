@@ -0,0 +1,49 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+import pytest
+
+from candidate_ranker import CandidateRanker, MAX_TOKENS, _token_hashes
+
+QUERY = {'title': 'Summer Heat', 'year': 2012}
+CANDIDATES = [
+    {'title': 'Summer Heat', 'year': 2012},
+    {'title': 'Summer Heat 2', 'year': 2014},
+    {'title': 'Winter Nights', 'year': 1999}
+]
+
+
+def confidences(ranker):
+    return {c['title']: c for c in ranker.rank([QUERY], [CANDIDATES])[0]}
+
+
+def test_exact_match_ranks_first():
+    ranked = CandidateRanker(accept_threshold=0.6).rank([QUERY], [CANDIDATES])[0]
+    assert [c['title'] for c in ranked] == ['Summer Heat', 'Summer Heat 2', 'Winter Nights']
+    assert ranked[0]['confidence'] == 1.0
+
+
+@pytest.mark.parametrize('offset, accepted', [(-0.001, True), (0.0, True), (0.001, False)])
+def test_accept_threshold_boundary(offset, accepted):
+    sequel = confidences(CandidateRanker(accept_threshold=0.6))['Summer Heat 2']['confidence']
+    ranker = CandidateRanker(accept_threshold=sequel + offset)
+    assert confidences(ranker)['Summer Heat 2']['auto_accept'] is accepted
+
+
+def test_zero_threshold_is_not_replaced_by_default(monkeypatch):
+    monkeypatch.setenv('MATCH_AUTO_ACCEPT', '0.9')
+    assert CandidateRanker(accept_threshold=0.0).accept_threshold == 0.0
+    assert confidences(CandidateRanker(accept_threshold=0.0))['Winter Nights']['auto_accept'] is True
+    assert CandidateRanker().accept_threshold == 0.9
+
+
+def test_long_titles_keep_their_first_words():
+    words = [f"word{i}" for i in range(MAX_TOKENS + 10)]
+    hashes, _ = _token_hashes(' '.join(words))
+    assert hashes == _token_hashes(' '.join(words[:MAX_TOKENS]))[0]
+
+    ranker = CandidateRanker(accept_threshold=0.6)
+    best = ranker.best({'title': ' '.join(words[:3])}, [{'title': ' '.join(words)}])
+    assert best['confidence'] > 0
@@ -0,0 +1,104 @@
+import sys
+import gzip
+import zlib
+import asyncio
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+import pytest
+from starlette.responses import Response, StreamingResponse
+
+from compression import CompressionMiddleware, accepted_encodings, brotli
+
+BODY = b'{"title": "Summer Heat"}' * 200
+
+
+def call(app, accept_encoding=None, minimum_size=1024):
+    """Run one GET through the middleware; returns (status, headers, body, body messages)"""
+    headers = [(b'accept-encoding', accept_encoding.encode())] if accept_encoding is not None else []
+    scope = {'type': 'http', 'method': 'GET', 'path': '/', 'query_string': b'', 'headers': headers}
+    messages = []
+    requests = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        # The client stays connected
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(CompressionMiddleware(app, minimum_size=minimum_size)(scope, receive, send))
+    start, bodies = messages[0], messages[1:]
+    response_headers = {key.decode().lower(): value.decode() for key, value in start['headers']}
+    return start['status'], response_headers, b''.join(m.get('body', b'') for m in bodies), bodies
+
+
+def decode(headers, body):
+    if headers.get('content-encoding') == 'br':
+        return brotli.decompress(body)
+    if headers.get('content-encoding') == 'gzip':
+        return gzip.decompress(body)
+    return body
+
+
+@pytest.mark.parametrize('accept_encoding, expected', [
+    ('gzip, deflate, br', 'br' if brotli is not None else 'gzip'),
+    ('gzip', 'gzip'),
+    ('br;q=0, gzip', 'gzip'),
+    ('gzip;q=0', None),
+    ('identity', None),
+    (None, None)
+])
+def test_negotiation(accept_encoding, expected):
+    status, headers, body, _ = call(Response(BODY, media_type='application/json'), accept_encoding)
+    assert status == 200
+    assert headers.get('content-encoding') == expected
+    assert decode(headers, body) == BODY
+    assert headers['content-length'] == str(len(body))
+    if expected:
+        assert len(body) < len(BODY)
+        assert 'accept-encoding' in headers['vary'].lower()
+
+
+def test_accepted_encodings():
+    assert accepted_encodings('gzip;q=1.0, br;q=0, *;q=0.5') == ['gzip', '*']
+    assert accepted_encodings('') == []
+
+
+def test_small_responses_pass_through():
+    small = b'{"ok": true}'
+    status, headers, body, _ = call(Response(small, media_type='application/json'), 'gzip, br')
+    assert 'content-encoding' not in headers
+    assert body == small
+    assert headers['content-length'] == str(len(small))
+
+    _, headers, body, _ = call(Response(small, media_type='application/json'), 'gzip', minimum_size=0)
+    assert headers['content-encoding'] == 'gzip'
+    assert gzip.decompress(body) == small
+
+
+@pytest.mark.parametrize('response', [
+    Response(BODY, status_code=304),
+    Response(BODY, media_type='image/jpeg'),
+    Response(BODY, media_type='application/json', headers={'Content-Encoding': 'gzip'})
+])
+def test_excluded_responses_pass_through(response):
+    _, headers, body, _ = call(response, 'gzip')
+    assert headers.get('content-encoding') == response.headers.get('content-encoding')
+    assert body == BODY
+
+
+def test_streamed_chunks_decode_as_they_arrive():
+    async def chunks():
+        for i in range(3):
+            yield b'{"page": %d}\n' % i
+
+    _, headers, body, messages = call(StreamingResponse(chunks(), media_type='application/x-ndjson'), 'gzip', minimum_size=1)
+    assert headers['content-encoding'] == 'gzip'
+    assert 'content-length' not in headers
+    assert gzip.decompress(body) == b'{"page": 0}\n{"page": 1}\n{"page": 2}\n'
+    # Every chunk is sync-flushed, so the first line is readable before the stream ends
+    assert zlib.decompressobj(31).decompress(messages[0]['body']) == b'{"page": 0}\n'
@@ -0,0 +1,85 @@
+import sys
+import asyncio
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+import pytest
+
+from event_debouncer import EventDebouncer
+
+WINDOW = 0.05
+
+
+def run(events):
+    """Push (kind, path, src) events at once and wait for the window to close; returns (ready, deleted, stats)"""
+    ready, deleted = [], []
+
+    async def on_ready(path, src, complete):
+        ready.append((path.name, src.name if src else None, complete))
+
+    async def on_deleted(path):
+        deleted.append(path.name)
+
+    async def main():
+        debouncer = EventDebouncer(asyncio.get_running_loop(), WINDOW, on_ready, on_deleted)
+        for kind, path, *src in events:
+            debouncer.push(kind, Path('/media', path), Path('/media', src[0]) if src else None)
+        await asyncio.sleep(WINDOW * 4)
+        return debouncer.get_stats()
+
+    stats = asyncio.run(main())
+    return ready, deleted, stats
+
+
+def test_created_and_modified_events_coalesce():
+    ready, _, stats = run([('created', 'a.mkv')] + [('modified', 'a.mkv')] * 5)
+    assert ready == [('a.mkv', None, False)]
+    assert stats['events_received'] == 6
+    assert stats['events_suppressed'] == 5
+    assert stats['jobs_emitted'] == 1
+    assert stats['pending_paths'] == 0
+
+
+@pytest.mark.parametrize('events, expected', [
+    ([('created', 'a.mkv'), ('modified', 'a.mkv'), ('closed', 'a.mkv')], True),
+    # Written again after the close: not known to be complete
+    ([('created', 'a.mkv'), ('closed', 'a.mkv'), ('modified', 'a.mkv')], False)
+])
+def test_ready_follows_the_last_event(events, expected):
+    ready, _, _ = run(events)
+    assert ready == [('a.mkv', None, expected)]
+
+
+def test_temp_file_renamed_into_place_is_one_new_file():
+    ready, _, stats = run([
+        ('created', 'a.mkv.part'), ('modified', 'a.mkv.part'), ('modified', 'a.mkv.part'),
+        ('moved', 'a.mkv', 'a.mkv.part')
+    ])
+    assert ready == [('a.mkv', None, True)]
+    assert stats['temp_renames_collapsed'] == 1
+    assert stats['events_suppressed'] == 3
+    assert stats['jobs_emitted'] == 1
+
+
+def test_temp_file_never_renamed_emits_nothing():
+    ready, _, stats = run([('created', 'a.mkv.part'), ('modified', 'a.mkv.part')])
+    assert ready == []
+    assert stats['events_suppressed'] == 2
+
+
+def test_renames_within_the_window_keep_the_original_source():
+    ready, _, _ = run([('moved', 'b.mkv', 'a.mkv'), ('moved', 'c.mkv', 'b.mkv')])
+    assert ready == [('c.mkv', 'a.mkv', True)]
+
+
+def test_modified_after_move_keeps_the_move():
+    ready, _, _ = run([('moved', 'b.mkv', 'a.mkv'), ('modified', 'b.mkv')])
+    assert ready == [('b.mkv', 'a.mkv', False)]
+
+
+def test_deleted_drops_pending_events():
+    ready, deleted, stats = run([('created', 'a.mkv'), ('modified', 'a.mkv'), ('deleted', 'a.mkv'), ('deleted', 'b.part')])
+    assert ready == []
+    assert deleted == ['a.mkv']
+    assert stats['events_suppressed'] == 2
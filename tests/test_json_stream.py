@@ -0,0 +1,78 @@
+import os
+import sys
+import json
+import asyncio
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'emby_test')
+
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from server import MovieMetadata, movie_document
+from json_stream import model_projection, model_defaults, model_datetime_fields, stream_array, json_datetime
+
+
+class Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def __aiter__(self):
+        for doc in self.docs:
+            yield dict(doc)
+
+
+def projected(doc, projection):
+    return {key: value for key, value in doc.items() if projection.get(key)}
+
+
+def model_serialized(docs) -> bytes:
+    """What GET /api/movies returned with response_model=List[MovieMetadata]"""
+    field = create_response_field(name='Response_get_movies', type_=List[MovieMetadata], mode='serialization')
+    movies = [dict(doc) for doc in docs]
+    for movie in movies:
+        if isinstance(movie.get('created_at'), str):
+            movie['created_at'] = datetime.fromisoformat(movie['created_at'])
+    content = asyncio.run(serialize_response(field=field, response_content=movies))
+    return JSONResponse(content).body
+
+
+def streamed(docs, projection) -> bytes:
+    async def collect():
+        return b''.join([chunk async for chunk in stream_array(
+            Cursor(docs), model_defaults(MovieMetadata, projection), model_datetime_fields(MovieMetadata, projection)
+        )])
+    return asyncio.run(collect())
+
+
+SAMPLES = [
+    movie_document({
+        'source': 'aebn', 'source_id': '42', 'title': 'Summer "Heat" Café', 'year': 2012,
+        'genres': ['Drama'], 'actors': [{'name': 'Someone', 'role': ''}], 'poster_url': 'https://example.com/p.jpg'
+    }),
+    # Older documents: a Mongo datetime (naive UTC) and no optional fields at all
+    {'id': 'legacy', 'source': 'gevi', 'source_id': '7', 'title': 'Vol. 3', 'created_at': datetime(2023, 5, 1, 12, 30)},
+]
+
+
+@pytest.mark.parametrize('fields', [None, 'id,title,created_at'])
+def test_streamed_movies_match_model_output(fields):
+    projection = model_projection(MovieMetadata, fields)
+    docs = [projected(doc, projection) for doc in SAMPLES]
+    expected = model_serialized([projected(doc, model_projection(MovieMetadata)) for doc in SAMPLES])
+    expected_movies = [projected(movie, projection) for movie in json.loads(expected)]
+    assert json.loads(streamed(docs, projection)) == expected_movies
+
+
+def test_created_at_is_written_like_pydantic():
+    stored = datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc)
+    assert json_datetime(stored.isoformat()) == '2024-01-02T03:04:05.678901Z'
+    assert json_datetime(stored) == '2024-01-02T03:04:05.678901Z'
+    assert json_datetime(datetime(2024, 1, 2)) == '2024-01-02T00:00:00'
+    assert json_datetime('not a date') == 'not a date'
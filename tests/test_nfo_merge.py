@@ -0,0 +1,67 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+import pytest
+
+from nfo_merge import update_nfo, parse_nfo
+
+METADATA = {
+    'title': 'Summer Heat',
+    'original_title': 'Sommerhitze',
+    'year': 2012,
+    'release_date': '2012-05-01',
+    'plot': 'A long plot & more. ' * 20,
+    'runtime': 95,
+    'studio': 'Falcon',
+    'director': 'Some Director',
+    'genres': ['Drama', 'Romance'],
+    'tags': ['Feature'],
+    'actors': [{'name': 'First Actor', 'role': 'Self'}, {'name': 'Second Actor'}],
+    'poster_url': 'https://example.com/p.jpg?a=1&b=2',
+    'backdrop_url': 'https://example.com/b.jpg',
+    'rating': 'XXX',
+    'source': 'aebn',
+    'source_id': '42'
+}
+
+
+@pytest.mark.parametrize('metadata', [
+    METADATA,
+    {**METADATA, 'original_title': 'Summer Heat'},
+    {'title': 'Only a title', 'source': 'gevi', 'source_id': '7'}
+])
+def test_overwrite_merge_overwrite_is_idempotent(tmp_path, metadata):
+    path = tmp_path / 'movie.nfo'
+    assert update_nfo(path, metadata, 'overwrite')[0] == 'created'
+    written = path.read_bytes()
+
+    assert update_nfo(path, metadata, 'merge')[0] == 'unchanged'
+    assert update_nfo(path, metadata, 'overwrite')[0] == 'unchanged'
+    assert path.read_bytes() == written
+
+
+def test_merge_keeps_existing_fields_and_unknown_elements(tmp_path):
+    path = tmp_path / 'movie.nfo'
+    update_nfo(path, METADATA, 'overwrite')
+    path.write_text(path.read_text().replace('</movie>', '  <set>Collection</set>\n</movie>'))
+
+    action, content = update_nfo(path, {'title': 'Summer Heat', 'plot': 'New plot', 'studio': ''}, 'merge')
+    assert action == 'updated'
+    metadata, extra = parse_nfo(content)
+    assert metadata['plot'] == 'New plot'
+    assert metadata['studio'] == 'Falcon'
+    assert metadata['actors'] == METADATA['actors'][:1] + [{'name': 'Second Actor'}]
+    assert extra == ['  <set>Collection</set>']
+
+    # The merged document is stable under further merges
+    assert update_nfo(path, {'title': 'Summer Heat', 'plot': 'New plot'}, 'merge')[0] == 'unchanged'
+
+
+def test_create_never_touches_an_existing_nfo(tmp_path):
+    path = tmp_path / 'movie.nfo'
+    path.write_text('not xml')
+    assert update_nfo(path, METADATA, 'create') == ('skipped', 'not xml')
+    assert update_nfo(path, METADATA, 'merge')[0] == 'updated'
+    assert update_nfo(path, METADATA, 'merge')[0] == 'unchanged'
@@ -0,0 +1,39 @@
+import sys
+import random
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend' / 'benchmarks'))
+
+import pytest
+from lxml import etree
+
+from nfo_writer import write_nfo
+from nfo_writer_benchmark import minidom_nfo, sample_metadata
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_output_matches_minidom_round_trip(seed):
+    rng = random.Random(seed)
+    for i in range(200):
+        metadata = sample_metadata(rng, i)
+        assert write_nfo(metadata) == minidom_nfo(metadata)
+
+
+@pytest.mark.parametrize('metadata', [
+    {'title': 'Only a title'},
+    {'title': 'A & B <Live>', 'plot': 'x' * 250, 'actors': [{'name': ''}], 'genres': ['']},
+    {'plot': 'First line\r\n\r\n   \r\nLast line\n', 'source': 'gevi', 'source_id': '7'},
+    {}
+])
+def test_edge_cases_match_minidom_round_trip(metadata):
+    assert write_nfo(metadata) == minidom_nfo(metadata)
+
+
+def test_control_characters_are_stripped():
+    nfo = write_nfo({'title': 'Bad\x00 \x08Title\x1f', 'plot': 'Tab\tand\x0bvertical tab', 'studio': '\x01'})
+    root = etree.fromstring(nfo.encode('utf-8'))
+    assert root.findtext('title') == 'Bad Title'
+    assert root.findtext('plot') == 'Tab\tandvertical tab'
+    # Nothing left of the value: written as an empty element
+    assert '<studio/>' in nfo
@@ -0,0 +1,35 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+import pytest
+
+from retry_scheduler import classify_error
+
+
+@pytest.mark.parametrize('error', [
+    '404: Movie not found',
+    '403: Age verification failed',
+    'Movie not found',
+    'No search results for "Summer Heat"',
+    'Permission denied: /media/movie.nfo'
+])
+def test_permanent_errors(error):
+    assert classify_error(error) == 'permanent'
+
+
+@pytest.mark.parametrize('error', [
+    '429: Too Many Requests',
+    '408: Request Timeout',
+    '503: Service Unavailable',
+    'Timeout 30000ms exceeded',
+    'net::ERR_CONNECTION_RESET'
+])
+def test_transient_errors(error):
+    assert classify_error(error) == 'transient'
+
+
+def test_unknown_errors():
+    assert classify_error('Something unexpected') == 'unknown'
+    assert classify_error(None) == 'unknown'